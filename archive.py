@@ -0,0 +1,109 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import uuid
+from datetime import datetime
+
+
+class PageArchive:
+    """Archive compressée des pages rendues, adressée par leur contenu
+
+    Chaque HTML est compressé en gzip sous objects/<2 premiers caractères>/<sha256>.html.gz :
+    deux pages identiques ne sont stockées qu'une fois. index.jsonl reçoit une
+    ligne {"url", "sha256", "depth", "timestamp", "size"} par page archivée ;
+    en cas de réarchivage d'une URL, la dernière ligne fait foi.
+    """
+
+    INDEX_FILE = 'index.jsonl'
+
+    def __init__(self, directory, compression_level=6):
+        self.directory = directory
+        self.compression_level = compression_level
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], f"{digest}.html.gz")
+
+    def store(self, url, html, depth=None, timestamp=None):
+        """
+        Archive le HTML d'une page
+        :return: Empreinte sha256 du contenu
+        """
+        content = html.encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture dans un fichier temporaire puis renommage : jamais d'objet tronqué
+            temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+            with gzip.open(temporary, 'wb', compresslevel=self.compression_level) as f:
+                f.write(content)
+            os.replace(temporary, path)
+
+        entry = {
+            'url': url,
+            'sha256': digest,
+            'depth': depth,
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'size': len(content)
+        }
+        with self.lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return digest
+
+    def load(self, digest):
+        """Retourne le HTML archivé sous cette empreinte"""
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def entries(self):
+        """Retourne la dernière entrée de l'index pour chaque URL"""
+        latest = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne incomplète après un arrêt brutal
+                        continue
+                    latest[entry['url']] = entry
+        except FileNotFoundError:
+            pass
+        return list(latest.values())
+
+    def __len__(self):
+        return len(self.entries())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Réextraction hors ligne d'une archive de pages")
+    parser.add_argument('archive', help="Dossier de l'archive (voir SiteMapper.enable_archive)")
+    parser.add_argument('base_url', help="URL de départ du crawl archivé")
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus (par défaut : nombre de CPU)")
+    parser.add_argument('--output', help="Fichier de sortie")
+    parser.add_argument('--output-dir', help="Dossier de sortie")
+    parser.add_argument('--jsonl', action='store_true', help="Écrit une page par ligne")
+    args = parser.parse_args(argv)
+
+    # main n'est importé qu'ici : l'archivage seul ne charge pas les extracteurs
+    from main import reextract_archive
+    output_file = reextract_archive(args.archive, args.base_url, output_file=args.output,
+                                    output_dir=args.output_dir, max_workers=args.workers,
+                                    line_delimited=args.jsonl)
+    print(output_file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+from json_parser import JsonParser
+from log_pipeline import LOG_LEVELS
+from main import SiteMapper, save_results
+from scraper import DriverPool, TabPool
+
+# Paramètres acceptés pour chaque site (et dans la section "defaults")
+SITE_SCHEMA = {
+    "url": {"type": "url"},
+    "max_pages": {"type": "integer"},
+    "max_depth": {"type": "integer"},
+    "max_workers": {"type": "integer"},
+    "explore_external": {"type": "boolean"},
+    "delay": {"type": "float"}
+}
+
+CONFIG_SCHEMA = {
+    "pool_size": {"type": "integer"},
+    "tabs_per_browser": {"type": "integer"},
+    "concurrent_sites": {"type": "integer"},
+    "output_dir": {"type": "string"},
+    "defaults": {"type": "dict"},
+    "sites": {"type": "list"}
+}
+
+# Paramètres entiers qui doivent valoir au moins 1
+POSITIVE_KEYS = ('pool_size', 'tabs_per_browser', 'concurrent_sites', 'max_pages', 'max_depth', 'max_workers')
+
+DEFAULT_SITE = {
+    "max_pages": 50,
+    "max_depth": 2,
+    "max_workers": 2,
+    "explore_external": False,
+    "delay": 2
+}
+
+
+def validate_section(validator, data, name):
+    """Valide un dictionnaire de configuration en refusant les clés inconnues"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{name}: un objet JSON est attendu")
+    unknown = set(data) - set(validator.schema)
+    if unknown:
+        raise ValueError(f"{name}: clés inconnues {sorted(unknown)}")
+    for key, value in data.items():
+        # bool("false") vaut True : seul un booléen JSON est accepté
+        if validator.schema[key]['type'] == 'boolean' and not isinstance(value, bool):
+            raise ValueError(f"{name}.{key}: true ou false attendu, reçu {value!r}")
+    section = validator.validate(data)
+    for key in POSITIVE_KEYS:
+        if key in section and section[key] < 1:
+            raise ValueError(f"{name}.{key}: doit être supérieur ou égal à 1, reçu {section[key]}")
+    return section
+
+
+def load_config(path):
+    """Charge et valide le fichier de configuration des sites
+
+    Exemple de fichier :
+    {
+        "pool_size": 8,
+        "tabs_per_browser": 4,
+        "concurrent_sites": 4,
+        "output_dir": "output",
+        "defaults": {"max_pages": 100, "delay": 1},
+        "sites": ["https://exemple.com/", {"url": "https://exemple.org/", "max_depth": 3}]
+    }
+    """
+    parser = JsonParser()
+    site_validator = parser.compile(SITE_SCHEMA)
+    with open(path, 'r', encoding='utf-8') as f:
+        config = validate_section(parser.compile(CONFIG_SCHEMA), parser.parse_json(f.read()), "configuration")
+
+    defaults = dict(DEFAULT_SITE)
+    defaults.update(validate_section(site_validator, config.get('defaults', {}), "defaults"))
+
+    sites = []
+    for position, entry in enumerate(config.get('sites', [])):
+        if isinstance(entry, str):
+            entry = {'url': entry}
+        site = dict(defaults)
+        site.update(validate_section(site_validator, entry, f"sites[{position}]"))
+        if 'url' not in site:
+            raise ValueError(f"sites[{position}]: url manquante")
+        sites.append(site)
+    if not sites:
+        raise ValueError("Aucun site à explorer")
+
+    config['sites'] = sites
+    config.setdefault('pool_size', 5)
+    config.setdefault('tabs_per_browser', 1)
+    config.setdefault('concurrent_sites', config['pool_size'])
+    config.setdefault('output_dir', 'output')
+    return config
+
+
+class BatchRunner:
+    """Explore plusieurs sites en parallèle sur un pool de navigateurs partagé"""
+
+    def __init__(self, config, log_level='INFO'):
+        self.config = config
+        self.log_level = log_level
+        self.min_level = LOG_LEVELS.get(log_level, LOG_LEVELS['INFO'])
+        if config['tabs_per_browser'] > 1:
+            # pool_size compte alors les onglets, répartis sur plusieurs navigateurs
+            self.pool = TabPool(size=config['pool_size'], tabs_per_browser=config['tabs_per_browser'])
+        else:
+            self.pool = DriverPool(size=config['pool_size'])
+        self.output_lock = threading.Lock()
+
+    def log(self, message, level='INFO', site=None):
+        if LOG_LEVELS.get(level, LOG_LEVELS['INFO']) < self.min_level:
+            return
+        prefix = f"[{site}] " if site else ""
+        with self.output_lock:
+            print(f"{level} {prefix}{message.strip()}", file=sys.stderr)
+
+    def run_site(self, site):
+        """Explore un site et retourne son résumé"""
+        url = site['url']
+        name = urlparse(url).netloc
+        started = time.monotonic()
+        summary = {'url': url, 'status': 'ok', 'pages': 0, 'errors': 0, 'output': None}
+        try:
+            mapper = SiteMapper(url, explore_external=site['explore_external'], pool=self.pool)
+            mapper.delay = site['delay']
+            mapper.log_callback = lambda message, level='INFO': self.log(message, level, name)
+            mapper.set_log_level(self.log_level)
+
+            data = mapper.explore_site(
+                max_pages=site['max_pages'],
+                max_depth=site['max_depth'],
+                max_workers=site['max_workers']
+            )
+            summary['output'] = save_results(url, data, output_dir=self.config['output_dir'])
+            summary['pages'] = len(data)
+            summary['errors'] = mapper.stats['errors']
+            self.log(f"Terminé: {len(data)} pages -> {summary['output']}", 'INFO', name)
+        except Exception as e:
+            summary['status'] = 'failed'
+            summary['error'] = str(e)
+            self.log(f"Échec: {str(e)}", 'ERROR', name)
+        summary['duration'] = round(time.monotonic() - started, 2)
+        return summary
+
+    def run(self):
+        """Explore tous les sites et retourne le résumé global"""
+        started = datetime.now()
+        try:
+            with ThreadPoolExecutor(max_workers=self.config['concurrent_sites']) as executor:
+                results = list(executor.map(self.run_site, self.config['sites']))
+        finally:
+            self.pool.close()
+
+        return {
+            'started': started.isoformat(),
+            'finished': datetime.now().isoformat(),
+            'sites_total': len(results),
+            'sites_ok': sum(1 for r in results if r['status'] == 'ok'),
+            'sites_failed': sum(1 for r in results if r['status'] != 'ok'),
+            'pages_total': sum(r['pages'] for r in results),
+            'sites': results
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exploration sans interface d'une liste de sites")
+    parser.add_argument('config', help="Fichier JSON listant les sites et leurs limites")
+    parser.add_argument('--log-level', default='INFO', choices=list(LOG_LEVELS))
+    parser.add_argument('--summary', help="Écrit aussi le résumé JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(json.dumps({'error': f"Configuration invalide: {str(e)}"}, ensure_ascii=False))
+        return 2
+
+    summary = BatchRunner(config, log_level=args.log_level).run()
+    output = json.dumps(summary, ensure_ascii=False, indent=2)
+    print(output)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(output)
+    return 0 if summary['sites_failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import threading
+
+
+class CancelledError(Exception):
+    """Travail interrompu par une demande d'arrêt"""
+
+
+class CancellationToken:
+    """Arrêt et pause coopératifs partagés entre le crawler et les navigateurs qu'il utilise
+
+    Toutes les attentes passent par sleep() : une demande d'arrêt les réveille
+    aussitôt, une pause les suspend jusqu'à la reprise (ou l'arrêt).
+    """
+
+    def __init__(self):
+        self._stopped = threading.Event()
+        self._running = threading.Event()  # effacé pendant la pause
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._stopped.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        """Demande l'arrêt ; les attentes en cours (pause comprise) se terminent immédiatement"""
+        self._stopped.set()
+        self._running.set()
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def reset(self):
+        """Réarme le jeton pour une nouvelle exploration"""
+        self._stopped.clear()
+        self._running.set()
+
+    def wait_if_paused(self, timeout=None):
+        """
+        Bloque tant que la pause est active
+        :return: False si l'arrêt a été demandé
+        """
+        self._running.wait(timeout)
+        return not self.cancelled
+
+    def sleep(self, seconds):
+        """
+        Attend `seconds` secondes (hors pause), interrompu par une demande d'arrêt
+        :return: False si l'arrêt a été demandé
+        """
+        if not self.wait_if_paused():
+            return False
+        return not self._stopped.wait(seconds)
+
+    def check(self):
+        """Lève CancelledError si l'arrêt a été demandé"""
+        if self.cancelled:
+            raise CancelledError("Arrêt demandé")
@@ -0,0 +1,208 @@
+import tkinter as tk
+from tkinter import ttk, scrolledtext
+import threading
+import json
+
+from records import export_page
+
+
+class DataViewer:
+    """Fenêtre de consultation paginée des données extraites
+
+    L'index des lignes (pages, items, contacts) est construit dans un thread
+    séparé à partir d'un instantané de data_by_page. Seule la page de lignes
+    visible est insérée dans le Treeview, et un enregistrement n'est sérialisé
+    en JSON que lorsqu'il est sélectionné.
+    """
+
+    PAGE_SIZE = 200
+
+    VIEWS = {
+        'pages': ('URL', 'Profondeur', 'Items', 'Emails', 'Téléphones', 'Date'),
+        'items': ('Page', 'Titre', 'Prix', 'Lien'),
+        'contacts': ('Type', 'Valeur', 'Confiance', 'Page'),
+    }
+
+    def __init__(self, root, data_by_page):
+        self.window = tk.Toplevel(root)
+        self.window.title("Données Extraites")
+        self.window.geometry("900x600")
+
+        # Instantané pris sur le thread Tk : les workers continuent d'écrire dans data_by_page
+        self.snapshot = list(data_by_page.items()) if data_by_page else []
+        self.index = {view: [] for view in self.VIEWS}
+        self.pages_by_id = {}
+        self.filtered = []
+        self.current_page = 0
+        self.index_ready = False
+
+        self.setup_window()
+
+        if self.snapshot:
+            self.status_var.set(f"Indexation de {len(self.snapshot)} pages...")
+            threading.Thread(target=self.build_index, daemon=True).start()
+            self.window.after(100, self.poll_index)
+        else:
+            self.status_var.set("Aucune donnée disponible")
+
+    def setup_window(self):
+        toolbar = ttk.Frame(self.window, padding="5")
+        toolbar.pack(fill='x')
+
+        ttk.Label(toolbar, text="Vue:").pack(side=tk.LEFT, padx=5)
+        self.view_var = tk.StringVar(value='pages')
+        view_combo = ttk.Combobox(toolbar, textvariable=self.view_var, values=list(self.VIEWS),
+                                  state='readonly', width=10)
+        view_combo.pack(side=tk.LEFT)
+        view_combo.bind('<<ComboboxSelected>>', lambda e: self.change_view())
+
+        ttk.Label(toolbar, text="Recherche:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT)
+        search_entry.bind('<Return>', lambda e: self.apply_filter())
+        ttk.Button(toolbar, text="Filtrer", command=self.apply_filter).pack(side=tk.LEFT, padx=5)
+
+        self.page_label = ttk.Label(toolbar, text="")
+        self.page_label.pack(side=tk.RIGHT, padx=5)
+        ttk.Button(toolbar, text="›", width=3, command=lambda: self.go_to_page(self.current_page + 1)).pack(side=tk.RIGHT)
+        ttk.Button(toolbar, text="‹", width=3, command=lambda: self.go_to_page(self.current_page - 1)).pack(side=tk.RIGHT)
+
+        paned = ttk.PanedWindow(self.window, orient=tk.VERTICAL)
+        paned.pack(expand=True, fill='both', padx=5, pady=5)
+
+        tree_frame = ttk.Frame(paned)
+        self.tree = ttk.Treeview(tree_frame, show='headings', selectmode='browse')
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, expand=True, fill='both')
+        scrollbar.pack(side=tk.RIGHT, fill='y')
+        self.tree.bind('<<TreeviewSelect>>', lambda e: self.show_detail())
+        paned.add(tree_frame, weight=3)
+
+        self.detail_text = scrolledtext.ScrolledText(paned, wrap=tk.WORD, height=10)
+        paned.add(self.detail_text, weight=1)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.status_var, padding="5").pack(fill='x')
+
+        self.configure_columns()
+
+    def build_index(self):
+        """Construit les lignes de chaque vue (exécuté hors du thread Tk)
+
+        Chaque ligne est un tuple (valeurs affichées, clé de recherche, référence)
+        où la référence permet de retrouver l'enregistrement complet.
+        """
+        pages, items, contacts = [], [], []
+        for page_id, page in self.snapshot:
+            try:
+                url = page.get('url', '')
+                sensitive = page.get('sensitive_data') or {}
+                emails = sensitive.get('emails', [])
+                phones = sensitive.get('phones', [])
+                page_items = page.get('items', [])
+
+                values = (url, page.get('depth', ''), len(page_items), len(emails), len(phones),
+                          page.get('timestamp', ''))
+                pages.append((values, url.lower(), (page_id, 'page', None)))
+
+                for i, item in enumerate(page_items):
+                    values = (url, self.shorten(item.get('title')), self.shorten(item.get('price')),
+                              self.shorten(item.get('link')))
+                    key = ' '.join(str(v) for v in item.values() if v).lower()
+                    items.append((values, key, (page_id, 'item', i)))
+
+                for i, email in enumerate(emails):
+                    values = ('email', email.get('email', ''), email.get('confidence', ''), url)
+                    contacts.append((values, f"email {values[1]} {url}".lower(), (page_id, 'email', i)))
+                for i, phone in enumerate(phones):
+                    values = ('téléphone', phone.get('phone', ''), phone.get('confidence', ''), url)
+                    contacts.append((values, f"téléphone {values[1]} {url}".lower(), (page_id, 'phone', i)))
+            except AttributeError:
+                # Page mal formée : on l'ignore plutôt que d'interrompre l'indexation
+                continue
+
+        self.pages_by_id = dict(self.snapshot)
+        self.index = {'pages': pages, 'items': items, 'contacts': contacts}
+        self.index_ready = True
+
+    def poll_index(self):
+        if not self.window.winfo_exists():
+            return
+        if not self.index_ready:
+            self.window.after(100, self.poll_index)
+            return
+        self.apply_filter()
+
+    def shorten(self, value, limit=120):
+        if value is None:
+            return ''
+        value = str(value)
+        return value if len(value) <= limit else value[:limit - 1] + '…'
+
+    def configure_columns(self):
+        columns = self.VIEWS[self.view_var.get()]
+        self.tree.delete(*self.tree.get_children())
+        self.tree['columns'] = columns
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=300 if column in ('URL', 'Page', 'Titre', 'Valeur') else 90)
+
+    def change_view(self):
+        self.configure_columns()
+        self.apply_filter()
+
+    def apply_filter(self):
+        """Filtre l'index de la vue courante sur le texte recherché"""
+        if not self.index_ready:
+            return
+        rows = self.index[self.view_var.get()]
+        terms = self.search_var.get().lower().split()
+        if terms:
+            self.filtered = [row for row in rows if all(term in row[1] for term in terms)]
+        else:
+            self.filtered = rows
+        self.go_to_page(0)
+
+    def page_count(self):
+        return max(1, (len(self.filtered) + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+
+    def go_to_page(self, page):
+        """Affiche uniquement les lignes de la page demandée"""
+        page = max(0, min(page, self.page_count() - 1))
+        self.current_page = page
+
+        self.tree.delete(*self.tree.get_children())
+        start = page * self.PAGE_SIZE
+        for position, row in enumerate(self.filtered[start:start + self.PAGE_SIZE], start):
+            self.tree.insert('', tk.END, iid=str(position), values=row[0])
+
+        self.page_label.config(text=f"Page {page + 1}/{self.page_count()}")
+        self.status_var.set(f"{len(self.filtered)} lignes sur {len(self.index[self.view_var.get()])} "
+                            f"({len(self.snapshot)} pages)")
+
+    def show_detail(self):
+        """Sérialise uniquement l'enregistrement sélectionné"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        page_id, kind, position = self.filtered[int(selection[0])][2]
+        page = self.pages_by_id.get(page_id, {})
+        try:
+            if kind == 'item':
+                record = page['items'][position]
+            elif kind == 'email':
+                record = page['sensitive_data']['emails'][position]
+            elif kind == 'phone':
+                record = page['sensitive_data']['phones'][position]
+            else:
+                record = export_page(page)
+            text = json.dumps(record, indent=4, ensure_ascii=False, default=str)
+        except Exception as e:
+            text = f"Erreur lors du formatage des données: {str(e)}"
+
+        self.detail_text.config(state=tk.NORMAL)
+        self.detail_text.delete(1.0, tk.END)
+        self.detail_text.insert(tk.END, text)
+        self.detail_text.config(state=tk.DISABLED)
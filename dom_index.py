@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+from bs4 import CData, NavigableString
+
+
+class DomIndex:
+    """Index d'un document construit en un seul parcours de l'arbre
+
+    Le parcours remplit les tables classe -> éléments, id -> éléments,
+    attribut -> éléments et balise -> éléments, et concatène le texte du
+    document en notant pour chaque élément l'intervalle [début, fin) de son
+    texte. `text(element)` devient ainsi une simple découpe de chaîne au lieu
+    d'un nouveau parcours du sous-arbre. De même, les descendants d'un
+    élément occupent les rangs [positions, ends) de `elements`.
+    """
+
+    # Mêmes types de chaînes que Tag.get_text() (pas de commentaires ni de scripts)
+    TEXT_TYPES = (NavigableString, CData)
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.by_class = defaultdict(list)         # classe -> éléments
+        self.by_id = defaultdict(list)
+        self.by_attr = defaultdict(list)          # nom d'attribut -> éléments qui le portent
+        self.by_tag = defaultdict(list)
+        self.elements = []                        # éléments dans l'ordre du document
+        self.positions = {}                       # id(élément) -> rang dans self.elements
+        self.ends = {}                            # id(élément) -> rang qui suit son dernier descendant
+        self.spans = {}                           # id(élément) -> (début, fin) dans self.full_text
+        self._text_cache = {}
+        self._build()
+
+    def _build(self):
+        parts = []
+        offset = 0
+        # Pile explicite (élément, itérateur sur ses enfants) : pas de récursion sur les pages profondes
+        stack = [(self.soup, iter(self.soup.contents), 0)]
+        while stack:
+            node, children, start = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if node is not self.soup:
+                    self.spans[id(node)] = (start, offset)
+                    self.ends[id(node)] = len(self.elements)
+                continue
+            if isinstance(child, NavigableString):
+                if type(child) in self.TEXT_TYPES:
+                    parts.append(child)
+                    offset += len(child)
+                continue
+            self._index_element(child)
+            stack.append((child, iter(child.contents), offset))
+        self.full_text = ''.join(parts)
+
+    def _index_element(self, element):
+        self.positions[id(element)] = len(self.elements)
+        self.elements.append(element)
+        self.by_tag[element.name].append(element)
+        for name, value in element.attrs.items():
+            self.by_attr[name].append(element)
+            if name == 'class':
+                classes = value if isinstance(value, list) else value.split()
+                for class_name in classes:
+                    self.by_class[class_name].append(element)
+            elif name == 'id':
+                self.by_id[value].append(element)
+
+    def text(self, element):
+        """Texte de l'élément, sans espaces de début et de fin (équivalent de get_text().strip())"""
+        if element is self.soup:
+            return self.full_text.strip()
+        key = id(element)
+        text = self._text_cache.get(key)
+        if text is None:
+            span = self.spans.get(key)
+            text = self.full_text[span[0]:span[1]].strip() if span else element.get_text().strip()
+            self._text_cache[key] = text
+        return text
+
+    def with_attr(self, name):
+        """Éléments portant l'attribut, dans l'ordre du document"""
+        return self.by_attr.get(name, [])
+
+    def find_class_or_id(self, pattern):
+        """Éléments dont une classe ou l'id correspond, chacun une seule fois"""
+        return self._in_order(
+            [elements for class_name, elements in self.by_class.items() if pattern.search(class_name)] +
+            [elements for value, elements in self.by_id.items() if pattern.search(value)]
+        )
+
+    def _in_order(self, groups):
+        """Fusionne des listes d'éléments sans doublons, dans l'ordre du document"""
+        unique = {}
+        for elements in groups:
+            for element in elements:
+                unique[id(element)] = element
+        return sorted(unique.values(), key=lambda element: self.positions[id(element)])
+
+    def links(self):
+        """Balises <a> ayant un attribut href"""
+        return [a for a in self.by_tag.get('a', []) if a.has_attr('href')]
@@ -0,0 +1,122 @@
+import soupsieve
+from bs4 import Tag
+from soupsieve import SelectorSyntaxError
+
+
+def simple_matcher(selector):
+    """
+    Vérification rapide des sélecteurs produits par get_unique_selector ("tag", "#id", ".a.b")
+    :return: Fonction élément -> bool, ou None si le sélecteur n'est pas de cette forme
+    """
+    if selector.startswith('#') and selector[1:].replace('-', '_').isidentifier():
+        value = selector[1:]
+        return lambda element: element.get('id') == value
+    if selector.startswith('.') and all(part.replace('-', '_').isidentifier() for part in selector[1:].split('.')):
+        classes = set(selector[1:].split('.'))
+        return lambda element: classes.issubset(element.get('class', ()))
+    if selector.isalnum():
+        name = selector.lower()
+        return lambda element: element.name == name
+    return None
+
+
+def child_path(container, element):
+    """
+    Chemin relatif d'un élément dans son conteneur
+    :return: Rangs successifs parmi les enfants balises (liste vide pour le conteneur lui-même), ou None
+    """
+    path = []
+    while element is not None and element is not container:
+        parent = element.parent
+        if parent is None:
+            return None
+        rank = 0
+        for sibling in parent.contents:
+            if sibling is element:
+                break
+            if isinstance(sibling, Tag):
+                rank += 1
+        path.append(rank)
+        element = parent
+    return path[::-1] if element is container else None
+
+
+class ExtractionPlan:
+    """Structure compilée en plan d'extraction
+
+    Les sélecteurs du conteneur et des champs sont compilés une seule fois avec
+    soupsieve. Quand la structure fournit le chemin relatif d'un champ (voir
+    child_path), l'élément est atteint en suivant ce chemin ; le sélecteur
+    compilé sert à vérifier l'élément trouvé (directement en Python pour les
+    formes simples "tag", "#id" et ".a.b") et, à défaut, à le rechercher.
+    Les chemins partageant un préfixe ne le parcourent qu'une fois par conteneur.
+    """
+
+    def __init__(self, structure):
+        self.structure = structure
+        self.container = structure['container']
+        self.container_selector = soupsieve.compile(self.container)
+        self.fields = []
+        for name, config in structure['fields'].items():
+            path = config.get('path')
+            try:
+                selector = soupsieve.compile(config['selector'])
+            except SelectorSyntaxError:
+                # Classe non valide en CSS : seul le chemin relatif est utilisable
+                selector = None
+            matches = simple_matcher(config['selector']) or (selector.match if selector is not None else None)
+            self.fields.append((
+                name,
+                selector,
+                matches,
+                config.get('attribute'),
+                tuple(path) if path is not None else None
+            ))
+
+    def containers(self, soup):
+        """Conteneurs de la structure dans le document"""
+        return self.container_selector.select(soup)
+
+    def resolve(self, container, path, cache):
+        """Suit un chemin relatif ; cache : préfixe -> élément pour ce conteneur"""
+        element = cache.get(path)
+        if element is not None or path in cache:
+            return element
+        if not path:
+            return container
+        parent = self.resolve(container, path[:-1], cache)
+        element = None
+        if parent is not None:
+            children = [child for child in parent.contents if isinstance(child, Tag)]
+            if path[-1] < len(children):
+                element = children[path[-1]]
+        cache[path] = element
+        return element
+
+    def extract(self, container):
+        """Valeurs des champs d'un conteneur (même convention que extract_data_from_element)"""
+        values = {}
+        cache = {}
+        for name, selector, matches, attribute, path in self.fields:
+            element = None
+            if path is not None:
+                element = self.resolve(container, path, cache)
+                if element is not None and element is not container and matches is not None \
+                        and not matches(element):
+                    element = None
+            if element is None and selector is not None:
+                element = selector.select_one(container)
+            if element is None:
+                values[name] = None
+            elif attribute:
+                values[name] = element.get(attribute, '')
+            else:
+                values[name] = element.get_text().strip()
+        return values
+
+    def rows(self, containers, base_item=None):
+        """Génère un item par conteneur, complété par les champs de base_item"""
+        for container in containers:
+            item = dict(base_item) if base_item else {}
+            item.update(self.extract(container))
+            yield item
@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class Frontier:
+    """File de priorité des URLs à explorer, sans doublons
+
+    Les URLs de plus haute priorité sortent en premier ; à priorité égale,
+    l'ordre d'arrivée est respecté (exploration en largeur). Chaque URL en
+    attente peut porter des indications (lastmod, priorité du sitemap...).
+    Une URL peut aussi être différée (`not_before`) : elle reste en attente
+    mais ne sort qu'une fois l'échéance passée, ce qui sert aux réessais.
+    Les URLs d'un hôte bloqué (disjoncteur ouvert, voir pop) sont mises de
+    côté dans une file par hôte et reviennent dans le tas à son rétablissement.
+    """
+
+    DEFAULT_PRIORITY = 0.5
+
+    def __init__(self):
+        self.heap = []      # (-priorité, ordre, url)
+        self.entries = {}   # url -> [profondeur, priorité] des URLs en attente
+        self.hints = {}     # url -> indications associées
+        self.delayed = []   # (échéance, ordre, url) des URLs différées
+        self.delayed_urls = set()
+        self.parked = {}    # hôte bloqué -> entrées du tas mises de côté
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def add(self, url, depth, priority=None, not_before=None, **hints):
+        """
+        Ajoute une URL, ou met à jour sa profondeur/priorité si elle est déjà en attente
+        :param not_before: Instant (time.monotonic) avant lequel l'URL ne doit pas sortir
+        :return: True si l'URL n'était pas encore en attente
+        """
+        with self.lock:
+            return self._add(url, depth, priority, hints, not_before)
+
+    def add_many(self, entries):
+        """
+        Ajoute un lot d'URLs en une seule prise du verrou
+        :param entries: Itérable de (url, profondeur) ou (url, profondeur, priorité, indications)
+        :return: Nombre de nouvelles URLs
+        """
+        added = 0
+        with self.lock:
+            for entry in entries:
+                url, depth = entry[0], entry[1]
+                priority = entry[2] if len(entry) > 2 else None
+                hints = entry[3] if len(entry) > 3 else {}
+                added += self._add(url, depth, priority, hints)
+        return added
+
+    def _add(self, url, depth, priority, hints, not_before=None):
+        priority = self.DEFAULT_PRIORITY if priority is None else priority
+        if hints:
+            self.hints.setdefault(url, {}).update(hints)
+        current = self.entries.get(url)
+        if current is None:
+            self.entries[url] = [depth, priority]
+            if not_before is not None and not_before > time.monotonic():
+                self.delayed_urls.add(url)
+                heapq.heappush(self.delayed, (not_before, next(self.counter), url))
+            else:
+                heapq.heappush(self.heap, (-priority, next(self.counter), url))
+            return True
+
+        current[0] = min(current[0], depth)
+        if priority > current[1]:
+            current[1] = priority
+            # L'ancienne entrée du tas sera ignorée au dépilement ; une URL
+            # différée prendra sa nouvelle priorité à l'échéance
+            if url not in self.delayed_urls:
+                heapq.heappush(self.heap, (-priority, next(self.counter), url))
+        return False
+
+    def _promote_due(self):
+        """Rend disponibles les URLs différées dont l'échéance est passée"""
+        now = time.monotonic()
+        while self.delayed and self.delayed[0][0] <= now:
+            _, _, url = heapq.heappop(self.delayed)
+            if url not in self.delayed_urls:
+                continue
+            self.delayed_urls.discard(url)
+            current = self.entries.get(url)
+            if current is not None:
+                heapq.heappush(self.heap, (-current[1], next(self.counter), url))
+
+    def _unpark(self, blocked):
+        """Remet dans le tas les URLs des hôtes qui ne sont plus bloqués"""
+        for host in [host for host in self.parked if not blocked(host)]:
+            for item in self.parked.pop(host):
+                heapq.heappush(self.heap, item)
+
+    def pop(self, accept=None, max_scan=1000, blocked=None):
+        """
+        Retire l'URL la plus prioritaire et retourne (url, profondeur), ou None
+        :param accept: Filtre optionnel ; les URLs refusées restent en attente à leur place
+        :param max_scan: Nombre maximal d'URLs refusées examinées avant d'abandonner
+        :param blocked: Prédicat optionnel sur l'hôte ; les URLs d'un hôte bloqué sortent
+                        du tas jusqu'à son rétablissement et ne comptent pas dans max_scan
+        """
+        with self.lock:
+            self._promote_due()
+            if blocked is not None and self.parked:
+                self._unpark(blocked)
+            skipped = []
+            try:
+                while self.heap:
+                    item = heapq.heappop(self.heap)
+                    negative_priority, _, url = item
+                    current = self.entries.get(url)
+                    if current is None or current[1] != -negative_priority:
+                        continue
+                    if blocked is not None:
+                        host = urlparse(url).netloc
+                        if host in self.parked or blocked(host):
+                            self.parked.setdefault(host, []).append(item)
+                            continue
+                    if accept is not None and not accept(url):
+                        skipped.append(item)
+                        if len(skipped) >= max_scan:
+                            return None
+                        continue
+                    del self.entries[url]
+                    self.hints.pop(url, None)
+                    return url, current[0]
+                return None
+            finally:
+                for item in skipped:
+                    heapq.heappush(self.heap, item)
+
+    def reprioritize(self, priorities):
+        """
+        Remplace la priorité des URLs en attente et reconstruit le tas
+        :param priorities: dict url -> priorité (les URLs absentes gardent la leur)
+        """
+        with self.lock:
+            heap = []
+            # entries conserve l'ordre d'arrivée : l'ordre FIFO des ex aequo est préservé
+            for url, entry in self.entries.items():
+                priority = priorities.get(url)
+                if priority is not None:
+                    entry[1] = priority
+                if url not in self.delayed_urls:
+                    heap.append((-entry[1], next(self.counter), url))
+            heapq.heapify(heap)
+            self.heap = heap
+            # Les URLs mises de côté sont dans le nouveau tas : elles le quitteront au prochain pop
+            self.parked = {}
+
+    def pending_urls(self):
+        """Copie de la liste des URLs en attente"""
+        with self.lock:
+            return list(self.entries)
+
+    def discard(self, url):
+        """Retire une URL en attente"""
+        with self.lock:
+            self.entries.pop(url, None)
+            self.hints.pop(url, None)
+            self.delayed_urls.discard(url)
+
+    def parked_count(self):
+        """Nombre d'entrées mises de côté pour des hôtes bloqués"""
+        with self.lock:
+            return sum(len(items) for items in self.parked.values())
+
+    def delayed_count(self):
+        """Nombre d'URLs en attente d'une échéance"""
+        return len(self.delayed_urls)
+
+    def get_hints(self, url):
+        """Retourne les indications d'une URL (vide si aucune)"""
+        return self.hints.get(url, {})
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
@@ -1,14 +1,65 @@
+import time
+STARTED_AT = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
-from main import SiteMapper
-from urllib.parse import urlparse
-import queue
 import json
+from collections import deque
 from datetime import datetime
 from json_parser import JsonParser
+from data_viewer import DataViewer
+from log_pipeline import LOG_LEVELS
+
+class LogBuffer:
+    """Tampon circulaire de logs alimenté par les threads du crawler
+
+    Le filtrage par niveau se fait à l'écriture : un message sous le niveau
+    courant n'est jamais stocké. Si l'interface ne suit pas, les messages
+    les plus anciens sont écartés et comptabilisés.
+    """
+    
+    def __init__(self, maxlen=5000, level='INFO'):
+        self.messages = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.set_level(level)
+    
+    def set_level(self, level):
+        self.min_level = LOG_LEVELS.get(level, LOG_LEVELS['INFO'])
+    
+    def append(self, message, level='INFO'):
+        if LOG_LEVELS.get(level, LOG_LEVELS['INFO']) < self.min_level:
+            return
+        with self.lock:
+            if len(self.messages) == self.messages.maxlen:
+                self.dropped += 1
+            self.messages.append(message if level == 'INFO' else f"[{level}] {message}")
+    
+    def drain(self):
+        """Retourne et vide les messages en attente"""
+        with self.lock:
+            messages = list(self.messages)
+            self.messages.clear()
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            messages.insert(0, f"... {dropped} messages ignorés (interface saturée)")
+        return messages
 
 class ScraperGUI:
+    MAX_LOG_LINES = 2000
+    
+    CONFIG_SCHEMA = {
+        "url": {"type": "string"},
+        "max_pages": {"type": "integer"},
+        "max_depth": {"type": "integer"},
+        "workers": {"type": "integer"},
+        "explore_external": {"type": "boolean"},
+        "respect_robots": {"type": "boolean"},
+        "delay": {"type": "float"},
+        "last_updated": {"type": "date"}
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Web Scraper Pro")
@@ -16,12 +67,19 @@ class ScraperGUI:
         
         # Initialisation des composants
         self.json_parser = JsonParser()
-        self.log_queue = queue.Queue()
-        self.data_queue = queue.Queue()
+        self.config_validator = self.json_parser.compile(self.CONFIG_SCHEMA)
+        self.log_buffer = LogBuffer()
+        self.stats_lock = threading.Lock()
+        self.latest_stats = None
         
         self.setup_gui()
         self.update_logs()
         self.update_stats()
+        self.root.after_idle(self.report_startup_time)
+    
+    def report_startup_time(self):
+        """Indique le délai entre le lancement et l'affichage de la fenêtre"""
+        self.log(f"Fenêtre affichée en {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms")
         
     def setup_gui(self):
         # Frame principal
@@ -130,6 +188,7 @@ class ScraperGUI:
         log_toolbar.grid(row=0, column=0, sticky=(tk.W, tk.E))
         
         self.log_level_var = tk.StringVar(value="INFO")
+        self.log_level_var.trace_add('write', lambda *args: self.set_log_level(self.log_level_var.get()))
         ttk.Label(log_toolbar, text="Niveau:").pack(side=tk.LEFT, padx=5)
         ttk.OptionMenu(log_toolbar, self.log_level_var, "INFO", "DEBUG", "INFO", "WARNING", "ERROR").pack(side=tk.LEFT)
         
@@ -174,19 +233,8 @@ class ScraperGUI:
                 filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
             )
             if filename:
-                schema = {
-                    "url": {"type": "string"},
-                    "max_pages": {"type": "integer"},
-                    "max_depth": {"type": "integer"},
-                    "workers": {"type": "integer"},
-                    "explore_external": {"type": "boolean"},
-                    "respect_robots": {"type": "boolean"},
-                    "delay": {"type": "float"},
-                    "last_updated": {"type": "date"}
-                }
-                
                 # Validation des données avant sauvegarde
-                validated_config = self.json_parser.parse_json(config, schema)
+                validated_config = self.config_validator.validate(config)
                 
                 with open(filename, 'w', encoding='utf-8') as f:
                     json.dump(validated_config, f, indent=4, default=str)
@@ -204,19 +252,8 @@ class ScraperGUI:
                 with open(filename, 'r', encoding='utf-8') as f:
                     json_data = f.read()
                 
-                schema = {
-                    "url": {"type": "string"},
-                    "max_pages": {"type": "integer"},
-                    "max_depth": {"type": "integer"},
-                    "workers": {"type": "integer"},
-                    "explore_external": {"type": "boolean"},
-                    "respect_robots": {"type": "boolean"},
-                    "delay": {"type": "float"},
-                    "last_updated": {"type": "date"}
-                }
-                
                 # Parse et valide la configuration
-                config = self.json_parser.parse_json(json_data, schema)
+                config = self.config_validator.validate(self.json_parser.parse_json(json_data))
                 
                 # Mise à jour de l'interface
                 self.url_var.set(config["url"])
@@ -258,26 +295,8 @@ class ScraperGUI:
     
     def show_data(self):
         """Affiche les données extraites dans une nouvelle fenêtre"""
-        data_window = tk.Toplevel(self.root)
-        data_window.title("Données Extraites")
-        data_window.geometry("600x400")
-        
-        # Création d'un widget Text avec scrollbar
-        text_widget = scrolledtext.ScrolledText(data_window, wrap=tk.WORD)
-        text_widget.pack(expand=True, fill='both', padx=5, pady=5)
-        
-        # Récupération des données du SiteMapper
-        if hasattr(self, 'mapper') and hasattr(self.mapper, 'data_by_page'):
-            try:
-                # Utilisation du JsonParser pour formater les données
-                formatted_data = json.dumps(self.mapper.data_by_page, indent=4, default=str)
-                text_widget.insert(tk.END, formatted_data)
-            except Exception as e:
-                text_widget.insert(tk.END, f"Erreur lors du formatage des données: {str(e)}")
-        else:
-            text_widget.insert(tk.END, "Aucune donnée disponible")
-        
-        text_widget.config(state=tk.DISABLED)
+        data_by_page = getattr(getattr(self, 'mapper', None), 'data_by_page', None)
+        DataViewer(self.root, data_by_page)
     
     def pause_scraping(self):
         """Met en pause le scraping"""
@@ -286,45 +305,68 @@ class ScraperGUI:
             self.pause_button.config(text="▶ Reprendre" if self.mapper.pause else "⏸ Pause")
             self.log("Scraping en pause" if self.mapper.pause else "Scraping repris")
     
-    def log(self, message):
-        self.log_queue.put(message)
+    def set_log_level(self, level):
+        """Applique le niveau de logs au tampon et au crawler en cours"""
+        self.log_buffer.set_level(level)
+        if hasattr(self, 'mapper'):
+            self.mapper.set_log_level(level)
+    
+    def log(self, message, level='INFO'):
+        """Ajoute un message au tampon de logs (appelable depuis n'importe quel thread)"""
+        self.log_buffer.append(message, level)
+    
+    def set_stats(self, stats):
+        """Mémorise le dernier instantané de statistiques (appelable depuis n'importe quel thread)"""
+        snapshot = dict(stats)
+        with self.stats_lock:
+            self.latest_stats = snapshot
     
     def update_logs(self):
-        while True:
-            try:
-                message = self.log_queue.get_nowait()
-                self.log_text.insert(tk.END, f"{message}\n")
-                self.log_text.see(tk.END)
-            except queue.Empty:
-                break
+        """Insère en un seul bloc les messages reçus depuis le dernier passage"""
+        messages = self.log_buffer.drain()
+        if messages:
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            
+            # Limiter la taille du widget
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            if line_count > self.MAX_LOG_LINES:
+                self.log_text.delete(1.0, f"{line_count - self.MAX_LOG_LINES + 1}.0")
+            self.log_text.see(tk.END)
         self.root.after(100, self.update_logs)
     
     def update_stats(self):
-        while True:
-            try:
-                stats = self.data_queue.get_nowait()
-                for key, value in stats.items():
-                    if key in self.stats_text:
-                        self.stats_text[key].set(f"{key.replace('_', ' ').title()}: {value}")
-                self.progress_var.set(min(100, stats.get('progress', 0)))
-            except queue.Empty:
-                break
+        """Applique uniquement le dernier instantané de statistiques reçu"""
+        with self.stats_lock:
+            stats, self.latest_stats = self.latest_stats, None
+        if stats is not None:
+            for key, value in stats.items():
+                if key in self.stats_text:
+                    self.stats_text[key].set(f"{key.replace('_', ' ').title()}: {value}")
+            self.progress_var.set(min(100, stats.get('progress', 0)))
         self.root.after(100, self.update_stats)
     
     def start_scraping(self):
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
+        self.pause_button.config(state=tk.NORMAL, text="⏸ Pause")
         self.scraping_active = True
         
         # Démarrer le scraping dans un thread séparé
         threading.Thread(target=self.run_scraper, daemon=True).start()
     
     def stop_scraping(self):
+        """Demande l'arrêt du crawler ; les résultats partiels sont sauvegardés à la fin de run_scraper"""
         self.scraping_active = False
         self.stop_button.config(state=tk.DISABLED)
-        self.start_button.config(state=tk.NORMAL)
+        self.pause_button.config(state=tk.DISABLED)
+        if hasattr(self, 'mapper'):
+            self.mapper.stop()
+            self.log(f"Arrêt demandé : fin des pages en cours (au plus {self.mapper.drain_timeout}s)")
     
     def run_scraper(self):
+        # Import différé : le crawler et ses dépendances ne retardent pas l'ouverture de la fenêtre
+        from main import SiteMapper, save_results
+        
         try:
             url = self.url_var.get()
             max_pages = int(self.max_pages_var.get())
@@ -335,8 +377,10 @@ class ScraperGUI:
             self.log(f"Démarrage du scraping de {url}")
             
             mapper = SiteMapper(url, explore_external=explore_external)
+            self.mapper = mapper
             mapper.log_callback = self.log
-            mapper.stats_callback = lambda stats: self.data_queue.put(stats)
+            mapper.set_log_level(self.log_level_var.get())
+            mapper.stats_callback = self.set_stats
             
             data = mapper.explore_site(
                 max_pages=max_pages,
@@ -345,18 +389,7 @@ class ScraperGUI:
             )
             
             # Sauvegarder les résultats
-            output_file = f"data_{urlparse(url).netloc.replace('.', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'metadata': {
-                        'base_url': url,
-                        'total_pages': len(data),
-                        'total_internal_pages': len([p for p in data.values() if urlparse(p['url']).netloc == urlparse(url).netloc]),
-                        'total_external_pages': len([p for p in data.values() if urlparse(p['url']).netloc != urlparse(url).netloc]),
-                        'timestamp': datetime.now().isoformat()
-                    },
-                    'pages': data
-                }, f, ensure_ascii=False, indent=4)
+            output_file = save_results(url, data)
             
             self.log(f"\nScraping terminé. Données sauvegardées dans {output_file}")
             
@@ -365,6 +398,7 @@ class ScraperGUI:
         
         finally:
             self.stop_button.config(state=tk.DISABLED)
+            self.pause_button.config(state=tk.DISABLED, text="⏸ Pause")
             self.start_button.config(state=tk.NORMAL)
 
 def main():
@@ -1,8 +1,75 @@
+import codecs
 import json
+import mmap
+import os
 from datetime import datetime
 from urllib.parse import urlparse
 import re
 
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+class ValidationError(ValueError):
+    """Erreur de validation, avec le chemin du champ fautif"""
+    
+    def __init__(self, message, path=()):
+        super().__init__(message)
+        self.path = tuple(path)
+    
+    @property
+    def field(self):
+        return '.'.join(str(part) for part in self.path)
+
+class CompiledSchema:
+    """Validateur réutilisable produit par JsonParser.compile"""
+    
+    def __init__(self, schema, validator):
+        self.schema = schema
+        self._validator = validator
+    
+    def validate(self, data):
+        """Valide et convertit un enregistrement, lève ValidationError au premier problème"""
+        return self._validator(data)
+    
+    __call__ = validate
+    
+    def validate_many(self, records, max_errors=None):
+        """
+        Valide une liste d'enregistrements sans s'arrêter à la première erreur
+        :param records: Enregistrements à valider
+        :param max_errors: Nombre d'erreurs au-delà duquel on arrête (optionnel)
+        :return: (enregistrements valides convertis, liste des erreurs)
+        """
+        errors = []
+        valid = list(self.validate_stream(records, errors, max_errors))
+        return valid, errors
+    
+    def validate_stream(self, records, errors=None, max_errors=None):
+        """
+        Valide les enregistrements un par un au fil de l'itération
+        :param records: Itérable d'enregistrements
+        :param errors: Liste recevant les erreurs {'index', 'field', 'error'} (optionnelle)
+        :param max_errors: Nombre d'erreurs au-delà duquel on arrête (optionnel)
+        :return: Générateur des enregistrements valides convertis
+        """
+        validator = self._validator
+        error_count = 0
+        for index, record in enumerate(records):
+            try:
+                yield validator(record)
+            except ValueError as e:
+                error_count += 1
+                if errors is not None:
+                    errors.append({
+                        'index': index,
+                        'field': e.field if isinstance(e, ValidationError) else '',
+                        'error': str(e)
+                    })
+                if max_errors is not None and error_count >= max_errors:
+                    return
+
+def _identity(value):
+    return value
+
 class JsonParser:
     """Classe pour parser et valider les données JSON en différents types"""
     
@@ -38,29 +105,61 @@ class JsonParser:
             return self._validate_and_convert(data, schema)
         return data
 
-    def _validate_and_convert(self, data, schema):
+    def stream_file(self, path, schema=None, **options):
         """
-        Valide et convertit les données selon le schéma
-        :param data: Données à valider
+        Parcourt un fichier de crawl sauvegardé page par page (voir CrawlFileReader)
+        :param path: Chemin du fichier data_*.json ou .jsonl
+        :param schema: Schéma (ou CompiledSchema) appliqué à chaque page (optionnel)
+        :return: CrawlFileReader
+        """
+        return CrawlFileReader(path, schema=schema, parser=self, **options)
+
+    def compile(self, schema):
+        """
+        Compile un schéma en validateur réutilisable
+        Les convertisseurs sont résolus une seule fois ; valider un enregistrement
+        revient ensuite à appeler des fonctions déjà construites.
         :param schema: Schéma de validation
-        :return: Données validées et converties
+        :return: CompiledSchema
         """
-        if isinstance(schema, dict):
-            if 'type' not in schema:
-                return {k: self._validate_and_convert(v, schema.get(k, {})) for k, v in data.items()}
-            
+        return CompiledSchema(schema, self._compile_node(schema, ()))
+
+    def _compile_node(self, schema, path):
+        if not isinstance(schema, dict):
+            return _identity
+        
+        if 'type' in schema:
             required_type = schema['type']
             converter = self.type_converters.get(required_type)
-            
             if not converter:
                 raise ValueError(f"Type non supporté: {required_type}")
             
-            try:
-                return converter(data)
-            except Exception as e:
-                raise ValueError(f"Erreur de conversion en {required_type}: {str(e)}")
+            def convert(value):
+                try:
+                    return converter(value)
+                except Exception as e:
+                    raise ValidationError(f"Erreur de conversion en {required_type}: {str(e)}", path)
+            return convert
         
-        return data
+        if not schema:
+            return _identity
+        
+        fields = {key: self._compile_node(sub_schema, path + (key,)) for key, sub_schema in schema.items()}
+        
+        def convert_object(value):
+            if not isinstance(value, dict):
+                raise ValidationError(f"Objet attendu, reçu {type(value).__name__}", path)
+            return {k: fields.get(k, _identity)(v) for k, v in value.items()}
+        return convert_object
+
+    def _validate_and_convert(self, data, schema):
+        """
+        Valide et convertit les données selon le schéma
+        :param data: Données à valider
+        :param schema: Schéma de validation
+        :return: Données validées et converties
+        """
+        return self.compile(schema).validate(data)
 
     def _parse_date(self, value):
         """Parse une chaîne en date"""
@@ -77,8 +176,7 @@ class JsonParser:
         if not isinstance(value, str):
             raise ValueError("L'email doit être une chaîne de caractères")
         
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, value):
+        if not EMAIL_REGEX.match(value):
             raise ValueError(f"Email invalide: {value}")
         return value
 
@@ -95,6 +193,219 @@ class JsonParser:
         except ValueError:
             raise ValueError(f"URL invalide: {value}")
 
+class _IncrementalJson:
+    """Tampon de décodage JSON alimenté par morceaux d'octets"""
+    
+    WHITESPACE = ' \t\r\n'
+    
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+    
+    def fill(self, min_size=0):
+        """
+        Lit au moins un morceau en ne gardant que la partie non consommée
+        :param min_size: Continue jusqu'à ce que cette partie atteigne min_size caractères (ou la fin du fichier)
+        """
+        parts = [self.buffer[self.pos:]]
+        size = len(parts[0])
+        while True:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self.text_decoder.decode(b'', final=True)
+            else:
+                text = self.text_decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+            if self.eof or size >= min_size:
+                break
+        # Une seule concaténation pour tous les morceaux lus
+        self.buffer = ''.join(parts)
+        self.pos = 0
+    
+    def peek(self):
+        """Retourne le prochain caractère significatif sans le consommer ('' en fin de fichier)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                break
+            self.fill()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ''
+    
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON invalide: '{char}' attendu, trouvé '{found}'")
+        self.pos += 1
+    
+    def value(self):
+        """Décode la valeur JSON suivante, en lisant autant de morceaux que nécessaire"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+                # Un nombre en fin de tampon peut continuer dans le morceau suivant
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"JSON invalide: {str(e)}")
+            # Valeur incomplète : la partie en attente double avant le nouvel essai, si bien qu'une
+            # grosse valeur est redécodée O(log n) fois et non une fois par morceau
+            self.fill(2 * (len(self.buffer) - self.pos))
+
+class CrawlFileReader:
+    """
+    Lecture incrémentale d'un fichier de crawl sauvegardé (data_<domaine>_<date>.json)
+    Les entrées de "pages" sont décodées une à une : la mémoire utilisée est bornée
+    par la plus grosse page et non par la taille du fichier. Les formats indenté
+    (save_results) et ligne par ligne (.jsonl) sont pris en charge.
+    """
+    
+    def __init__(self, path, schema=None, parser=None, chunk_size=1 << 20, use_mmap=False,
+                 line_delimited=None):
+        """
+        :param path: Chemin du fichier
+        :param schema: Schéma (dict ou CompiledSchema) appliqué à chaque page (optionnel)
+        :param chunk_size: Taille des lectures en octets
+        :param use_mmap: Lit le fichier via un mapping mémoire plutôt que par read()
+        :param line_delimited: Force le format ligne par ligne (détection automatique par défaut)
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.line_delimited = line_delimited
+        if isinstance(schema, dict):
+            schema = (parser or JsonParser()).compile(schema)
+        self.validator = schema
+        self.metadata = {}
+        self.errors = []
+    
+    def __iter__(self):
+        """Itère sur les couples (identifiant de page, page)"""
+        self.errors = []
+        with open(self.path, 'rb') as f:
+            line_delimited = self.line_delimited
+            if line_delimited is None:
+                line_delimited = self._detect_line_delimited(f)
+            
+            if self.use_mmap and os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield from self._iter_entries(self._mmap_chunks(mapped), line_delimited)
+            else:
+                yield from self._iter_entries(iter(lambda: f.read(self.chunk_size), b''), line_delimited)
+    
+    def pages(self):
+        """Itère uniquement sur les pages"""
+        for _, page in self:
+            yield page
+    
+    def _mmap_chunks(self, mapped):
+        for start in range(0, len(mapped), self.chunk_size):
+            yield mapped[start:start + self.chunk_size]
+    
+    def _detect_line_delimited(self, f):
+        """Un fichier .jsonl commence par une ligne qui est à elle seule un objet JSON complet"""
+        if self.path.endswith(('.jsonl', '.ndjson')):
+            return True
+        head = f.read(64 * 1024)
+        f.seek(0)
+        first_line = head.split(b'\n', 1)[0].strip()
+        if not first_line or len(first_line) == len(head.strip()):
+            return False
+        try:
+            return isinstance(json.loads(first_line), dict)
+        except ValueError:
+            return False
+    
+    def _iter_entries(self, chunks, line_delimited):
+        entries = self._iter_lines(chunks) if line_delimited else self._iter_document(chunks)
+        for page_id, page in entries:
+            if self.validator is not None:
+                try:
+                    page = self.validator.validate(page)
+                except ValueError as e:
+                    self.errors.append({
+                        'page_id': page_id,
+                        'field': e.field if isinstance(e, ValidationError) else '',
+                        'error': str(e)
+                    })
+                    continue
+            yield page_id, page
+    
+    def _iter_document(self, chunks):
+        """Parcourt {"metadata": {...}, "pages": {id: page, ...}} sans le charger entièrement"""
+        stream = _IncrementalJson(chunks)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key == 'pages':
+                stream.expect('{')
+                if stream.peek() == '}':
+                    stream.pos += 1
+                else:
+                    while True:
+                        page_id = stream.value()
+                        stream.expect(':')
+                        yield page_id, stream.value()
+                        if stream.peek() == ',':
+                            stream.pos += 1
+                            continue
+                        stream.expect('}')
+                        break
+            elif key == 'metadata':
+                self.metadata.update(stream.value())
+            else:
+                # Clé de premier niveau inconnue : conservée telle quelle
+                self.metadata[key] = stream.value()
+            
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            break
+    
+    def _iter_lines(self, chunks):
+        """Parcourt un fichier où chaque ligne est {"metadata": ...} ou {"page_id": ..., "page": ...}"""
+        pending = b''
+        for chunk in chunks:
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                entry = self._parse_line(line)
+                if entry is not None:
+                    yield entry
+        entry = self._parse_line(pending)
+        if entry is not None:
+            yield entry
+    
+    def _parse_line(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"JSON invalide: {str(e)}")
+        if 'metadata' in record and 'page' not in record:
+            self.metadata.update(record['metadata'])
+            return None
+        if 'page' in record:
+            return record.get('page_id'), record['page']
+        # Ligne contenant directement une page
+        return record.get('page_id'), record
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     # Création d'un parseur
@@ -131,3 +442,13 @@ if __name__ == "__main__":
             print(f"{key}: {value} ({type(value).__name__})")
     except ValueError as e:
         print(f"Erreur de validation: {e}")
+    
+    # Exemple 3: validation d'une liste d'enregistrements avec un schéma compilé
+    validateur = parser.compile({"email": {"type": "email"}, "age": {"type": "integer"}})
+    valides, erreurs = validateur.validate_many([
+        {"email": "a@example.com", "age": "31"},
+        {"email": "pas-un-email", "age": 20},
+        {"email": "b@example.com", "age": "?"}
+    ])
+    print("\nExemple 3 - Validation par lots:")
+    print(f"{len(valides)} valide(s), erreurs: {erreurs}")
@@ -0,0 +1,128 @@
+import threading
+from array import array
+
+from records import UrlTable
+
+# NumPy n'est importé qu'au calcul des scores ou à l'export
+
+
+class LinkGraph:
+    """Graphe des liens entre pages, avec identifiants entiers
+
+    Les URLs sont internées dans une UrlTable (celle du PageStore pour ne pas
+    les dupliquer). Les liens sortants de chaque page explorée sont ajoutés au
+    fil de l'eau dans des tableaux d'entiers ; la forme CSR (indptr, indices)
+    n'est reconstruite que lorsqu'un calcul en a besoin et que le graphe a changé.
+    """
+
+    def __init__(self, table=None):
+        self.table = table if table is not None else UrlTable()
+        self.adjacency = {}      # id source -> array('I') des ids cibles
+        self.pages_since_rank = 0
+        self.edge_count = 0
+        self.lock = threading.Lock()
+        self._csr = None
+
+    def add_page(self, url, links):
+        """Enregistre les liens sortants d'une page explorée (remplace les précédents)"""
+        source = self.table.intern(url)
+        targets = array('I', sorted({self.table.intern(link) for link in links if link != url}))
+        with self.lock:
+            previous = self.adjacency.get(source)
+            self.edge_count += len(targets) - (len(previous) if previous is not None else 0)
+            self.adjacency[source] = targets
+            self.pages_since_rank += 1
+            self._csr = None
+        return source
+
+    def csr(self):
+        """
+        Graphe au format CSR
+        :return: (indptr, indices) : les cibles du nœud i sont indices[indptr[i]:indptr[i + 1]]
+        """
+        import numpy as np
+
+        with self.lock:
+            if self._csr is not None and len(self._csr[0]) == len(self.table) + 1:
+                return self._csr
+            node_count = len(self.table)
+            degrees = np.zeros(node_count, dtype=np.int64)
+            for source, targets in self.adjacency.items():
+                degrees[source] = len(targets)
+            indptr = np.zeros(node_count + 1, dtype=np.int64)
+            np.cumsum(degrees, out=indptr[1:])
+            indices = np.empty(int(indptr[-1]), dtype=np.int32)
+            for source, targets in self.adjacency.items():
+                indices[indptr[source]:indptr[source + 1]] = np.frombuffer(targets, dtype=np.uint32)
+            self._csr = (indptr, indices)
+            return self._csr
+
+    def in_degree(self):
+        """Nombre de liens entrants de chaque nœud"""
+        import numpy as np
+
+        indptr, indices = self.csr()
+        return np.bincount(indices, minlength=len(indptr) - 1)
+
+    def pagerank(self, damping=0.85, iterations=30, tolerance=1e-6):
+        """PageRank approché par itérations de puissance
+
+        La masse des nœuds sans lien sortant (pages pas encore explorées) est
+        redistribuée uniformément.
+        """
+        import numpy as np
+
+        indptr, indices = self.csr()
+        node_count = len(indptr) - 1
+        if node_count == 0:
+            return np.zeros(0)
+        out_degree = np.diff(indptr)
+        sources = np.repeat(np.arange(node_count), out_degree)
+        dangling = out_degree == 0
+        safe_degree = np.where(dangling, 1, out_degree)
+
+        rank = np.full(node_count, 1.0 / node_count)
+        for _ in range(iterations):
+            shares = (rank / safe_degree)[sources]
+            updated = np.bincount(indices, weights=shares, minlength=node_count)
+            updated = damping * (updated + rank[dangling].sum() / node_count) + (1 - damping) / node_count
+            converged = np.abs(updated - rank).sum() < tolerance
+            rank = updated
+            if converged:
+                break
+        return rank
+
+    def priorities(self, urls, measure='pagerank'):
+        """
+        Priorités de frontière (0 à 1) selon l'importance relative des URLs données
+        :param measure: 'pagerank' ou 'in_degree'
+        :return: dict url -> priorité ; les URLs inconnues du graphe sont absentes
+        """
+        import numpy as np
+
+        scores = self.in_degree() if measure == 'in_degree' else self.pagerank()
+        with self.lock:
+            self.pages_since_rank = 0
+        known = [(url, self.table.ids[url]) for url in urls if self.table.ids.get(url, len(scores)) < len(scores)]
+        if not known:
+            return {}
+        values = scores[np.fromiter((node for _, node in known), dtype=np.int64, count=len(known))]
+        # Rang centile : robuste à l'échelle des scores et aux ex aequo nombreux du PageRank
+        order = values.argsort(kind='stable').argsort(kind='stable')
+        percentiles = order / max(len(known) - 1, 1)
+        return {url: float(priority) for (url, _), priority in zip(known, percentiles)}
+
+    def export(self, path):
+        """Écrit le graphe (indptr, indices, urls, in_degree, pagerank) dans une archive NumPy .npz"""
+        import numpy as np
+
+        indptr, indices = self.csr()
+        np.savez_compressed(
+            path,
+            indptr=indptr,
+            indices=indices,
+            urls=np.array(self.table.urls[:len(indptr) - 1], dtype=str),
+            in_degree=self.in_degree(),
+            pagerank=self.pagerank()
+        )
+        return path
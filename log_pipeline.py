@@ -0,0 +1,156 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Niveaux proposés par l'interface et la ligne de commande
+LOG_LEVELS = {'DEBUG': logging.DEBUG, 'INFO': logging.INFO, 'WARNING': logging.WARNING, 'ERROR': logging.ERROR}
+
+# Attributs présents sur tout LogRecord : le reste provient de `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """Limite les messages répétitifs : au plus `burst` messages par modèle et par fenêtre de `interval` secondes
+
+    Le modèle est le message avant formatage (record.msg) : les appels doivent
+    passer leurs valeurs en arguments (logger.info("Page %s", url)) pour être
+    regroupés. Le nombre de messages écartés est indiqué sur le premier message
+    accepté de la fenêtre suivante.
+    """
+
+    def __init__(self, burst=10, interval=10.0, max_templates=10000):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_templates = max_templates
+        self.windows = {}  # (logger, niveau, modèle) -> [début de fenêtre, acceptés, écartés]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None:
+                if len(self.windows) >= self.max_templates:
+                    self.windows.clear()
+                window = self.windows[key] = [now, 0, 0]
+            elif now - window[0] >= self.interval:
+                suppressed = window[2]
+                window[:] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """Une ligne JSON par message, avec les champs passés dans `extra`"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui laisse l'exception sur l'enregistrement
+
+    QueueHandler.prepare copie la trace dans le message et efface exc_info :
+    les formateurs du thread d'écriture la mettent ici eux-mêmes en forme
+    (champ 'exception' de StructuredFormatter).
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        # La trace est mise en texte une seule fois, dans le thread appelant
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+class _SuppressedFormatter(logging.Formatter):
+    """Format texte habituel, complété du nombre de messages écartés par RateLimitFilter"""
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} ({suppressed} messages similaires écartés)" if suppressed else text
+
+
+def configure_logging(log_file='scraper.log', level=logging.INFO, max_bytes=10 * 2**20, backup_count=5,
+                      console=True, structured=False, burst=10, interval=10.0):
+    """
+    Installe le pipeline de logs asynchrone (une seule fois par processus)
+
+    Les threads appelants ne font que déposer l'enregistrement dans une file
+    (QueueHandler) ; un thread dédié (QueueListener) l'écrit dans un fichier
+    tourné par taille et sur la console.
+    :param structured: Écrit le fichier en lignes JSON (voir StructuredFormatter)
+    :param burst: Messages acceptés par modèle et par fenêtre de `interval` secondes
+    :return: QueueListener du pipeline
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        handlers = []
+        if log_file:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+            )
+            file_handler.setFormatter(StructuredFormatter() if structured else _SuppressedFormatter(LOG_FORMAT))
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(_SuppressedFormatter(LOG_FORMAT))
+            handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(burst, interval))
+        root = logging.getLogger()
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Les derniers messages sont écrits avant la sortie du processus
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Écrit les messages en attente et arrête le thread d'écriture"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
@@ -1,21 +1,35 @@
-from scraper import WebScraper
-from selenium.webdriver.common.by import By
+from scraper import WebScraper, DriverPool, TabPool
 import time
-from tqdm import tqdm
 import json
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 import re
-from bs4 import BeautifulSoup, Comment
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import hashlib
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+import os
+import threading
 import pickle
-import numpy as np
+import logging
 from json_parser import JsonParser
+from profiler import CrawlProfiler, NULL_STAGE
+from frontier import Frontier
+from dom_index import DomIndex
+from extraction import ExtractionPlan, SelectorSyntaxError, child_path
+from archive import PageArchive
+from records import PageStore, export_page
+from link_graph import LinkGraph
+from recrawl import RecrawlScheduler, content_hash
+from throttle import HostConcurrencyController, CircuitBreaker, RetryPolicy, classify_failure
+from log_pipeline import LOG_LEVELS, configure_logging
+from cancellation import CancellationToken, CancelledError
+from page_budget import PageBudget
+from text_stream import visible_text_chunks
+from url_classifier import UrlClassifier
+
+logger = logging.getLogger('crawler')
+
+# pandas et scikit-learn ne sont importés qu'à l'entraînement ou au chargement d'un modèle
 
 class DataDetector:
     """Classe pour la détection intelligente des données"""
@@ -41,59 +55,137 @@ class DataDetector:
         'instagram': r'instagram\.com/[\w.]+',
     }
     
+    # Recouvrement entre deux fenêtres d'analyse du texte par morceaux (voir scan_chunks)
+    STREAM_OVERLAP = 256
+    CONTEXT_CHARS = 50
+    
+    SENSITIVE_ATTRS = ['data-email', 'data-phone', 'data-user', 'data-id']
+    SENSITIVE_PATTERNS = {
+        pattern: re.compile(pattern, re.I)
+        for pattern in ['email', 'phone', 'contact', 'user', 'profile']
+    }
+    
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(max_features=1000)
-        self.classifier = RandomForestClassifier(n_estimators=100)
+        # Le vectoriseur et le classifieur ne sont construits qu'à l'entraînement ou au chargement
+        self.vectorizer = None
+        self.classifier = None
         self.trained = False
     
-    def extract_all_data(self, text, html):
-        """Extrait toutes les données sensibles du texte et du HTML"""
+    def extract_all_data(self, text, html, index=None):
+        """Extrait toutes les données sensibles du texte et du HTML (index : DomIndex déjà construit)
+        
+        :param text: Texte de la page, ou morceaux (décalage, texte) de visible_text_chunks
+        """
+        if isinstance(text, str):
+            emails, phones, social = self.extract_emails(text), self.extract_phones(text), \
+                self.extract_social_media(text)
+        else:
+            emails, phones, social = self.scan_chunks(text)
         data = {
-            'emails': self.extract_emails(text),
-            'phones': self.extract_phones(text),
-            'social_media': self.extract_social_media(text),
-            'potential_sensitive': self.detect_potential_sensitive(html)
+            'emails': emails,
+            'phones': phones,
+            'social_media': social,
+            'potential_sensitive': self.detect_potential_sensitive(html, index)
         }
         return data
     
-    def extract_emails(self, text):
-        """Extrait tous les emails avec contexte"""
-        emails = []
+    @staticmethod
+    def _matches(pattern, text):
+        """Correspondances (début, texte) d'un motif, sans jamais franchir un saut de ligne
+        
+        Les sauts de ligne séparent les blocs de la page : une correspondance qui
+        en contient un est recherchée à nouveau dans chacun de ses morceaux.
+        """
+        for match in re.finditer(pattern, text, re.I):
+            value = match.group()
+            if '\n' not in value:
+                yield match.start(), value
+                continue
+            start = match.start()
+            for part in value.split('\n'):
+                for sub in re.finditer(pattern, part, re.I):
+                    yield start + sub.start(), sub.group()
+                start += len(part) + 1
+    
+    def _context(self, text, start, value):
+        return text[max(0, start - self.CONTEXT_CHARS):start + len(value) + self.CONTEXT_CHARS].strip()
+    
+    def _find_emails(self, text):
         for pattern in self.EMAIL_PATTERNS:
-            matches = re.finditer(pattern, text, re.I)
-            for match in matches:
-                email = match.group()
-                context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
-                emails.append({
+            for start, email in self._matches(pattern, text):
+                yield start, {
                     'email': email.strip(),
-                    'context': context.strip(),
+                    'context': self._context(text, start, email),
                     'confidence': self.validate_email(email)
-                })
-        return emails
+                }
     
-    def extract_phones(self, text):
-        """Extrait tous les numéros de téléphone avec contexte"""
-        phones = []
+    def _find_phones(self, text):
         for pattern in self.PHONE_PATTERNS:
-            matches = re.finditer(pattern, text, re.I)
-            for match in matches:
-                phone = match.group()
-                context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
-                phones.append({
+            for start, phone in self._matches(pattern, text):
+                yield start, {
                     'phone': self.normalize_phone(phone),
-                    'context': context.strip(),
+                    'context': self._context(text, start, phone),
                     'confidence': self.validate_phone(phone)
-                })
-        return phones
+                }
+    
+    def _find_social(self, text):
+        for platform, pattern in self.SOCIAL_PATTERNS.items():
+            for start, link in self._matches(pattern, text):
+                yield start, (platform, link)
+    
+    def extract_emails(self, text):
+        """Extrait tous les emails avec contexte"""
+        return [email for _, email in self._find_emails(text)]
+    
+    def extract_phones(self, text):
+        """Extrait tous les numéros de téléphone avec contexte"""
+        return [phone for _, phone in self._find_phones(text)]
     
     def extract_social_media(self, text):
         """Extrait les liens des réseaux sociaux"""
-        social = {}
-        for platform, pattern in self.SOCIAL_PATTERNS.items():
-            matches = re.finditer(pattern, text, re.I)
-            social[platform] = [match.group() for match in matches]
+        social = {platform: [] for platform in self.SOCIAL_PATTERNS}
+        for _, (platform, link) in self._find_social(text):
+            social[platform].append(link)
         return social
     
+    def scan_chunks(self, chunks):
+        """
+        Extrait emails, téléphones et réseaux sociaux d'un texte fourni par morceaux
+        
+        Chaque fenêtre d'analyse reprend la fin de la précédente (STREAM_OVERLAP
+        caractères, plus le contexte) : une correspondance à cheval sur deux
+        morceaux est trouvée entière, et signalée une seule fois.
+        :param chunks: Itérable de (décalage, texte) contigus (voir visible_text_chunks)
+        :return: (emails, téléphones, réseaux sociaux) au format de extract_all_data
+        """
+        emails, phones = [], []
+        social = {platform: [] for platform in self.SOCIAL_PATTERNS}
+        window, window_start = '', 0
+        reported = 0  # les correspondances commençant avant cette position ont été traitées
+        
+        def scan(final):
+            # Les correspondances trop près de la fin attendent la fenêtre suivante
+            limit = float('inf') if final else window_start + len(window) - self.STREAM_OVERLAP
+            for finder, sink in ((self._find_emails, emails.append), (self._find_phones, phones.append)):
+                for start, entry in finder(window):
+                    if reported <= window_start + start < limit:
+                        sink(entry)
+            for start, (platform, link) in self._find_social(window):
+                if reported <= window_start + start < limit:
+                    social[platform].append(link)
+            return limit
+        
+        for offset, text in chunks:
+            window += text
+            if len(window) < 2 * self.STREAM_OVERLAP:
+                continue
+            reported = max(reported, scan(final=False))
+            keep = window_start + len(window) - (reported - self.CONTEXT_CHARS)
+            window_start += len(window) - keep
+            window = window[-keep:]
+        scan(final=True)
+        return emails, phones, social
+    
     def normalize_phone(self, phone):
         """Normalise un numéro de téléphone"""
         return re.sub(r'[^\d+]', '', phone)
@@ -115,39 +207,58 @@ class DataDetector:
         digits = re.sub(r'\D', '', phone)
         return min(1.0, len(digits) / 15)
     
-    def detect_potential_sensitive(self, html):
-        """Détecte les données potentiellement sensibles dans le HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
+    def detect_potential_sensitive(self, html, index=None):
+        """Détecte les données potentiellement sensibles dans le HTML
+        
+        Les recherches sont faites sur un DomIndex (construit ici si besoin) :
+        aucune ne reparcourt l'arbre, et un élément n'est signalé qu'une fois
+        même si plusieurs motifs ou sa classe et son id correspondent.
+        """
+        if index is None:
+            index = DomIndex(BeautifulSoup(html, 'html.parser'))
         sensitive_data = []
         
         # Chercher dans les attributs sensibles
-        sensitive_attrs = ['data-email', 'data-phone', 'data-user', 'data-id']
-        for attr in sensitive_attrs:
-            elements = soup.find_all(attrs={attr: True})
-            for elem in elements:
+        for attr in self.SENSITIVE_ATTRS:
+            for elem in index.with_attr(attr):
                 sensitive_data.append({
                     'type': attr,
                     'value': elem[attr],
-                    'context': elem.get_text().strip()
+                    'context': index.text(elem)
                 })
         
         # Chercher dans les classes et IDs sensibles
-        sensitive_patterns = ['email', 'phone', 'contact', 'user', 'profile']
-        for pattern in sensitive_patterns:
-            elements = soup.find_all(class_=re.compile(pattern, re.I))
-            elements.extend(soup.find_all(id=re.compile(pattern, re.I)))
-            for elem in elements:
+        reported = set()
+        for pattern, regex in self.SENSITIVE_PATTERNS.items():
+            for elem in index.find_class_or_id(regex):
+                if id(elem) in reported:
+                    continue
+                reported.add(id(elem))
                 sensitive_data.append({
                     'type': 'potential_' + pattern,
-                    'value': elem.get_text().strip(),
-                    'context': elem.parent.get_text().strip()
+                    'value': index.text(elem),
+                    'context': index.text(elem.parent)
                 })
         
         return sensitive_data
     
-    def train_on_data(self, data_file):
-        """Entraîne le modèle sur des données étiquetées"""
+    def train_on_data(self, data_file, use_hashing=False, n_jobs=None):
+        """Entraîne le modèle sur des données étiquetées
+        
+        :param use_hashing: Utilise un HashingVectorizer (aucun vocabulaire gardé en mémoire)
+        :param n_jobs: Nombre de processus pour l'entraînement et la prédiction
+        """
         try:
+            import pandas as pd
+            from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.model_selection import train_test_split
+            
+            if use_hashing:
+                self.vectorizer = HashingVectorizer(n_features=2 ** 18, alternate_sign=False)
+            else:
+                self.vectorizer = TfidfVectorizer(max_features=1000)
+            self.classifier = RandomForestClassifier(n_estimators=100, n_jobs=n_jobs)
             df = pd.read_json(data_file)
             X = self.vectorizer.fit_transform(df['text'])
             y = df['is_sensitive']
@@ -184,6 +295,106 @@ class DataDetector:
             self.trained = True
         except Exception as e:
             print(f"Erreur lors du chargement du modèle: {str(e)}")
+    
+    def predict_sensitive(self, texts):
+        """Retourne la probabilité que chaque texte soit sensible (traitement vectorisé)"""
+        if not self.trained or not texts:
+            return []
+        X = self.vectorizer.transform(texts)
+        classes = list(self.classifier.classes_)
+        positive = classes.index(True) if True in classes else len(classes) - 1
+        return self.classifier.predict_proba(X)[:, positive]
+
+class SensitiveTextClassifier:
+    """Étape d'inférence du modèle de DataDetector pendant l'exploration
+    
+    Le texte des pages est découpé en blocs, mis en tampon entre les pages
+    puis classé par lots. Le modèle n'est chargé qu'au premier lot, et les
+    blocs jugés sensibles sont ajoutés à `sensitive_data['classified_blocks']`
+    de leur page.
+    """
+    
+    def __init__(self, model_path, batch_size=256, n_jobs=-1, threshold=0.5,
+                 min_block_chars=20, max_block_chars=1000):
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.threshold = threshold
+        self.min_block_chars = min_block_chars
+        self.max_block_chars = max_block_chars
+        self.detector = None
+        self.pending = []  # (données de la page, bloc)
+        self.blocks_classified = 0
+        self.blocks_flagged = 0
+        self.lock = threading.Lock()
+        self.inference_lock = threading.Lock()
+    
+    def split_blocks(self, text):
+        """Découpe le texte d'une page en blocs normalisés
+        
+        :param text: Texte de la page, ou morceaux (décalage, texte) de visible_text_chunks
+        """
+        chunks = [(0, text)] if isinstance(text, str) else text
+        blocks = []
+        for _, chunk in chunks:
+            # Les morceaux se terminent à une limite de bloc, sauf texte très long sans saut de ligne
+            for raw in re.split(r'\n\s*\n|\r?\n', chunk):
+                block = ' '.join(raw.split())
+                if len(block) < self.min_block_chars:
+                    continue
+                for start in range(0, len(block), self.max_block_chars):
+                    blocks.append(block[start:start + self.max_block_chars])
+        return blocks
+    
+    def submit(self, page_data, text):
+        """Ajoute les blocs d'une page au tampon
+        
+        :return: True si un lot est plein : l'appelant le classe avec flush, une fois
+                 son navigateur rendu au pool
+        """
+        blocks = self.split_blocks(text)
+        with self.lock:
+            self.pending.extend((page_data, block) for block in blocks)
+            return len(self.pending) >= self.batch_size
+    
+    def flush(self):
+        """Classe tous les blocs en attente"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return
+        
+        with self.inference_lock:
+            detector = self.load()
+            if detector is None:
+                return
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                scores = detector.predict_sensitive([block for _, block in batch])
+                self.blocks_classified += len(batch)
+                for (page_data, block), score in zip(batch, scores):
+                    if score < self.threshold:
+                        continue
+                    self.blocks_flagged += 1
+                    entry = {'text': block, 'score': round(float(score), 4)}
+                    if hasattr(page_data, 'add_classified_block'):
+                        page_data.add_classified_block(entry)
+                    else:
+                        page_data['sensitive_data'].setdefault('classified_blocks', []).append(entry)
+    
+    def load(self):
+        """Charge le modèle à la première utilisation"""
+        if self.detector is None:
+            detector = DataDetector()
+            detector.load_model(self.model_path)
+            if not detector.trained:
+                # Modèle illisible : on désactive la classification sans bloquer le crawl
+                self.detector = False
+                return None
+            if hasattr(detector.classifier, 'n_jobs'):
+                detector.classifier.n_jobs = self.n_jobs
+            self.detector = detector
+        return self.detector or None
 
 def is_valid_url(url, allow_external=False, base_domain=None):
     """Vérifie si l'URL est valide et utilisable"""
@@ -200,26 +411,92 @@ def is_valid_url(url, allow_external=False, base_domain=None):
     except:
         return False
 
+def extract_links(soup, current_url, domain, index=None):
+    """Sépare les liens de la page en liens internes et externes au domaine"""
+    internal_links = set()
+    external_links = set()
+    
+    # Liens standards
+    anchors = index.links() if index is not None else soup.find_all('a', href=True)
+    for a in anchors:
+        href = a['href']
+        # Convertir les URLs relatives en absolues
+        full_url = urljoin(current_url, href)
+        
+        if is_valid_url(full_url, True, domain):
+            if urlparse(full_url).netloc == domain:
+                internal_links.add(full_url)
+            else:
+                external_links.add(full_url)
+    
+    # Nettoyer les URLs
+    internal_links = {clean_url(url) for url in internal_links}
+    external_links = {clean_url(url) for url in external_links}
+    
+    return internal_links, external_links
+
+def clean_url(url):
+    """Nettoie une URL en retirant les paramètres de tracking et les ancres"""
+    try:
+        parsed = urlparse(url)
+        # Retirer les paramètres de tracking courants
+        query = re.sub(r'utm_[^&]*&?', '', parsed.query)
+        query = re.sub(r'fbclid=[^&]*&?', '', query)
+        # Reconstruire l'URL sans l'ancre
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path}{'?' + query if query else ''}"
+    except:
+        return url
+
 class SiteMapper:
-    def __init__(self, base_url, explore_external=True):
+    def __init__(self, base_url, explore_external=True, pool=None):
         self.base_url = base_url
         self.domain = urlparse(base_url).netloc
         self.visited_urls = set()
-        self.found_urls = set()
-        self.external_urls = set()
-        self.data_by_page = {}
+        self.found_urls = Frontier()
+        self.external_urls = Frontier()
+        self.data_by_page = PageStore()  # Pages conservées sous forme compacte (records.PageRecord)
         self.explore_external = explore_external
-        self.scraper = WebScraper(headless=True)
+        # Avec un pool partagé (exécution par lots), le site n'ouvre aucun navigateur propre
+        self.scraper = WebScraper(headless=True) if pool is None else None
         self.data_detector = DataDetector()
         self.json_parser = JsonParser()
-        self.log_callback = print  # Par défaut, utilise print
+        # Sans log_callback, les messages passent par le pipeline de logs asynchrone (voir log_pipeline)
+        configure_logging()
+        self.logger = logger
+        self.log_callback = None  # callable(message, level) de l'interface, qui reçoit le message formaté
+        self.log_level = LOG_LEVELS['INFO']  # Les messages de niveau inférieur ne sont même pas formatés
+        self.progress_interval = 5.0
         self.stats_callback = lambda x: None  # Par défaut, ne fait rien
-        self.should_stop = False
-        self.pause = False
-        self.connection_pool = []
+        self.cancel_token = CancellationToken()  # Arrêt et pause, honorés par toutes les attentes
+        self.drain_timeout = 30  # Attente maximale des pages en cours après une demande d'arrêt
+        self.active_scrapers = set()
+        self.active_lock = threading.Lock()
         self.max_pool_size = 5
+        self.owns_pool = pool is None
+        self.connection_pool = pool if pool is not None else DriverPool(size=self.max_pool_size)
         self.delay = 2  # Délai entre les requêtes en secondes
         self.respect_robots = True
+        self.profiler = None  # Profilage désactivé par défaut
+        self.text_classifier = None  # Classification ML désactivée par défaut
+        self.item_validator = None  # Validation des items désactivée par défaut
+        self.use_sitemaps = False  # Amorcer la frontière avec les sitemaps du site
+        self.sitemap_state_file = None  # Fichier des lastmod pour ignorer les pages inchangées
+        self.sitemap_ingester = None
+        self.concurrency = None  # Contrôleur AIMD créé par explore_site
+        self.retry_policy = RetryPolicy()  # Réessais des échecs temporaires
+        self.circuit_breaker = CircuitBreaker()  # Met en attente les hôtes défaillants
+        self.attempts = {}  # url -> tentatives échouées
+        self.scroll_harvest = None  # Options du défilement incrémental (désactivé par défaut)
+        self.archive = None  # Archive du HTML rendu (désactivée par défaut)
+        self.link_graph = None  # Graphe des liens et priorisation par importance (désactivés par défaut)
+        self.rerank_every = 50
+        self.rank_measure = 'pagerank'
+        self.recrawl = None  # Recrawl incrémental selon la fréquence de changement (désactivé par défaut)
+        self.network_capture = None  # Options de capture des réponses JSON (désactivée par défaut)
+        self.page_budget = None  # Limites de temps et de taille par page (désactivées par défaut)
+        self.api_validator = None
+        # Ressources non HTML et pièges à crawler écartés avant la file (None pour tout explorer)
+        self.url_classifier = UrlClassifier()
         
         # Statistiques
         self.stats = {
@@ -229,121 +506,499 @@ class SiteMapper:
             'emails_found': 0,
             'phones_found': 0,
             'errors': 0,
+            'retries': 0,
             'progress': 0
         }
         
-        # Initialiser le pool de connexions
-        self.init_connection_pool()
+        # Les navigateurs ne démarrent qu'au premier chargement de page
+        self.created_at = time.perf_counter()
+        self.time_to_first_request = None
     
     def init_connection_pool(self):
-        """Initialise le pool de connexions"""
-        for _ in range(self.max_pool_size):
-            try:
-                scraper = WebScraper(headless=True)
-                self.connection_pool.append(scraper)
-            except Exception as e:
-                self.log(f"Erreur lors de l'initialisation d'une connexion: {str(e)}")
+        """Démarre à l'avance les navigateurs du pool (facultatif)"""
+        try:
+            self.connection_pool.warm()
+            for scraper in list(self.connection_pool.scrapers):
+                scraper.start()
+        except Exception as e:
+            self.log("Erreur lors de l'initialisation d'une connexion: %s", 'ERROR', e)
     
+    def enable_tabs(self, tabs_per_browser=4, size=None):
+        """Fait travailler les workers dans des onglets partagés plutôt qu'un navigateur chacun (voir TabPool)
+        
+        :param tabs_per_browser: Nombre d'onglets hébergés par chaque navigateur
+        :param size: Nombre total d'onglets (max_pool_size par défaut)
+        """
+        if not self.owns_pool:
+            self.log("Pool partagé : les onglets se configurent sur le pool (TabPool)", 'WARNING')
+            return self.connection_pool
+        capture_network = self.connection_pool.capture_network
+        self.connection_pool.close()
+        self.connection_pool = TabPool(size=size or self.max_pool_size, tabs_per_browser=tabs_per_browser,
+                                       capture_network=capture_network)
+        return self.connection_pool
+
+    @property
+    def should_stop(self):
+        return self.cancel_token.cancelled
+
+    @should_stop.setter
+    def should_stop(self, value):
+        if value:
+            self.cancel_token.cancel()
+        else:
+            self.cancel_token.reset()
+
+    @property
+    def pause(self):
+        return self.cancel_token.paused
+
+    @pause.setter
+    def pause(self, value):
+        if value:
+            self.cancel_token.pause()
+        else:
+            self.cancel_token.resume()
+
+    def stop(self):
+        """Demande l'arrêt : les attentes en cours sont interrompues et les pages en cours terminées
+        dans la limite de drain_timeout secondes (voir explore_site)"""
+        self.cancel_token.cancel()
+
     def get_connection(self):
-        """Obtient une connexion du pool"""
+        """Obtient une connexion du pool, à tour de rôle avec les autres sites du pool
+        
+        L'attente d'un navigateur libre est interrompue par une demande d'arrêt (CancelledError).
+        """
         while True:
-            for scraper in self.connection_pool:
-                if not hasattr(scraper, 'in_use') or not scraper.in_use:
-                    scraper.in_use = True
-                    return scraper
-            time.sleep(0.1)
+            try:
+                scraper = self.connection_pool.acquire(owner=self, timeout=1)
+                break
+            except TimeoutError:
+                self.cancel_token.check()
+        scraper.cancel_token = self.cancel_token
+        if self.page_budget is not None:
+            scraper.apply_page_budget(self.page_budget)
+        with self.active_lock:
+            self.active_scrapers.add(scraper)
+        return scraper
     
     def release_connection(self, scraper):
         """Libère une connexion"""
-        scraper.in_use = False
+        with self.active_lock:
+            self.active_scrapers.discard(scraper)
+        scraper.cancel_token = None
+        self.connection_pool.release(scraper)
     
+    def enable_profiling(self, sample_rate=0.1, output_dir='profiles', track_allocations=True,
+                         dump_on_signal=True):
+        """Active le profilage d'une fraction des pages explorées"""
+        self.profiler = CrawlProfiler(
+            sample_rate=sample_rate,
+            output_dir=output_dir,
+            track_allocations=track_allocations
+        )
+        if dump_on_signal and not self.profiler.install_signal_handler():
+            self.log("Dump du profilage sur signal indisponible (thread secondaire ou plateforme)", 'WARNING')
+        return self.profiler
+
+    def enable_classifier(self, model_path, **options):
+        """Active la classification ML des blocs de texte pendant l'exploration"""
+        self.text_classifier = SensitiveTextClassifier(model_path, **options)
+        return self.text_classifier
+
+    def ingest_sitemaps(self):
+        """Amorce la frontière avec les URLs des sitemaps (robots.txt, /sitemap.xml)"""
+        from sitemap import SitemapIngester
+        
+        if self.sitemap_ingester is None:
+            self.sitemap_ingester = SitemapIngester(
+                self.base_url,
+                state_file=self.sitemap_state_file,
+                log=lambda message: self.log(message, 'WARNING')
+            )
+        counts = self.sitemap_ingester.ingest(
+            self.found_urls,
+            canonicalize=self.clean_url,
+            accept=lambda url: self._should_queue(url) and is_valid_url(url, False, self.domain)
+                               and self._is_page(url)
+        )
+        self.log("Sitemaps: %s URLs trouvées, %s ajoutées, %s inchangées depuis le dernier crawl", 'INFO',
+                 counts['found'], counts['added'], counts['unchanged'])
+        return counts
+
+    def set_item_schema(self, schema):
+        """Valide chaque item extrait avec un schéma JsonParser compilé (None pour désactiver)"""
+        self.item_validator = self.json_parser.compile(schema) if schema else None
+        return self.item_validator
+
+    def enable_scroll_harvest(self, max_steps=50, max_items=2000, time_budget=60, pause=1.5, remove_seen=True):
+        """Extrait les items au fil du défilement des flux infinis (voir WebScraper.harvest_scroll)
+        
+        La structure est détectée sur le DOM initial, puis les nouveaux conteneurs sont
+        extraits après chaque lot de défilement ; avec remove_seen, ils sont retirés du
+        DOM pour que la mémoire du navigateur reste stable.
+        """
+        self.scroll_harvest = {
+            'max_steps': max_steps,
+            'max_items': max_items,
+            'time_budget': time_budget,
+            'pause': pause,
+            'remove_seen': remove_seen
+        }
+
+    def enable_archive(self, directory, compression_level=6):
+        """Archive le HTML rendu de chaque page pour pouvoir le réextraire hors ligne (voir reextract_archive)"""
+        self.archive = PageArchive(directory, compression_level)
+        return self.archive
+
+    def enable_link_graph(self, rerank_every=50, measure='pagerank'):
+        """Construit le graphe des liens et réordonne périodiquement la file par importance
+        
+        :param rerank_every: Nombre de pages explorées entre deux calculs de score
+        :param measure: 'pagerank' ou 'in_degree'
+        """
+        self.link_graph = LinkGraph(self.data_by_page.table)
+        self.rerank_every = rerank_every
+        self.rank_measure = measure
+        return self.link_graph
+
+    def rerank_frontier(self):
+        """Donne aux URLs en attente une priorité selon leur importance dans le graphe"""
+        if self.link_graph is None:
+            return
+        with self._profile_stage('rerank'):
+            for frontier in (self.found_urls, self.external_urls):
+                pending = frontier.pending_urls()
+                if pending:
+                    frontier.reprioritize(self.link_graph.priorities(pending, self.rank_measure))
+        self.log("File réordonnée selon le graphe (%s URLs, %s liens)", 'DEBUG',
+                 len(self.link_graph.table), self.link_graph.edge_count)
+
+    def enable_recrawl(self, state_file, budget=None, max_staleness_days=7, threshold=0.5):
+        """Ne revisite que les pages connues susceptibles d'avoir changé (voir RecrawlScheduler)
+        
+        :param state_file: Historique des pages conservé d'un crawl à l'autre
+        :param budget: Nombre maximal de pages connues revisitées par crawl (les nouvelles pages n'en font pas partie)
+        :param max_staleness_days: Âge maximal d'une page avant une visite obligatoire
+        :param threshold: Probabilité de changement à partir de laquelle une page est revisitée
+        """
+        self.recrawl = RecrawlScheduler(state_file, budget=budget, threshold=threshold,
+                                        max_staleness=max_staleness_days * 86400)
+        return self.recrawl
+
+    def plan_recrawl(self):
+        """Ajoute à la frontière les pages connues à revisiter"""
+        planned = self.recrawl.plan()
+        for url, depth, probability in planned:
+            frontier = self.found_urls if urlparse(url).netloc == self.domain else self.external_urls
+            frontier.add(url, depth, priority=probability)
+        self.log("Recrawl: %s pages à revisiter sur %s connues", 'INFO', len(planned), len(self.recrawl))
+        return planned
+
+    def enable_network_capture(self, url_pattern=None, content_types=('application/json', '+json'),
+                               records_path=None, schema=None, max_responses=100, replace_items=False):
+        """Enregistre les réponses JSON des requêtes XHR/fetch de chaque page (voir WebScraper.capture_json_responses)
+        
+        Les réponses sont lues dans le journal réseau de Chrome, puis ajoutées à la
+        page sous 'api_responses' : [{'url', 'status', 'data'}].
+        
+        :param url_pattern: Expression régulière filtrant les URLs des requêtes (ex: r'/api/')
+        :param records_path: Chemin pointé des enregistrements dans la réponse (ex: 'data.products')
+        :param schema: Schéma JsonParser validant chaque enregistrement (optionnel)
+        :param replace_items: Quand une page a fourni des réponses, ne pas défiler ni extraire ses items du DOM
+        """
+        self.network_capture = {
+            'url_pattern': url_pattern,
+            'content_types': tuple(content_types),
+            'max_responses': max_responses,
+            'records_path': records_path.split('.') if records_path else [],
+            'replace_items': replace_items
+        }
+        self.api_validator = self.json_parser.compile(schema) if schema else None
+        if self.owns_pool:
+            self.connection_pool.capture_network = True
+        elif not self.connection_pool.capture_network:
+            self.log("Le pool partagé n'active pas la capture réseau (DriverPool(capture_network=True))", 'WARNING')
+
+    def _capture_api_responses(self, scraper, url):
+        """Réponses JSON arrivées depuis le dernier appel, parsées et validées"""
+        options = self.network_capture
+        captured = []
+        responses = scraper.capture_json_responses(options['url_pattern'], options['content_types'],
+                                                   options['max_responses'])
+        for response in responses:
+            try:
+                data = self.json_parser.parse_json(response['body'])
+            except ValueError:
+                continue
+            for key in options['records_path']:
+                data = data.get(key) if isinstance(data, dict) else None
+            if data is None:
+                continue
+            if self.api_validator is not None:
+                records = data if isinstance(data, list) else [data]
+                data, errors = self.api_validator.validate_many(records)
+                if errors:
+                    self.stats['invalid_api_records'] = self.stats.get('invalid_api_records', 0) + len(errors)
+                    self.log("%s enregistrements invalides dans %s", 'DEBUG', len(errors), response['url'])
+                if not data:
+                    continue
+            captured.append({'url': response['url'], 'status': response['status'], 'data': data})
+        if captured:
+            self.log("%s réponses JSON capturées sur %s", 'DEBUG', len(captured), url)
+        return captured
+
+    def set_page_budget(self, budget=None, **limits):
+        """Borne le temps et la taille de chaque page (voir PageBudget)
+        
+        Exemple : mapper.set_page_budget(wall_time=60, max_nodes=100000, load_strategy='eager')
+        :param budget: PageBudget déjà construit, ou None pour le construire à partir de `limits`
+        """
+        self.page_budget = budget if budget is not None else PageBudget(**limits)
+        return self.page_budget
+
+    def enable_url_classifier(self, probe=False, **options):
+        """Remplace les règles de tri des liens découverts (voir UrlClassifier)
+        
+        :param probe: Sonde HEAD (une par motif d'URL) des liens dont l'extension ne dit rien du contenu
+        :param options: Autres paramètres de UrlClassifier (extensions, pièges, quotas de paramètres...)
+        """
+        self.url_classifier = UrlClassifier(probe=probe, **options)
+        return self.url_classifier
+
+    def _is_page(self, url):
+        return self.url_classifier is None or self.url_classifier.is_page(url)
+
+    def _route_links(self, links):
+        """
+        Trie les liens d'une page avant leur mise en file
+        :return: (pages à explorer, ressources [{'url', 'type'}]) ; les pièges sont écartés
+        """
+        if self.url_classifier is None:
+            return links, []
+        pages, resources = [], []
+        for link in links:
+            route, detail = self.url_classifier.classify(link)
+            if route == 'page':
+                pages.append(link)
+            elif route == 'resource':
+                resources.append({'url': link, 'type': detail})
+            else:
+                self.log("Lien écarté (%s): %s", 'DEBUG', detail, link)
+        return pages, resources
+
+    def _should_queue(self, url):
+        """Un lien découvert est mis en file s'il n'a pas été visité et, en recrawl, s'il est nouveau ou planifié"""
+        return url not in self.visited_urls and (self.recrawl is None or self.recrawl.should_visit(url))
+
+    def export_link_graph(self, path):
+        """Exporte le graphe des liens pour une analyse hors ligne (voir LinkGraph.export)"""
+        if self.link_graph is None:
+            return None
+        return self.link_graph.export(path)
+
+    def _harvest_items(self, scraper, url, structures, time_budget=None):
+        """Défile par lots en extrayant les items apparus à chaque lot"""
+        items = []
+        if not structures:
+            return items
+        plans = []
+        for structure in structures:
+            try:
+                plans.append(ExtractionPlan(structure))
+            except SelectorSyntaxError as e:
+                self.log("Structure %s ignorée: %s", 'WARNING', structure['container'], e)
+        selectors = [plan.container for plan in plans]
+        options = self.scroll_harvest if time_budget is None else dict(self.scroll_harvest, time_budget=time_budget)
+        for batch in scraper.harvest_scroll(selectors, **options):
+            for plan, fragments in zip(plans, batch):
+                items.extend(scrape_fragments(url, plan, fragments))
+        self.log("%s items extraits par défilement incrémental sur %s", 'DEBUG', len(items), url)
+        return items
+
+    def _profile_stage(self, name):
+        """Contexte de mesure d'une étape, sans coût si le profilage est désactivé"""
+        if self.profiler is None:
+            return NULL_STAGE
+        return self.profiler.stage(name)
+
+    def dump_profile(self):
+        """Écrit les rapports de profilage accumulés"""
+        if self.profiler is None:
+            return []
+        try:
+            files = self.profiler.dump()
+            self.log("Rapports de profilage écrits: %s", 'INFO', ', '.join(files))
+            return files
+        except Exception as e:
+            self.log("Erreur lors de l'écriture du profilage: %s", 'ERROR', e)
+            return []
+
     def update_stats(self, **kwargs):
         """Met à jour les statistiques et notifie l'interface"""
         self.stats.update(kwargs)
         self.stats_callback(self.stats)
     
-    def log(self, message):
-        """Envoie un message de log à l'interface"""
-        self.log_callback(message)
+    def set_log_level(self, level):
+        """Niveau minimal des messages transmis à log_callback (DEBUG, INFO, WARNING, ERROR)"""
+        self.log_level = LOG_LEVELS.get(level, LOG_LEVELS['INFO'])
 
-    def extract_all_links(self, soup, current_url):
-        """Extrait tous les liens de la page"""
-        internal_links = set()
-        external_links = set()
-        
-        # Liens standards
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            # Convertir les URLs relatives en absolues
-            full_url = urljoin(current_url, href)
-            
-            if is_valid_url(full_url, True, self.domain):
-                if urlparse(full_url).netloc == self.domain:
-                    internal_links.add(full_url)
-                else:
-                    external_links.add(full_url)
-        
-        # Nettoyer les URLs
-        internal_links = {self.clean_url(url) for url in internal_links}
-        external_links = {self.clean_url(url) for url in external_links}
+    def log(self, message, level='INFO', *args):
+        """Envoie un message de log à l'interface avec son niveau (DEBUG, INFO, WARNING, ERROR)
         
-        return internal_links, external_links
+        Les arguments éventuels ne sont appliqués (message % args) que si le niveau est actif.
+        Le logger reçoit le modèle et ses arguments séparément : RateLimitFilter regroupe
+        ainsi les messages répétitifs d'une URL à l'autre.
+        """
+        levelno = LOG_LEVELS.get(level, LOG_LEVELS['INFO'])
+        if levelno < self.log_level:
+            return
+        if self.log_callback is None:
+            self.logger.log(levelno, message, *args)
+        else:
+            self.log_callback(message % args if args else message, level)
+
+    def extract_all_links(self, soup, current_url, index=None):
+        """Extrait tous les liens de la page (depuis le DomIndex s'il est fourni)"""
+        return extract_links(soup, current_url, self.domain, index)
     
     def clean_url(self, url):
         """Nettoie une URL en retirant les paramètres de tracking et les ancres"""
-        try:
-            parsed = urlparse(url)
-            # Retirer les paramètres de tracking courants
-            query = re.sub(r'utm_[^&]*&?', '', parsed.query)
-            query = re.sub(r'fbclid=[^&]*&?', '', query)
-            # Reconstruire l'URL sans l'ancre
-            return f"{parsed.scheme}://{parsed.netloc}{parsed.path}{'?' + query if query else ''}"
-        except:
-            return url
+        return clean_url(url)
 
     def explore_page(self, url, depth=0, max_depth=2):
-        """Explore une page et extrait ses données"""
+        """Explore une page et extrait ses données
+        
+        Retourne le résultat du chargement (voir WebScraper.navigate_to), ou None
+        si la page n'a pas été chargée.
+        """
+        if self.profiler is None:
+            return self._explore_page(url, depth, max_depth)
+        with self.profiler.page(url):
+            return self._explore_page(url, depth, max_depth)
+
+    def _explore_page(self, url, depth, max_depth):
+        """Corps de explore_page, découpé en étapes mesurables"""
         if url in self.visited_urls or depth > max_depth or self.should_stop:
             return
         
-        while self.pause:
-            time.sleep(1)
-            if self.should_stop:
-                return
+        if not self.cancel_token.wait_if_paused():
+            return
         
         self.visited_urls.add(url)
-        self.log(f"\nExploration de: {url} (profondeur: {depth})")
+        self.log("Exploration de: %s (profondeur: %s)", 'INFO', url, depth)
         
-        scraper = self.get_connection()
         try:
-            if not scraper.navigate_to(url):
-                self.stats['errors'] += 1
-                return
+            scraper = self.get_connection()
+        except CancelledError:
+            self.visited_urls.discard(url)
+            return
+        fetch = None
+        classify_batch = False
+        budget = self.page_budget.track() if self.page_budget is not None else None
+        
+        def step_time(seconds):
+            # Durée accordée à une étape facultative, dans la limite du budget de la page
+            return seconds if budget is None else budget.limit(seconds)
+        
+        try:
+            with self._profile_stage('navigation'):
+                loaded = scraper.navigate_to(url)
+                fetch = scraper.last_fetch
+                if fetch['outcome'] == 'cancelled':
+                    # Arrêt demandé avant ou pendant le chargement : la page reste à explorer
+                    self.visited_urls.discard(url)
+                    return None
+                if not loaded and fetch['outcome'] == 'timeout' and budget is not None and \
+                        self.page_budget.partial_on_timeout and scraper.stop_loading():
+                    # Chargement trop long : extraction partielle de ce qui est déjà rendu
+                    budget.exceed('load_time')
+                elif not loaded or classify_failure(fetch) == 'transient':
+                    # Page d'erreur du serveur (saturé, en panne) : rien à extraire
+                    self._handle_failure(url, depth, fetch)
+                    return fetch
+            
+            if self.time_to_first_request is None:
+                self.time_to_first_request = time.perf_counter() - self.created_at
+                self.stats['time_to_first_request'] = round(self.time_to_first_request, 3)
+                self.log("Première page chargée %.2fs après la création du mapper", 'INFO', self.time_to_first_request)
             
-            # Respecter le délai entre les requêtes
-            time.sleep(self.delay)
+            # Respecter le délai entre les requêtes (un arrêt écourte l'attente : la page déjà
+            # chargée est extraite sans défilement ni attente supplémentaire)
+            self.cancel_token.sleep(self.delay)
+            if budget is not None:
+                budget.check_nodes(scraper)
             
             # Extraire le contenu de la page
-            page_source = scraper.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            with self._profile_stage('parse'):
+                page_source = scraper.driver.page_source
+                soup = BeautifulSoup(page_source, 'html.parser')
+            
+            # Réponses des API chargées par la page (SPA) : avant tout défilement
+            api_responses = None
+            skip_dom_items = False
+            if self.network_capture is not None:
+                with self._profile_stage('network'):
+                    if budget is None or not budget.degraded:
+                        scraper.wait_for_dynamic_content(timeout=step_time(10))
+                    api_responses = self._capture_api_responses(scraper, url)
+                    skip_dom_items = bool(api_responses) and self.network_capture['replace_items']
             
-            # Révéler le contenu caché
-            scraper.reveal_hidden_elements()
-            scraper.expand_all_elements()
-            scraper.scroll_to_bottom()
+            # Révéler le contenu caché (sauté quand la page a dépassé son budget)
+            with self._profile_stage('reveal'):
+                if budget is None or not budget.degraded:
+                    scraper.reveal_hidden_elements()
+                    scraper.expand_all_elements()
+                    if self.scroll_harvest is None and not skip_dom_items:
+                        scraper.scroll_to_bottom(time_budget=step_time(60))
+                    
+                    # Attendre le chargement du contenu dynamique
+                    scraper.wait_for_dynamic_content(timeout=step_time(10))
             
-            # Attendre le chargement du contenu dynamique
-            scraper.wait_for_dynamic_content()
+            if api_responses is not None:
+                # Réponses chargées par le défilement (scrape_with_structure recharge ensuite la page)
+                with self._profile_stage('network'):
+                    api_responses.extend(self._capture_api_responses(scraper, url))
             
             # Extraire à nouveau après les modifications
-            page_source = scraper.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            text_content = soup.get_text()
+            with self._profile_stage('parse'):
+                page_source = scraper.driver.page_source
+                if budget is not None:
+                    page_source = budget.clip_html(page_source)
+                soup = BeautifulSoup(page_source, 'html.parser')
+                # Un seul parcours de l'arbre pour les données sensibles, les liens et la structure
+                index = DomIndex(soup)
+                text_content = index.full_text
+            
+            if self.archive is not None:
+                with self._profile_stage('archive'):
+                    self.archive.store(url, page_source, depth=depth)
             
             # Détecter la structure et les données sensibles
-            structure = detect_data_structure(scraper)
-            items = scrape_with_structure(scraper, url, structure)
-            sensitive_data = self.data_detector.extract_all_data(text_content, page_source)
+            with self._profile_stage('structure'):
+                structure = detect_data_structure(scraper, soup, index)
+            with self._profile_stage('items'):
+                if skip_dom_items:
+                    items = []
+                elif budget is not None and (budget.degraded or budget.remaining() < 10):
+                    # Pas de rechargement ni de défilement : items du DOM déjà analysé
+                    items = scrape_soup(url, structure, soup)
+                elif self.scroll_harvest is not None:
+                    items = self._harvest_items(scraper, url, structure,
+                                                time_budget=step_time(self.scroll_harvest['time_budget']))
+                    if api_responses is not None:
+                        api_responses.extend(self._capture_api_responses(scraper, url))
+                else:
+                    items = scrape_with_structure(scraper, url, structure)
+                if self.item_validator is not None:
+                    items, item_errors = self.item_validator.validate_many(items)
+                    if item_errors:
+                        self.stats['invalid_items'] = self.stats.get('invalid_items', 0) + len(item_errors)
+                        self.log("%s items invalides ignorés sur %s", 'DEBUG', len(item_errors), url)
+            with self._profile_stage('sensitive'):
+                # Texte visible par morceaux : ni scripts ni styles, blocs séparés, mémoire bornée
+                sensitive_data = self.data_detector.extract_all_data(visible_text_chunks(soup), page_source, index)
             
             # Mettre à jour les statistiques
             self.stats['pages_visited'] += 1
@@ -351,7 +1006,17 @@ class SiteMapper:
             self.stats['phones_found'] += len(sensitive_data.get('phones', []))
             
             # Extraire les liens
-            internal_links, external_links = self.extract_all_links(soup, url)
+            with self._profile_stage('links'):
+                internal_links, external_links = self.extract_all_links(soup, url, index)
+            with self._profile_stage('routing'):
+                internal_pages, resources = self._route_links(internal_links)
+                external_pages = []
+                if self.explore_external:
+                    external_pages, external_resources = self._route_links(external_links)
+                    resources.extend(external_resources)
+            
+            if self.link_graph is not None:
+                self.link_graph.add_page(url, internal_links | external_links)
             
             self.stats['internal_links'] = len(self.found_urls) + len(internal_links)
             self.stats['external_links'] = len(self.external_urls) + len(external_links)
@@ -361,168 +1026,415 @@ class SiteMapper:
                 'url': url,
                 'structure': structure,
                 'items': items,
+                **({'api_responses': api_responses} if api_responses is not None else {}),
+                **({'resources': resources} if resources else {}),
                 'sensitive_data': sensitive_data,
                 'internal_links': list(internal_links),
                 'external_links': list(external_links),
                 'timestamp': datetime.now().isoformat(),
                 'depth': depth
             }
+            if budget is not None and budget.exceeded:
+                page_data['budget_exceeded'] = list(budget.exceeded)
+                self.stats['partial_pages'] = self.stats.get('partial_pages', 0) + 1
+                self.log("%s: extraction partielle (budget dépassé: %s)", 'DEBUG', url, ', '.join(budget.exceeded))
             
             page_id = hashlib.md5(url.encode()).hexdigest()
-            self.data_by_page[page_id] = page_data
+            record = self.data_by_page.store(page_id, page_data)
+            if self.sitemap_ingester is not None:
+                self.sitemap_ingester.mark_crawled(url)
+            if self.recrawl is not None and not self.recrawl.record(url, content_hash(text_content), depth):
+                self.stats['unchanged_pages'] = self.stats.get('unchanged_pages', 0) + 1
+            
+            if self.text_classifier is not None:
+                classify_batch = self.text_classifier.submit(record, visible_text_chunks(soup))
             
-            # Ajouter les nouveaux liens à explorer
-            for link in internal_links:
-                if link not in self.visited_urls:
-                    self.found_urls.add((link, depth + 1))
+            # Ajouter les nouveaux liens à explorer (ressources et pièges exclus)
+            for link in internal_pages:
+                if self._should_queue(link):
+                    self.found_urls.add(link, depth + 1)
             
             # Gérer les liens externes
-            if self.explore_external:
-                for link in external_links:
-                    if link not in self.visited_urls:
-                        self.external_urls.add((link, depth + 1))
+            for link in external_pages:
+                if self._should_queue(link):
+                    self.external_urls.add(link, depth + 1)
+            
+            if self.url_classifier is not None:
+                counts = self.url_classifier.counts
+                self.stats['resources_skipped'] = counts['resource']
+                self.stats['traps_dropped'] = counts['trap']
             
             # Mettre à jour la progression
             if len(self.visited_urls) > 0:
                 total_links = len(self.found_urls) + len(self.external_urls) + len(self.visited_urls)
                 self.stats['progress'] = (len(self.visited_urls) / total_links) * 100
             
+            self.attempts.pop(url, None)
             self.update_stats(**self.stats)
             
         except Exception as e:
-            self.log(f"Erreur lors de l'exploration de {url}: {str(e)}")
-            self.stats['errors'] += 1
+            if getattr(scraper, 'crashed', False):
+                # Onglet planté en cours d'extraction : la page est replanifiée dans un nouvel onglet
+                fetch = {'outcome': 'error', 'latency': None, 'status': None, 'error': f"tab crashed: {str(e)}"}
+                self._handle_failure(url, depth, fetch)
+            else:
+                self.log("Erreur lors de l'exploration de %s: %s", 'ERROR', url, e)
+                self.stats['errors'] += 1
         
         finally:
             self.release_connection(scraper)
+        
+        # Inférence après la remise du navigateur : un autre worker charge sa page pendant le classement
+        if classify_batch:
+            try:
+                with self._profile_stage('classifier'):
+                    self.text_classifier.flush()
+            except Exception as e:
+                self.log("Erreur lors de la classification du texte: %s", 'ERROR', e)
+        
+        return fetch
+
+    def _handle_failure(self, url, depth, fetch):
+        """Replanifie une URL en échec temporaire via la frontière, ou la compte comme erreur"""
+        failure = classify_failure(fetch) or 'transient'
+        attempt = self.attempts.get(url, 0) + 1
+        reason = (fetch or {}).get('status') or (fetch or {}).get('error') or 'échec inconnu'
+        if not self.should_stop and self.retry_policy.should_retry(failure, attempt):
+            self.attempts[url] = attempt
+            delay = self.retry_policy.backoff(attempt)
+            frontier = self.found_urls if urlparse(url).netloc == self.domain else self.external_urls
+            # Remise en file avant de quitter visited_urls : un lien découvert entre-temps ne la relance pas plus tôt
+            frontier.add(url, depth, not_before=time.monotonic() + delay)
+            self.visited_urls.discard(url)
+            self.stats['retries'] += 1
+            self.log("%s: %s -> nouvelle tentative dans %.1fs (%s/%s)", 'WARNING',
+                     url, reason, delay, attempt, self.retry_policy.max_retries)
+        else:
+            self.attempts.pop(url, None)
+            self.stats['errors'] += 1
+            self.log("%s abandonnée (%s): %s", 'WARNING', url, failure, reason)
+
+    def _explore_task(self, url, depth, max_depth):
+        """Explore une page en libérant ensuite sa place auprès du contrôleur de concurrence"""
+        host = urlparse(url).netloc
+        fetch = None
+        try:
+            fetch = self.explore_page(url, depth, max_depth)
+            return fetch
+        finally:
+            self.concurrency.finish(host, fetch)
+            if fetch is None:
+                # Page écartée ou arrêt avant le chargement : la sonde éventuelle est rendue
+                self.circuit_breaker.release(host)
+            elif self.circuit_breaker.record(host, classify_failure(fetch)):
+                self.log("Trop d'échecs sur %s : ses URLs sont mises en attente", 'WARNING', host)
+            self.update_stats(host_limits=self.concurrency.snapshot())
+
+    def _submit(self, executor, url, depth, max_depth):
+        self.concurrency.start(urlparse(url).netloc)
+        return executor.submit(self._explore_task, url, depth, max_depth)
+
+    def _host_available(self, url):
+        host = urlparse(url).netloc
+        # Le disjoncteur en dernier : il réserve la sonde d'un hôte en test (rendue si l'URL est écartée)
+        return self.concurrency.can_start(host) and self.circuit_breaker.allow(host)
+
+    def _collect(self, done):
+        """Relève les exceptions des tâches terminées"""
+        for future in done:
+            try:
+                future.result()
+            except Exception as e:
+                self.log("Erreur lors de l'exploration: %s", 'ERROR', e)
+                self.stats['errors'] += 1
+
+    def _drain(self, executor, futures):
+        """Attend la fin des pages en cours, au plus drain_timeout secondes après une demande d'arrêt
+        
+        Passé ce délai, les navigateurs encore occupés sont fermés, ce qui interrompt
+        leurs chargements et scripts ; les pages déjà extraites sont conservées.
+        """
+        deadline = None
+        while futures:
+            if self.should_stop and deadline is None:
+                deadline = time.monotonic() + self.drain_timeout
+                self.log("Arrêt demandé : attente de %s pages en cours (au plus %ss)", 'INFO',
+                         len(futures), self.drain_timeout)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            done, futures = wait(futures, timeout=1)
+            self._collect(done)
+        
+        if futures:
+            with self.active_lock:
+                busy = list(self.active_scrapers)
+            self.log("%s pages interrompues après %ss : fermeture de %s navigateurs", 'WARNING',
+                     len(futures), self.drain_timeout, len(busy))
+            for scraper in busy:
+                try:
+                    scraper.close()
+                except Exception:
+                    pass
+            done, futures = wait(futures, timeout=5)
+            self._collect(done)
+        executor.shutdown(wait=False, cancel_futures=True)
 
     def explore_site(self, max_pages=None, max_depth=2, max_workers=3):
-        """Explore le site entier de manière récursive"""
-        self.should_stop = False
-        self.pause = False
-        self.found_urls.add((self.base_url, 0))
+        """Explore le site entier de manière récursive
+
+        Un arrêt demandé avant le lancement est respecté : pour relancer un mapper
+        arrêté, remettre d'abord should_stop à False.
+        """
+        # max_workers reste le plafond global, chaque hôte s'y adapte
+        self.concurrency = HostConcurrencyController(global_limit=max_workers)
+        self.found_urls.add(self.base_url, 0)
+        if self.recrawl is not None:
+            self.plan_recrawl()
+        if self.use_sitemaps:
+            self.ingest_sitemaps()
         futures = set()
+        last_progress = 0.0
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
             while (self.found_urls or futures or (self.explore_external and self.external_urls)) and \
                   (max_pages is None or len(self.visited_urls) < max_pages) and \
                   not self.should_stop:
                 
-                while self.pause:
-                    time.sleep(1)
-                    if self.should_stop:
-                        break
+                if not self.cancel_token.wait_if_paused():
+                    break
+                
+                if self.link_graph is not None and self.link_graph.pages_since_rank >= self.rerank_every:
+                    self.rerank_frontier()
                 
                 # Soumettre de nouvelles tâches
                 while self.found_urls and len(futures) < max_workers and \
                       (max_pages is None or len(self.visited_urls) < max_pages) and \
                       not self.should_stop:
-                    current_url, depth = self.found_urls.pop()
+                    entry = self.found_urls.pop(accept=self._host_available,
+                                                blocked=self.circuit_breaker.blocked)
+                    if entry is None:
+                        break
+                    current_url, depth = entry
                     if depth <= max_depth and current_url not in self.visited_urls:
-                        future = executor.submit(self.explore_page, current_url, depth, max_depth)
+                        future = self._submit(executor, current_url, depth, max_depth)
                         futures.add(future)
-                        self.log(f"Ajout de {current_url} à la file d'exploration")
+                        self.log("Ajout de %s à la file d'exploration", 'DEBUG', current_url)
+                    else:
+                        self.circuit_breaker.release(urlparse(current_url).netloc)
                 
                 # Explorer les liens externes si activé
                 if self.explore_external and not self.found_urls and self.external_urls and not self.should_stop:
                     while self.external_urls and len(futures) < max_workers and \
                           (max_pages is None or len(self.visited_urls) < max_pages):
-                        current_url, depth = self.external_urls.pop()
+                        entry = self.external_urls.pop(accept=self._host_available,
+                                                       blocked=self.circuit_breaker.blocked)
+                        if entry is None:
+                            break
+                        current_url, depth = entry
                         if depth <= max_depth and current_url not in self.visited_urls:
-                            future = executor.submit(self.explore_page, current_url, depth, max_depth)
+                            future = self._submit(executor, current_url, depth, max_depth)
                             futures.add(future)
-                            self.log(f"Ajout du lien externe {current_url} à la file d'exploration")
+                            self.log("Ajout du lien externe %s à la file d'exploration", 'DEBUG', current_url)
+                        else:
+                            self.circuit_breaker.release(urlparse(current_url).netloc)
                 
                 # Attendre qu'au moins une tâche soit terminée
                 if futures:
-                    done, futures = wait(futures, return_when=FIRST_COMPLETED)
-                    for future in done:
-                        try:
-                            future.result()
-                        except Exception as e:
-                            self.log(f"Erreur lors de l'exploration: {str(e)}")
-                            self.stats['errors'] += 1
+                    # Réveil périodique pour relancer les URLs différées ou les hôtes rétablis
+                    done, futures = wait(futures, timeout=1, return_when=FIRST_COMPLETED)
+                    self._collect(done)
                 else:
-                    time.sleep(1)
+                    self.cancel_token.sleep(1)
                 
-                self.log(f"Progression: {len(self.visited_urls)} pages explorées, "
-                        f"{len(self.found_urls)} liens internes en attente, "
-                        f"{len(self.external_urls)} liens externes en attente")
+                # Ligne de progression limitée à une toutes les progress_interval secondes
+                now = time.monotonic()
+                if now - last_progress >= self.progress_interval:
+                    last_progress = now
+                    self.log("Progression: %s pages explorées, %s liens internes en attente, "
+                             "%s liens externes en attente", 'DEBUG',
+                             len(self.visited_urls), len(self.found_urls), len(self.external_urls))
+        finally:
+            self._drain(executor, futures)
         
-        # Fermer toutes les connexions
-        for scraper in self.connection_pool:
-            try:
-                scraper.close()
-            except:
-                pass
+        if self.profiler is not None:
+            self.dump_profile()
+        
+        if self.text_classifier is not None:
+            self.text_classifier.flush()
+        
+        if self.sitemap_ingester is not None:
+            self.sitemap_ingester.save_state()
+        
+        if self.recrawl is not None:
+            self.recrawl.save_state()
+        
+        # Fermer toutes les connexions, sauf si le pool est partagé avec d'autres sites
+        if self.owns_pool:
+            self.connection_pool.close()
         
         return self.data_by_page
 
-def detect_data_structure(scraper):
-    """Détecte automatiquement la structure des données sur la page"""
-    page_source = scraper.driver.page_source
-    soup = BeautifulSoup(page_source, 'html.parser')
-    
-    # Détection des éléments répétitifs
-    potential_containers = {}
-    for tag in soup.find_all():
-        # Chercher des éléments qui se répètent avec des classes similaires
-        if tag.get('class'):
-            class_key = ' '.join(tag.get('class'))
-            if class_key in potential_containers:
-                potential_containers[class_key] += 1
-            else:
-                potential_containers[class_key] = 1
-    
-    # Trouver les conteneurs principaux (ceux qui se répètent le plus)
-    sorted_containers = sorted(potential_containers.items(), key=lambda x: x[1], reverse=True)
-    main_containers = [container for container, count in sorted_containers[:3] if count > 1]
+def detect_data_structure(scraper, soup=None, index=None, max_structures=3):
+    """Détecte automatiquement la structure des données sur la page
     
-    data_structures = []
-    for container in main_containers:
-        structure = analyze_container(soup, container)
-        if structure['fields']:  # Ne garder que les structures avec des champs détectés
-            data_structures.append(structure)
+    soup et index évitent de relire et de reparcourir une page déjà analysée.
+    Retourne les structures classées par score décroissant (voir detect_repeated_records).
+    """
+    if index is None:
+        if soup is None:
+            soup = BeautifulSoup(scraper.driver.page_source, 'html.parser')
+        index = DomIndex(soup)
+    return detect_repeated_records(index, max_structures=max_structures)
+
+# Indices de champ portés par un élément lui-même, dans l'ordre de FIELD_DETECTORS
+RECORD_FIELDS = ['title', 'price', 'image', 'link', 'description', 'date', 'email', 'phone', 'address']
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+RECORD_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'option', 'br', 'meta', 'link'}
+FIELD_TEXT_PATTERNS = {
+    'price': re.compile(r'\d+[,\.]\d{2}|\d+\s*[€$£¥]|\$\s*\d+'),
+    'date': re.compile(r'\d{2}[/-]\d{2}[/-]\d{4}|\d{4}[/-]\d{2}[/-]\d{2}'),
+    'email': re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'),
+    'phone': re.compile(r'\+?\d{2,}[\s.-]?\d{2,}[\s.-]?\d{2,}'),
+    'address': re.compile(r'\d+\s+rue|\d+\s+avenue|\d+\s+boulevard|BP\s+\d+', re.I)
+}
+CSS_CLASS_REGEX = re.compile(r'^-?[_a-zA-Z][\w-]*$')
+
+def element_field_matrix(index):
+    """Matrice (éléments x RECORD_FIELDS) : 1 si l'élément porte lui-même l'indice du champ"""
+    import numpy as np
     
-    return data_structures
+    columns = {field: position for position, field in enumerate(RECORD_FIELDS)}
+    matrix = np.zeros((len(index.elements), len(RECORD_FIELDS)), dtype=np.int32)
+    for row, element in enumerate(index.elements):
+        name = element.name
+        if name in HEADING_TAGS:
+            matrix[row, columns['title']] = 1
+        elif name == 'img' and element.get('src'):
+            matrix[row, columns['image']] = 1
+        elif name == 'a' and element.get('href'):
+            matrix[row, columns['link']] = 1
+        
+        own_text = ''.join(child for child in element.contents if type(child) in DomIndex.TEXT_TYPES).strip()
+        if not own_text:
+            continue
+        if name in ('p', 'div') and len(own_text) > 50:
+            matrix[row, columns['description']] = 1
+        for field, pattern in FIELD_TEXT_PATTERNS.items():
+            if pattern.search(own_text):
+                matrix[row, columns[field]] = 1
+    return matrix
 
-def analyze_container(soup, container_class):
-    """Analyse détaillée d'un conteneur"""
-    structure = {
-        'container': f".{container_class.replace(' ', '.')}",
-        'fields': {}
-    }
+def detect_repeated_records(index, min_count=3, max_structures=3, min_coverage=0.5):
+    """Détecte les enregistrements répétés de la page
     
-    first_item = soup.find(class_=container_class.split())
-    if not first_item:
-        return structure
-    
-    # Détection améliorée des champs
-    field_detectors = [
-        ('title', detect_title_field),
-        ('price', detect_price_field),
-        ('image', detect_image_field),
-        ('link', detect_link_field),
-        ('description', detect_description_field),
-        ('date', detect_date_field),
-        ('email', detect_email_field),
-        ('phone', detect_phone_field),
-        ('address', detect_address_field)
-    ]
+    Les candidats sont les groupes de frères de même balise (au moins min_count),
+    quelles que soient leurs classes. Les indices de champ de chaque sous-arbre
+    sont obtenus par sommes cumulées sur la matrice des éléments, puis chaque
+    groupe est noté avec NumPy : nombre d'instances, régularité des tailles,
+    couverture des champs sur toutes les instances, pénalisée par leur
+    multiplicité (un conteneur de mise en page regroupe plusieurs fiches et
+    porte donc chaque champ plusieurs fois).
+    :return: Structures {'container', 'fields', 'count', 'score'} par score décroissant
+    """
+    import numpy as np
+    
+    if not index.elements:
+        return []
+    positions, ends = index.positions, index.ends
+    
+    # Groupes de frères de même balise ; les groupes de parents semblables (mêmes balise et
+    # classes, ex. les rangées d'une grille) sont fusionnés. Instances contiguës par groupe.
+    merged = {}
+    for parent in index.elements:
+        siblings = {}
+        for child in parent.contents:
+            if getattr(child, 'name', None) and child.name not in RECORD_SKIP_TAGS:
+                siblings.setdefault(child.name, []).append(child)
+        parent_key = (parent.name, ' '.join(parent.get('class', [])))
+        for tag, members in siblings.items():
+            if len(members) >= 2:
+                merged.setdefault((parent_key, tag), (parent, tag, []))[2].extend(members)
+    groups = [group for group in merged.values() if len(group[2]) >= min_count]
+    if not groups:
+        return []
+    starts = [positions[id(member)] for _, _, members in groups for member in members]
+    
+    matrix = element_field_matrix(index)
+    cumulative = np.vstack([np.zeros((1, matrix.shape[1]), dtype=np.int64), np.cumsum(matrix, axis=0)])
+    starts = np.array(starts, dtype=np.int64)
+    stops = np.array([ends[id(member)] for _, _, members in groups for member in members], dtype=np.int64)
+    counts = np.array([len(members) for _, _, members in groups], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
     
-    for field_name, detector in field_detectors:
-        field_data = detector(first_item)
-        if field_data:
-            structure['fields'][field_name] = field_data
+    # Indices de champ de chaque instance (sous-arbre [start, stop))
+    field_counts = cumulative[stops] - cumulative[starts]
+    present = field_counts > 0
+    sizes = (stops - starts).astype(float)
     
-    return structure
+    mean_size = np.add.reduceat(sizes, offsets) / counts
+    variance = np.maximum(np.add.reduceat(sizes ** 2, offsets) / counts - mean_size ** 2, 0)
+    regularity = 1 / (1 + np.sqrt(variance) / mean_size)
+    coverage = np.add.reduceat(present, offsets, axis=0) / counts[:, None]
+    field_score = np.where(coverage >= min_coverage, coverage, 0).sum(axis=1)
+    multiplicity = np.add.reduceat(field_counts.sum(axis=1), offsets) / \
+        np.maximum(np.add.reduceat(present.sum(axis=1), offsets), 1)
+    scores = np.log2(counts) * regularity * field_score / np.maximum(multiplicity, 1)
+    
+    structures, regions, selectors = [], [], set()
+    for g in np.argsort(-scores, kind='stable'):
+        if scores[g] <= 0 or len(structures) >= max_structures:
+            break
+        parent, tag, members = groups[g]
+        first, last = offsets[g], offsets[g] + counts[g]
+        region = (int(starts[first:last].min()), int(stops[first:last].max()))
+        # Un groupe imbriqué dans une structure retenue (ou qui la contient) n'en est qu'une partie
+        if any(region[0] < other[1] and other[0] < region[1] for other in regions):
+            continue
+        container = record_selector(parent, tag, members)
+        if container in selectors:
+            continue
+        
+        # L'instance la plus complète sert de modèle pour les sélecteurs des champs
+        representative = members[int(np.argmax(present[first:last].sum(axis=1)))]
+        fields = {}
+        for field_name, detector in FIELD_DETECTORS:
+            if coverage[g, RECORD_FIELDS.index(field_name)] >= min_coverage:
+                field_data = detector(representative)
+                if field_data:
+                    fields[field_name] = field_data
+        if not fields:
+            continue
+        
+        regions.append(region)
+        selectors.add(container)
+        structures.append({
+            'container': container,
+            'fields': fields,
+            'count': int(counts[g]),
+            'score': round(float(scores[g]), 3)
+        })
+    return structures
+
+def record_selector(parent, tag, members):
+    """Sélecteur CSS des instances : classes communes, sinon position sous le parent"""
+    common = None
+    for member in members:
+        classes = [c for c in member.get('class', []) if CSS_CLASS_REGEX.match(c)]
+        common = classes if common is None else [c for c in common if c in classes]
+        if not common:
+            break
+    if common:
+        return f"{tag}.{'.'.join(common)}"
+    parent_selector = get_unique_selector(parent) if parent.name != '[document]' else ''
+    return f"{parent_selector} > {tag}" if parent_selector else tag
 
 def detect_title_field(element):
     """Détecte les champs de titre"""
     title_tags = element.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a'])
     for tag in title_tags:
         if tag.text.strip():
-            return {'selector': get_unique_selector(tag)}
+            return field_config(element, tag)
     return None
 
 def detect_price_field(element):
@@ -530,7 +1442,7 @@ def detect_price_field(element):
     price_pattern = re.compile(r'\d+[,\.]\d{2}|\d+\s*[€$£¥]|\$\s*\d+')
     price_candidates = element.find_all(string=price_pattern)
     for candidate in price_candidates:
-        return {'selector': get_unique_selector(candidate.parent)}
+        return field_config(element, candidate.parent)
     return None
 
 def detect_image_field(element):
@@ -538,10 +1450,7 @@ def detect_image_field(element):
     images = element.find_all('img')
     for img in images:
         if img.get('src'):
-            return {
-                'selector': get_unique_selector(img),
-                'attribute': 'src'
-            }
+            return field_config(element, img, attribute='src')
     return None
 
 def detect_link_field(element):
@@ -549,10 +1458,7 @@ def detect_link_field(element):
     links = element.find_all('a')
     for link in links:
         if link.get('href'):
-            return {
-                'selector': get_unique_selector(link),
-                'attribute': 'href'
-            }
+            return field_config(element, link, attribute='href')
     return None
 
 def detect_description_field(element):
@@ -561,7 +1467,7 @@ def detect_description_field(element):
     candidates = element.find_all(['p', 'div'], class_=desc_pattern)
     for candidate in candidates:
         if len(candidate.text.strip()) > 50:  # Description minimale
-            return {'selector': get_unique_selector(candidate)}
+            return field_config(element, candidate)
     return None
 
 def detect_date_field(element):
@@ -569,7 +1475,7 @@ def detect_date_field(element):
     date_pattern = re.compile(r'\d{2}[/-]\d{2}[/-]\d{4}|\d{4}[/-]\d{2}[/-]\d{2}')
     date_candidates = element.find_all(string=date_pattern)
     for candidate in date_candidates:
-        return {'selector': get_unique_selector(candidate.parent)}
+        return field_config(element, candidate.parent)
     return None
 
 def detect_email_field(element):
@@ -577,7 +1483,7 @@ def detect_email_field(element):
     email_pattern = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
     email_candidates = element.find_all(string=email_pattern)
     for candidate in email_candidates:
-        return {'selector': get_unique_selector(candidate.parent)}
+        return field_config(element, candidate.parent)
     return None
 
 def detect_phone_field(element):
@@ -585,7 +1491,7 @@ def detect_phone_field(element):
     phone_pattern = re.compile(r'\+?\d{2,}[\s.-]?\d{2,}[\s.-]?\d{2,}')
     phone_candidates = element.find_all(string=phone_pattern)
     for candidate in phone_candidates:
-        return {'selector': get_unique_selector(candidate.parent)}
+        return field_config(element, candidate.parent)
     return None
 
 def detect_address_field(element):
@@ -593,9 +1499,18 @@ def detect_address_field(element):
     address_pattern = re.compile(r'\d+\s+rue|\d+\s+avenue|\d+\s+boulevard|BP\s+\d+', re.I)
     address_candidates = element.find_all(string=address_pattern)
     for candidate in address_candidates:
-        return {'selector': get_unique_selector(candidate.parent)}
+        return field_config(element, candidate.parent)
     return None
 
+def field_config(container, element, **options):
+    """Configuration d'un champ : sélecteur CSS et chemin relatif dans le conteneur"""
+    config = {'selector': get_unique_selector(element)}
+    config.update(options)
+    path = child_path(container, element)
+    if path is not None:
+        config['path'] = path
+    return config
+
 def get_unique_selector(element):
     """Génère un sélecteur CSS unique pour un élément"""
     if element.get('id'):
@@ -605,6 +1520,19 @@ def get_unique_selector(element):
     else:
         return element.name
 
+# Détection améliorée des champs
+FIELD_DETECTORS = [
+    ('title', detect_title_field),
+    ('price', detect_price_field),
+    ('image', detect_image_field),
+    ('link', detect_link_field),
+    ('description', detect_description_field),
+    ('date', detect_date_field),
+    ('email', detect_email_field),
+    ('phone', detect_phone_field),
+    ('address', detect_address_field)
+]
+
 def scrape_with_structure(scraper, url, structures):
     """Scrape les données selon les structures détectées"""
     if not isinstance(structures, list):
@@ -614,39 +1542,154 @@ def scrape_with_structure(scraper, url, structures):
     
     for structure in structures:
         if scraper.navigate_to(url):
-            time.sleep(3)  # Attendre le chargement
+            if not scraper.sleep(3):  # Attendre le chargement (interrompu par un arrêt)
+                break
             
             try:
                 containers = scraper.extract_data(structure['container'], multiple=True, as_elements=True)
-                print(f"Détection de {len(containers)} éléments pour la structure {structure['container']}")
+                logger.debug("Détection de %s éléments pour la structure %s", len(containers), structure['container'])
                 
-                for container in containers:
-                    item = {
-                        'source_url': url,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    for field, config in structure['fields'].items():
-                        if 'attribute' in config:
-                            value = scraper.extract_data_from_element(
-                                container,
-                                config['selector'],
-                                attribute=config['attribute']
-                            )
-                        else:
-                            value = scraper.extract_data_from_element(
-                                container,
-                                config['selector']
-                            )
-                        item[field] = value
-                    
-                    all_items.append(item)
+                plan = ExtractionPlan(structure)
+                base_item = {'source_url': url, 'timestamp': datetime.now().isoformat()}
+                all_items.extend(plan.rows(containers, base_item))
             except Exception as e:
-                print(f"Erreur lors de l'extraction avec la structure {structure['container']}: {str(e)}")
+                logger.warning("Erreur lors de l'extraction avec la structure %s: %s", structure['container'], e)
                 continue
     
     return all_items
 
+def scrape_soup(url, structures, soup, timestamp=None):
+    """Extrait les items du document déjà analysé, sans recharger la page"""
+    items = []
+    base_item = {'source_url': url, 'timestamp': timestamp or datetime.now().isoformat()}
+    for structure in structures:
+        try:
+            plan = ExtractionPlan(structure)
+            items.extend(plan.rows(plan.containers(soup), base_item))
+        except Exception as e:
+            logger.warning("Erreur lors de l'extraction avec la structure %s: %s", structure['container'], e)
+    return items
+
+def scrape_fragments(url, plan, fragments):
+    """Extrait les items de conteneurs déjà chargés (HTML récupéré pendant le défilement)"""
+    base_item = {'source_url': url, 'timestamp': datetime.now().isoformat()}
+    containers = []
+    for fragment in fragments:
+        # Le fragment est le conteneur lui-même : son premier élément
+        container = BeautifulSoup(fragment, 'html.parser').find()
+        if container is not None:
+            containers.append(container)
+    try:
+        return list(plan.rows(containers, base_item))
+    except Exception as e:
+        logger.warning("Erreur lors de l'extraction avec la structure %s: %s", plan.container, e)
+        return []
+
+def save_results(base_url, data, output_file=None, output_dir=None, line_delimited=False):
+    """Sauvegarde les pages explorées au format JSON et retourne le nom du fichier
+    
+    Avec line_delimited=True, le fichier (.jsonl) contient une ligne de métadonnées
+    puis une ligne {"page_id": ..., "page": ...} par page, ce qui permet de
+    l'écrire et de le relire (JsonParser.stream_file) page par page.
+    """
+    if output_file is None:
+        extension = 'jsonl' if line_delimited else 'json'
+        output_file = f"data_{urlparse(base_url).netloc.replace('.', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, output_file)
+    
+    base_domain = urlparse(base_url).netloc
+    internal_pages = len([p for p in data.values() if urlparse(p['url']).netloc == base_domain])
+    metadata = {
+        'base_url': base_url,
+        'total_pages': len(data),
+        'total_internal_pages': internal_pages,
+        'total_external_pages': len(data) - internal_pages,
+        'timestamp': datetime.now().isoformat()
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if line_delimited:
+            f.write(json.dumps({'metadata': metadata}, ensure_ascii=False) + '\n')
+            for page_id, page in data.items():
+                f.write(json.dumps({'page_id': page_id, 'page': export_page(page)}, ensure_ascii=False) + '\n')
+        else:
+            # Même texte que json.dump(..., indent=4), mais une page à la fois : aucune copie
+            # complète des pages au format dict n'est construite
+            f.write('{\n    "metadata": ' + _indented_json(metadata, 1) + ',\n    "pages": {')
+            separator = '\n'
+            for page_id, page in data.items():
+                f.write(separator + '        ' + json.dumps(page_id, ensure_ascii=False) + ': ' +
+                        _indented_json(export_page(page), 2))
+                separator = ',\n'
+            f.write('\n    }\n}' if separator != '\n' else '}\n}')
+    return output_file
+
+def _indented_json(value, level):
+    """Valeur JSON indentée comme si elle était imbriquée à `level` niveaux (indent=4)"""
+    # Les retours à la ligne des chaînes sont échappés : seuls ceux de la mise en forme sont décalés
+    return json.dumps(value, ensure_ascii=False, indent=4).replace('\n', '\n' + '    ' * level)
+
+_offline_detector = None
+
+def reextract_page(task):
+    """
+    Réextrait une page archivée, sans navigateur (exécuté dans un processus du pool)
+    :param task: (dossier de l'archive, entrée de l'index, domaine du crawl)
+    :return: (page_id, données de la page ou None, erreur ou None)
+    """
+    global _offline_detector
+    directory, entry, domain = task
+    url = entry['url']
+    page_id = hashlib.md5(url.encode()).hexdigest()
+    try:
+        if _offline_detector is None:
+            _offline_detector = DataDetector()
+        page_source = PageArchive(directory).load(entry['sha256'])
+        soup = BeautifulSoup(page_source, 'html.parser')
+        index = DomIndex(soup)
+        
+        structure = detect_data_structure(None, soup, index)
+        items = scrape_soup(url, structure, soup, entry['timestamp'])
+        internal_links, external_links = extract_links(soup, url, domain, index)
+        
+        return page_id, {
+            'url': url,
+            'structure': structure,
+            'items': items,
+            'sensitive_data': _offline_detector.extract_all_data(visible_text_chunks(soup), page_source, index),
+            'internal_links': list(internal_links),
+            'external_links': list(external_links),
+            'timestamp': entry['timestamp'],
+            'depth': entry.get('depth')
+        }, None
+    except Exception as e:
+        return page_id, None, f"{url}: {str(e)}"
+
+def reextract_archive(directory, base_url, output_file=None, output_dir=None, max_workers=None,
+                      line_delimited=False, chunksize=8):
+    """Relance les extracteurs sur une archive de pages, en parallèle et sans navigateur
+    
+    Le résultat est enregistré par save_results, au même format qu'un crawl.
+    :return: Nom du fichier écrit
+    """
+    archive = PageArchive(directory)
+    domain = urlparse(base_url).netloc
+    tasks = ((directory, entry, domain) for entry in archive.entries())
+    # Chaque page est convertie en PageRecord dès son arrivée : pas de dictionnaires imbriqués en mémoire
+    data = PageStore()
+    errors = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for page_id, page_data, error in executor.map(reextract_page, tasks, chunksize=chunksize):
+            if error:
+                errors += 1
+                logger.warning("Erreur lors de la réextraction de %s", error)
+                continue
+            data.store(page_id, page_data)
+    logger.info("%s pages réextraites, %s erreurs", len(data), errors)
+    return save_results(base_url, data, output_file=output_file, output_dir=output_dir,
+                        line_delimited=line_delimited)
+
 def main():
     # URL à scraper
     url = "https://exemple.com/"
@@ -663,18 +1706,7 @@ def main():
         )
         
         # Sauvegarder les résultats
-        output_file = f"data_{urlparse(url).netloc.replace('.', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'metadata': {
-                    'base_url': url,
-                    'total_pages': len(data),
-                    'total_internal_pages': len([p for p in data.values() if urlparse(p['url']).netloc == urlparse(url).netloc]),
-                    'total_external_pages': len([p for p in data.values() if urlparse(p['url']).netloc != urlparse(url).netloc]),
-                    'timestamp': datetime.now().isoformat()
-                },
-                'pages': data
-            }, f, ensure_ascii=False, indent=4)
+        output_file = save_results(url, data)
         
         print(f"\nExploration terminée. Données sauvegardées dans {output_file}")
         print(f"Nombre total de pages explorées: {len(mapper.visited_urls)}")
@@ -688,4 +1720,4 @@ def main():
         mapper.scraper.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
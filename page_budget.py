@@ -0,0 +1,85 @@
+import time
+
+# Nombre d'éléments du document, sans sérialiser le DOM
+NODE_COUNT_SCRIPT = "return document.getElementsByTagName('*').length;"
+
+
+class PageBudget:
+    """Limites de temps et de taille appliquées à chaque page explorée
+
+    Un navigateur n'est jamais retenu au-delà de `wall_time` secondes par une
+    page : les étapes facultatives (dépliage, défilement, attente du contenu
+    dynamique, rechargement pour l'extraction des items) sont écourtées puis
+    sautées, et l'extraction se fait sur le DOM déjà chargé. Un DOM de plus de
+    `max_nodes` éléments n'est pas enrichi davantage ; un HTML de plus de
+    `max_html_bytes` octets est tronqué avant l'analyse.
+    """
+
+    def __init__(self, wall_time=90, max_nodes=150000, max_html_bytes=10 * 2**20, load_timeout=30,
+                 script_timeout=15, load_strategy='eager', partial_on_timeout=True):
+        """
+        :param load_strategy: pageLoadStrategy de Chrome : 'eager' (DOMContentLoaded), 'normal' ou 'none'
+        :param partial_on_timeout: Après un chargement trop long, extraire ce qui est déjà rendu
+        """
+        self.wall_time = wall_time
+        self.max_nodes = max_nodes
+        self.max_html_bytes = max_html_bytes
+        self.load_timeout = load_timeout
+        self.script_timeout = script_timeout
+        self.load_strategy = load_strategy
+        self.partial_on_timeout = partial_on_timeout
+
+    def track(self):
+        """Démarre le décompte d'une page"""
+        return BudgetTracker(self)
+
+
+class BudgetTracker:
+    """Consommation du budget d'une page ; `exceeded` liste les limites atteintes"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.deadline = time.monotonic() + budget.wall_time if budget.wall_time else None
+        self.exceeded = []
+
+    def exceed(self, reason):
+        if reason not in self.exceeded:
+            self.exceeded.append(reason)
+
+    def remaining(self):
+        return float('inf') if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def limit(self, seconds):
+        """Durée accordée à une étape : `seconds` au plus, dans la limite du temps restant"""
+        remaining = self.remaining()
+        if remaining < seconds:
+            self.exceed('wall_time')
+        return min(seconds, remaining)
+
+    @property
+    def degraded(self):
+        """Vrai quand la page ne doit plus être enrichie (extraction partielle)"""
+        if self.remaining() <= 0:
+            self.exceed('wall_time')
+        return bool(self.exceeded)
+
+    def check_nodes(self, scraper):
+        """Compte les éléments du DOM dans le navigateur"""
+        if not self.budget.max_nodes:
+            return None
+        count = scraper.execute_js(NODE_COUNT_SCRIPT)
+        if isinstance(count, int) and count > self.budget.max_nodes:
+            self.exceed('dom_nodes')
+        return count
+
+    def clip_html(self, html):
+        """Tronque un HTML trop volumineux (le parseur referme les balises ouvertes)"""
+        limit = self.budget.max_html_bytes
+        # Un caractère fait au moins un octet : inutile d'encoder les petites pages
+        if not limit or len(html) <= limit // 4:
+            return html
+        data = html.encode('utf-8')
+        if len(data) <= limit:
+            return html
+        self.exceed('html_bytes')
+        return data[:limit].decode('utf-8', errors='ignore')
@@ -0,0 +1,198 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import signal
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Contexte partagé renvoyé quand la page courante n'est pas échantillonnée
+NULL_STAGE = nullcontext()
+
+
+class CrawlProfiler:
+    """Profilage à la demande d'une fraction des pages explorées
+
+    Chaque page échantillonnée est découpée en étapes ('navigation',
+    'structure', ...). Pour chaque étape on agrège le temps passé, les
+    statistiques cProfile et les allocations mémoire (tracemalloc).
+    cProfile et tracemalloc étant globaux à l'interpréteur, une seule page
+    est profilée à la fois : les autres pages tirées au sort pendant ce
+    temps ne sont que chronométrées.
+    """
+
+    def __init__(self, sample_rate=0.1, output_dir='profiles', top_allocations=25,
+                 trace_frames=10, track_allocations=True):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Taux d'échantillonnage invalide: {sample_rate}")
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.top_allocations = top_allocations
+        self.trace_frames = trace_frames
+        self.track_allocations = track_allocations
+
+        self.pages_seen = 0
+        self.pages_sampled = 0
+        self.pages_profiled = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiling_lock = threading.Lock()
+        self._timings = {}      # étape -> [nombre, total, max]
+        self._stats = {}        # étape -> pstats.Stats
+        self._allocations = {}  # étape -> {(fichier, ligne): [taille, nombre]}
+
+    @contextmanager
+    def page(self, url):
+        """Encadre l'exploration d'une page et décide de son échantillonnage"""
+        with self._lock:
+            self.pages_seen += 1
+        if random.random() >= self.sample_rate:
+            yield
+            return
+
+        # Une seule page à la fois sous cProfile/tracemalloc
+        deep = self._profiling_lock.acquire(blocking=False)
+        own_tracemalloc = False
+        if deep and self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            own_tracemalloc = True
+
+        self._local.active = True
+        self._local.deep = deep
+        self._local.url = url
+        with self._lock:
+            self.pages_sampled += 1
+            if deep:
+                self.pages_profiled += 1
+        try:
+            yield
+        finally:
+            self._local.active = False
+            self._local.deep = False
+            if own_tracemalloc:
+                tracemalloc.stop()
+            if deep:
+                self._profiling_lock.release()
+
+    def stage(self, name):
+        """Retourne le contexte de mesure d'une étape de la page courante"""
+        if not getattr(self._local, 'active', False):
+            return NULL_STAGE
+        return self._measure(name, self._local.deep)
+
+    @contextmanager
+    def _measure(self, name, deep):
+        profile = None
+        before = None
+        if deep:
+            if tracemalloc.is_tracing():
+                before = tracemalloc.take_snapshot()
+            profile = cProfile.Profile()
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            allocations = None
+            if before is not None:
+                after = tracemalloc.take_snapshot()
+                allocations = after.compare_to(before, 'lineno')
+            self._record(name, elapsed, profile, allocations)
+
+    def _record(self, name, elapsed, profile, allocations):
+        with self._lock:
+            timing = self._timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+            if profile is not None:
+                if name in self._stats:
+                    self._stats[name].add(profile)
+                else:
+                    self._stats[name] = pstats.Stats(profile)
+
+            if allocations:
+                per_stage = self._allocations.setdefault(name, {})
+                for diff in allocations:
+                    if diff.size_diff <= 0:
+                        continue
+                    frame = diff.traceback[0]
+                    entry = per_stage.setdefault((frame.filename, frame.lineno), [0, 0])
+                    entry[0] += diff.size_diff
+                    entry[1] += diff.count_diff
+
+    def report(self):
+        """Construit un rapport texte des étapes, fonctions et allocations"""
+        out = io.StringIO()
+        with self._lock:
+            out.write(f"Pages vues: {self.pages_seen}, échantillonnées: {self.pages_sampled}, "
+                      f"profilées: {self.pages_profiled}\n\n")
+
+            out.write("== Temps par étape ==\n")
+            for name, (count, total, worst) in sorted(self._timings.items(), key=lambda x: x[1][1], reverse=True):
+                out.write(f"{name:<15} n={count:<6} total={total:9.3f}s "
+                          f"moyenne={total / count:8.4f}s max={worst:8.4f}s\n")
+
+            for name, stats in self._stats.items():
+                out.write(f"\n== cProfile: {name} ==\n")
+                stats.stream = out
+                stats.sort_stats('cumulative').print_stats(20)
+
+            for name, per_stage in self._allocations.items():
+                out.write(f"\n== Allocations: {name} ==\n")
+                top = sorted(per_stage.items(), key=lambda x: x[1][0], reverse=True)
+                for (filename, lineno), (size, count) in top[:self.top_allocations]:
+                    out.write(f"{size / 1024:10.1f} KiB {count:8d} blocs  {filename}:{lineno}\n")
+        return out.getvalue()
+
+    def dump(self, prefix=None):
+        """Écrit les fichiers pstats par étape et le rapport texte
+
+        :return: Liste des fichiers écrits
+        """
+        prefix = prefix or datetime.now().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+        with self._lock:
+            stages = list(self._stats.items())
+        for name, stats in stages:
+            path = os.path.join(self.output_dir, f"{prefix}_{name}.pstats")
+            with self._lock:
+                stats.dump_stats(path)
+            written.append(path)
+
+        report_path = os.path.join(self.output_dir, f"{prefix}_report.txt")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        written.append(report_path)
+        return written
+
+    def install_signal_handler(self, signum=None):
+        """Déclenche un dump à la réception d'un signal (SIGUSR1 par défaut)
+
+        :return: True si le gestionnaire a été installé
+        """
+        if signum is None:
+            signum = getattr(signal, 'SIGUSR1', None)
+        if signum is None:
+            return False
+
+        def handler(_signum, _frame):
+            # Le dump se fait hors du gestionnaire pour ne pas bloquer sur les verrous
+            threading.Thread(target=self.dump, daemon=True).start()
+
+        try:
+            signal.signal(signum, handler)
+        except ValueError:
+            # signal.signal n'est autorisé que depuis le thread principal
+            return False
+        return True
@@ -0,0 +1,329 @@
+import sys
+import threading
+from array import array
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Ordre des clés d'une page exportée (celui de SiteMapper._explore_page)
+PAGE_KEYS = ('url', 'structure', 'items', 'sensitive_data', 'internal_links', 'external_links',
+             'timestamp', 'depth')
+SENSITIVE_KEYS = ('emails', 'phones', 'social_media', 'potential_sensitive')
+# Champs ajoutés à chaque item (voir scrape_with_structure) : URL internée et horodatage entier
+ITEM_URL_KEY = 'source_url'
+ITEM_TIMESTAMP_KEY = 'timestamp'
+
+
+class UrlTable:
+    """Table d'URLs internées : chaque URL n'est conservée qu'une fois et désignée par un entier"""
+
+    def __init__(self):
+        self.urls = []
+        self.ids = {}
+        self.key_tuples = {}  # tuples de clés d'items partagés entre toutes les pages
+        self.lock = threading.Lock()
+
+    def intern(self, url):
+        url_id = self.ids.get(url)
+        if url_id is None:
+            with self.lock:
+                url_id = self.ids.get(url)
+                if url_id is None:
+                    url_id = len(self.urls)
+                    self.urls.append(url)
+                    self.ids[url] = url_id
+        return url_id
+
+    def url(self, url_id):
+        return self.urls[url_id]
+
+    def intern_keys(self, keys):
+        return self.key_tuples.setdefault(keys, keys)
+
+    def __len__(self):
+        return len(self.urls)
+
+
+def _pack_timestamp(value):
+    """Horodatage ISO -> microsecondes depuis 1970 (entier exact), ou la valeur telle quelle
+
+    Seuls les horodatages que isoformat() restitue à l'identique sont convertis.
+    """
+    try:
+        packed = (datetime.fromisoformat(value) - EPOCH) // MICROSECOND
+    except (TypeError, ValueError):
+        return value
+    return packed if _unpack_timestamp(packed) == value else value
+
+
+def _unpack_timestamp(value):
+    return (EPOCH + value * MICROSECOND).isoformat() if isinstance(value, int) else value
+
+
+class _Snippets:
+    """Textes de contexte d'une page regroupés dans une seule chaîne ; un texte déjà présent n'est pas recopié"""
+
+    def __init__(self):
+        self.buffer = ''
+
+    def add(self, text):
+        if not text:
+            return 0, 0
+        offset = self.buffer.find(text)
+        if offset < 0:
+            offset = len(self.buffer)
+            self.buffer += text
+        return offset, len(text)
+
+
+class PageRecord:
+    """Page explorée sous forme compacte
+
+    Les liens sont des tableaux d'identifiants de la UrlTable, les contextes des
+    emails, téléphones et éléments sensibles sont des (décalage, longueur) dans
+    une chaîne commune à la page, et les items des tuples de valeurs partageant
+    leur tuple de clés. Le dictionnaire habituel n'est reconstruit qu'à la
+    lecture (get, [], to_dict).
+    """
+
+    __slots__ = ('table', 'url_id', 'depth', 'timestamp', 'structure', 'items', 'snippets',
+                 'emails', 'phones', 'social_media', 'potential', 'sensitive_extra',
+                 'internal_links', 'external_links', 'extra')
+
+    def __init__(self, table, page):
+        self.table = table
+        self.url_id = table.intern(page['url'])
+        self.depth = page.get('depth')
+        self.timestamp = _pack_timestamp(page.get('timestamp'))
+        self.structure = page.get('structure')
+        self.items = self._pack_items(page.get('items') or [])
+        self.internal_links = array('I', (table.intern(url) for url in page.get('internal_links') or []))
+        self.external_links = array('I', (table.intern(url) for url in page.get('external_links') or []))
+        self.extra = {key: value for key, value in page.items() if key not in PAGE_KEYS} or None
+
+        snippets = _Snippets()
+        sensitive = page.get('sensitive_data') or {}
+        self.emails = tuple(
+            (entry.get('email'), *snippets.add(entry.get('context')), entry.get('confidence'))
+            for entry in sensitive.get('emails', [])
+        )
+        self.phones = tuple(
+            (entry.get('phone'), *snippets.add(entry.get('context')), entry.get('confidence'))
+            for entry in sensitive.get('phones', [])
+        )
+        social_media = sensitive.get('social_media') or {}
+        social_media = (table.intern_keys(tuple(social_media)), tuple(tuple(links) for links in social_media.values()))
+        # Le cas courant (aucun lien social) est partagé par toutes les pages
+        self.social_media = table.intern_keys(social_media) if not any(social_media[1]) else social_media
+        self.potential = tuple(
+            (entry.get('type'), *snippets.add(entry.get('value')), *snippets.add(entry.get('context')))
+            for entry in sensitive.get('potential_sensitive', [])
+        )
+        self.sensitive_extra = {key: value for key, value in sensitive.items()
+                                if key not in SENSITIVE_KEYS} or None
+        self.snippets = snippets.buffer
+
+    def _pack_items(self, items):
+        """Items regroupés par suites de même en-tête : (((clés, positions converties), (valeurs, ...)), ...)
+
+        L'URL source devient un identifiant de la UrlTable et l'horodatage un entier
+        (voir _pack_timestamp) ; les positions converties indiquent les valeurs à
+        restituer à la lecture.
+        """
+        runs = []
+        timestamps = {}  # les items d'une page partagent en général leur horodatage
+        for item in items:
+            values = []
+            packed = []
+            for key, value in item.items():
+                if key == ITEM_URL_KEY and isinstance(value, str):
+                    value = self.table.intern(value)
+                    packed.append(len(values))
+                elif key == ITEM_TIMESTAMP_KEY and isinstance(value, str):
+                    if value not in timestamps:
+                        timestamps[value] = _pack_timestamp(value)
+                    value = timestamps[value]
+                    if isinstance(value, int):
+                        packed.append(len(values))
+                elif isinstance(value, str) and len(value) <= 32:
+                    # Les valeurs courtes (prix, dates, catégories...) se répètent d'un item à l'autre
+                    value = sys.intern(value)
+                values.append(value)
+            header = self.table.intern_keys((self.table.intern_keys(tuple(item)), tuple(packed)))
+            if runs and runs[-1][0] is header:
+                runs[-1][1].append(tuple(values))
+            else:
+                runs.append((header, [tuple(values)]))
+        return tuple((header, tuple(values)) for header, values in runs)
+
+    def _unpack_item(self, keys, packed, values):
+        item = dict(zip(keys, values))
+        for index in packed:
+            key = keys[index]
+            item[key] = self.table.url(item[key]) if key == ITEM_URL_KEY else _unpack_timestamp(item[key])
+        return item
+
+    @property
+    def url(self):
+        return self.table.url(self.url_id)
+
+    def _snippet(self, offset, length):
+        return self.snippets[offset:offset + length]
+
+    def add_classified_block(self, block):
+        """Ajoute un bloc signalé par SensitiveTextClassifier"""
+        if self.sensitive_extra is None:
+            self.sensitive_extra = {}
+        self.sensitive_extra.setdefault('classified_blocks', []).append(block)
+
+    def export(self, key):
+        """Reconstruit la valeur d'une clé de la page exportée"""
+        if key == 'url':
+            return self.url
+        if key == 'structure':
+            return self.structure
+        if key == 'items':
+            return [self._unpack_item(keys, packed, values) for (keys, packed), rows in self.items for values in rows]
+        if key == 'sensitive_data':
+            sensitive = {
+                'emails': [{'email': email, 'context': self._snippet(offset, length), 'confidence': confidence}
+                           for email, offset, length, confidence in self.emails],
+                'phones': [{'phone': phone, 'context': self._snippet(offset, length), 'confidence': confidence}
+                           for phone, offset, length, confidence in self.phones],
+                'social_media': {platform: list(links) for platform, links in zip(*self.social_media)},
+                'potential_sensitive': [
+                    {'type': kind, 'value': self._snippet(value_offset, value_length),
+                     'context': self._snippet(context_offset, context_length)}
+                    for kind, value_offset, value_length, context_offset, context_length in self.potential
+                ]
+            }
+            if self.sensitive_extra:
+                sensitive.update(self.sensitive_extra)
+            return sensitive
+        if key == 'internal_links':
+            return [self.table.url(url_id) for url_id in self.internal_links]
+        if key == 'external_links':
+            return [self.table.url(url_id) for url_id in self.external_links]
+        if key == 'timestamp':
+            return _unpack_timestamp(self.timestamp)
+        if key == 'depth':
+            return self.depth
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def keys(self):
+        return list(PAGE_KEYS) + list(self.extra or ())
+
+    def to_dict(self):
+        """Page au format JSON habituel"""
+        return {key: self.export(key) for key in self.keys()}
+
+    def get(self, key, default=None):
+        try:
+            return self.export(key)
+        except KeyError:
+            return default
+
+    def __getitem__(self, key):
+        return self.export(key)
+
+    def __contains__(self, key):
+        return key in PAGE_KEYS or bool(self.extra and key in self.extra)
+
+
+class PageStore(MutableMapping):
+    """Remplace le dictionnaire data_by_page : les pages y sont converties en PageRecord
+
+    Les URLs sont internées dans une UrlTable commune à toutes les pages.
+    """
+
+    def __init__(self):
+        self.table = UrlTable()
+        self.records = {}
+
+    def store(self, page_id, page):
+        """Enregistre une page (dict ou PageRecord) et retourne son PageRecord"""
+        record = page if isinstance(page, PageRecord) else PageRecord(self.table, page)
+        self.records[page_id] = record
+        return record
+
+    def __setitem__(self, page_id, page):
+        self.store(page_id, page)
+
+    def __getitem__(self, page_id):
+        return self.records[page_id]
+
+    def __delitem__(self, page_id):
+        del self.records[page_id]
+
+    def __iter__(self):
+        return iter(list(self.records))
+
+    def __len__(self):
+        return len(self.records)
+
+    def to_dict(self):
+        """Toutes les pages au format JSON habituel"""
+        return {page_id: record.to_dict() for page_id, record in self.records.items()}
+
+
+def export_page(page):
+    """Retourne la page au format JSON habituel, qu'elle soit compacte ou non"""
+    return page.to_dict() if isinstance(page, PageRecord) else page
+
+
+if __name__ == "__main__":
+    # Comparaison de l'empreinte mémoire : dictionnaires imbriqués contre PageStore
+    import gc
+    import hashlib
+    import random
+    import tracemalloc
+
+    def page_url(i):
+        return f"https://exemple.com/produits/categorie-{i % 50}/page-{i}"
+
+    def synthetic_page(i, pages):
+        url = page_url(i)
+        text = ' '.join(f"mot{random.randrange(1000)}" for _ in range(60))
+        timestamp = (datetime(2024, 1, 1) + timedelta(seconds=i, microseconds=i)).isoformat()
+        context = f"{text[:50]} contact{i}@exemple.com {text[50:100]}"
+        return {
+            'url': url,
+            'structure': [],
+            'items': [{'source_url': url, 'timestamp': timestamp, 'title': f"Produit {i}-{n}",
+                       'price': f"{n},99 €", 'link': f"/p/{i}-{n}"} for n in range(10)],
+            'sensitive_data': {
+                'emails': [{'email': f"contact{i}@exemple.com", 'context': context, 'confidence': 0.5}] * 2,
+                'phones': [{'phone': '0102030405', 'context': context, 'confidence': 0.66}],
+                'social_media': {'facebook': [], 'twitter': [], 'linkedin': [], 'instagram': []},
+                'potential_sensitive': [{'type': 'potential_contact', 'value': f"contact{i}@exemple.com",
+                                         'context': context}]
+            },
+            'internal_links': [page_url(random.randrange(pages)) for _ in range(40)],
+            'external_links': [f"https://partenaire{n}.com/" for n in range(5)],
+            'timestamp': timestamp,
+            'depth': 2
+        }
+
+    def measure(factory, pages):
+        random.seed(0)
+        gc.collect()
+        tracemalloc.start()
+        data = factory()
+        for i in range(pages):
+            # Les pages sont construites puis relues comme après un chargement JSON (chaînes non partagées)
+            page = synthetic_page(i, pages)
+            data[hashlib.md5(page['url'].encode()).hexdigest()] = page
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return data, current
+
+    pages = 10000
+    plain, plain_bytes = measure(dict, pages)
+    compact, compact_bytes = measure(PageStore, pages)
+    assert all(compact[page_id].to_dict() == page for page_id, page in plain.items())
+    print(f"{pages} pages : dictionnaires {plain_bytes / 2**20:.1f} Mo, "
+          f"PageStore {compact_bytes / 2**20:.1f} Mo ({plain_bytes / compact_bytes:.1f}x moins)")
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+
+def content_hash(text):
+    """Empreinte du texte visible d'une page, insensible aux variations d'espacement"""
+    return hashlib.sha1(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+class RecrawlScheduler:
+    """Planification des recrawls selon la fréquence de changement observée de chaque page
+
+    L'historique de chaque URL (empreinte du contenu, date du dernier passage et
+    du dernier changement, nombre de visites et de changements constatés) est
+    conservé d'un crawl à l'autre dans un fichier d'état. Le taux de changement
+    est estimé par l'estimateur de Cho et Garcia-Molina, adapté aux visites
+    espacées où plusieurs changements peuvent passer inaperçus :
+        λ ≈ -ln((n - X + 0.5) / (n + 0.5)) / (durée observée / n)
+    La probabilité qu'une page ait changé depuis la dernière visite est alors
+    1 - exp(-λ t). Seules les pages les plus probablement modifiées sont
+    replanifiées, dans la limite du budget ; une page n'est jamais laissée
+    sans visite plus de `max_staleness` secondes.
+    """
+
+    def __init__(self, state_file=None, budget=None, threshold=0.5, max_staleness=7 * 86400,
+                 default_interval=86400, min_interval=3600):
+        self.state_file = state_file
+        self.budget = budget
+        self.threshold = threshold
+        self.max_staleness = max_staleness
+        self.default_interval = default_interval  # intervalle supposé tant qu'une page n'a pas été revue
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.history = self.load_state()
+        self.due = set()
+
+    def load_state(self):
+        """Charge l'historique des crawls précédents"""
+        if not self.state_file:
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        """Enregistre l'historique (écriture atomique)"""
+        if not self.state_file:
+            return
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.state_file}.tmp"
+        with self.lock:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(self.history, f)
+        os.replace(temporary, self.state_file)
+
+    def record(self, url, digest, depth=None, now=None):
+        """
+        Enregistre une visite
+        :return: True si le contenu a changé depuis la visite précédente (ou si la page est nouvelle)
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            entry = self.history.get(url)
+            if entry is None:
+                self.history[url] = {
+                    'hash': digest, 'first_seen': now, 'last_crawl': now, 'last_change': now,
+                    'checks': 0, 'changes': 0, 'observed': 0.0, 'depth': depth
+                }
+                return True
+            changed = entry['hash'] != digest
+            entry['checks'] += 1
+            entry['observed'] += max(0.0, now - entry['last_crawl'])
+            entry['last_crawl'] = now
+            if depth is not None:
+                entry['depth'] = depth if entry.get('depth') is None else min(entry['depth'], depth)
+            if changed:
+                entry['changes'] += 1
+                entry['hash'] = digest
+                entry['last_change'] = now
+            return changed
+
+    def change_interval(self, entry):
+        """Intervalle moyen estimé entre deux changements, en secondes"""
+        checks, changes = entry['checks'], entry['changes']
+        if checks == 0 or entry['observed'] <= 0:
+            return self.default_interval
+        if changes == 0:
+            # Aucun changement vu : l'intervalle est au moins du double de la durée observée
+            return max(self.default_interval, 2 * entry['observed'])
+        mean_gap = entry['observed'] / checks
+        ratio = (checks - changes + 0.5) / (checks + 0.5)
+        rate = -math.log(ratio) / mean_gap
+        return max(self.min_interval, 1 / rate) if rate > 0 else self.default_interval
+
+    def change_probability(self, entry, now):
+        """Probabilité que la page ait changé depuis la dernière visite"""
+        elapsed = max(0.0, now - entry['last_crawl'])
+        return 1 - math.exp(-elapsed / self.change_interval(entry))
+
+    def plan(self, now=None):
+        """
+        Choisit les pages connues à revisiter
+        :return: Liste de (url, profondeur, probabilité), les plus urgentes d'abord
+        """
+        now = time.time() if now is None else now
+        stale, likely = [], []
+        with self.lock:
+            for url, entry in self.history.items():
+                probability = self.change_probability(entry, now)
+                candidate = (url, entry.get('depth') or 0, probability)
+                if now - entry['last_crawl'] >= self.max_staleness:
+                    stale.append(candidate)
+                elif probability >= self.threshold:
+                    likely.append(candidate)
+        # Les pages trop anciennes passent d'abord, puis les plus probablement modifiées
+        stale.sort(key=lambda candidate: -candidate[2])
+        likely.sort(key=lambda candidate: -candidate[2])
+        planned = stale + likely
+        if self.budget is not None:
+            planned = planned[:self.budget]
+        self.due = {url for url, _, _ in planned}
+        return planned
+
+    def should_visit(self, url):
+        """Une URL est visitée si elle est nouvelle ou planifiée"""
+        return url not in self.history or url in self.due
+
+    def __len__(self):
+        return len(self.history)
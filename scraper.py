@@ -1,78 +1,275 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-import requests
+import base64
 import time
 import json
 import logging
-import os
-from datetime import datetime
+import re
+import threading
+from collections import deque
+
+from log_pipeline import configure_logging
+
+# Selenium et fake-useragent sont importés au premier démarrage d'un navigateur
+
+_user_agents = None
+_user_agents_lock = threading.Lock()
+
+def random_user_agent():
+    """Retourne un User-Agent aléatoire, la base de fake-useragent n'étant chargée qu'une fois"""
+    global _user_agents
+    if _user_agents is None:
+        with _user_agents_lock:
+            if _user_agents is None:
+                from fake_useragent import UserAgent
+                _user_agents = UserAgent()
+    return _user_agents.random
 
 class WebScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, capture_network=False):
+        self.headless = headless
+        self.capture_network = capture_network  # Journal réseau Chrome (voir capture_json_responses)
+        self.page_load_strategy = None  # 'normal' (défaut de Selenium), 'eager' ou 'none'
+        self.page_load_timeout = 60  # Un chargement ne bloque pas le navigateur au-delà
+        self.script_timeout = 30
+        self.cancel_token = None  # Jeton d'arrêt/pause du crawler qui utilise le navigateur (voir sleep)
+        self._driver = None
+        self._driver_lock = threading.Lock()
+        self.closed = False  # Un navigateur fermé n'est plus redémarré (voir close)
+        self.driver_startup_time = None
+        self.last_fetch = None
         self.setup_logging()
-        self.setup_driver(headless)
+    
+    @property
+    def driver(self):
+        """Driver Selenium, démarré à la première utilisation"""
+        if self._driver is None:
+            with self._driver_lock:
+                if self.closed:
+                    raise RuntimeError("Le navigateur a été fermé")
+                if self._driver is None:
+                    self.setup_driver(self.headless)
+        return self._driver
+    
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+    
+    def start(self):
+        """Démarre le navigateur s'il ne l'est pas encore"""
+        return self.driver
         
     def setup_logging(self):
-        """Configure le système de logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('scraper.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Configure le système de logging (pipeline asynchrone partagé, voir log_pipeline)"""
+        configure_logging()
         self.logger = logging.getLogger(__name__)
 
     def setup_driver(self, headless):
         """Configure le driver Selenium"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        started = time.perf_counter()
         chrome_options = Options()
         if headless:
             chrome_options.add_argument('--headless=new')
         
         # Configuration des options pour éviter la détection
-        chrome_options.add_argument(f'user-agent={UserAgent().random}')
+        chrome_options.add_argument(f'user-agent={random_user_agent()}')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        if self.page_load_strategy:
+            chrome_options.page_load_strategy = self.page_load_strategy
+        if self.capture_network:
+            # Événements Network.* du DevTools exposés via driver.get_log('performance')
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.logger.info("Driver Chrome initialisé avec succès")
+            self._driver = webdriver.Chrome(options=chrome_options)
+            self._driver.set_page_load_timeout(self.page_load_timeout)
+            self._driver.set_script_timeout(self.script_timeout)
+            self._driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.driver_startup_time = time.perf_counter() - started
+            self.logger.info("Driver Chrome initialisé avec succès en %.2fs", self.driver_startup_time)
         except Exception as e:
-            self.logger.error(f"Erreur lors de l'initialisation du driver: {str(e)}")
+            self.logger.error("Erreur lors de l'initialisation du driver: %s", e)
             raise
 
+    @property
+    def cancelled(self):
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+    def sleep(self, seconds):
+        """
+        Pause interrompue par une demande d'arrêt du crawler (et suspendue pendant sa pause)
+        :return: False si l'arrêt a été demandé
+        """
+        if self.cancel_token is None:
+            time.sleep(seconds)
+            return True
+        return self.cancel_token.sleep(seconds)
+
+    def _cancelled_fetch(self):
+        self.last_fetch = {'outcome': 'cancelled', 'latency': 0.0, 'status': None, 'error': 'Arrêt demandé'}
+        return False
+
     def navigate_to(self, url):
-        """Navigate vers une URL avec gestion des erreurs"""
+        """Navigate vers une URL avec gestion des erreurs
+        
+        Le résultat du dernier chargement est conservé dans `last_fetch` :
+        {'outcome': 'ok' | 'error' | 'timeout' | 'cancelled', 'latency': secondes,
+         'status': code HTTP ou None, 'error': message}
+        """
+        if self.cancelled:
+            return self._cancelled_fetch()
+        if self.capture_network:
+            # Les réponses de la page précédente ne doivent pas être attribuées à celle-ci
+            self.drain_network_log()
+        started = time.perf_counter()
         try:
             self.driver.get(url)
-            self.logger.info(f"Navigation réussie vers {url}")
+            self.last_fetch = {
+                'outcome': 'ok',
+                'latency': time.perf_counter() - started,
+                'status': self.get_response_status(),
+                'error': None
+            }
+            self.logger.debug("Navigation réussie vers %s", url, extra={'url': url})
             return True
         except Exception as e:
-            self.logger.error(f"Erreur lors de la navigation vers {url}: {str(e)}")
+            self.last_fetch = {
+                'outcome': 'timeout' if 'Timeout' in type(e).__name__ else 'error',
+                'latency': time.perf_counter() - started,
+                'status': None,
+                'error': str(e)
+            }
+            self.logger.error("Erreur lors de la navigation vers %s: %s", url, e, extra={'url': url})
+            return False
+    
+    def apply_page_budget(self, budget):
+        """Applique les délais et la stratégie de chargement d'un PageBudget
+        
+        La stratégie de chargement n'est prise en compte qu'au démarrage du navigateur.
+        """
+        self.page_load_strategy = budget.load_strategy
+        if (budget.load_timeout, budget.script_timeout) == (self.page_load_timeout, self.script_timeout):
+            return
+        self.page_load_timeout, self.script_timeout = budget.load_timeout, budget.script_timeout
+        if self._driver is not None:
+            try:
+                self._driver.set_page_load_timeout(self.page_load_timeout)
+                self._driver.set_script_timeout(self.script_timeout)
+            except Exception as e:
+                self.logger.error("Impossible d'appliquer les délais de chargement: %s", e)
+
+    def stop_loading(self):
+        """
+        Interrompt un chargement trop long pour exploiter le DOM déjà rendu
+        :return: True si un document exploitable est disponible
+        """
+        try:
+            return bool(self.driver.execute_script("window.stop(); return !!document.body;"))
+        except Exception as e:
+            self.logger.error("Impossible d'interrompre le chargement: %s", e)
             return False
 
+    def get_response_status(self):
+        """Code HTTP du document courant (Navigation Timing), None si indisponible"""
+        try:
+            return self.driver.execute_script(
+                "const nav = performance.getEntriesByType('navigation')[0];"
+                "return nav && nav.responseStatus ? nav.responseStatus : null;"
+            )
+        except Exception:
+            return None
+
+    def drain_network_log(self):
+        """Vide le journal réseau et retourne ses entrées brutes"""
+        try:
+            return self.driver.get_log('performance')
+        except Exception as e:
+            self.logger.error("Journal réseau indisponible: %s", e)
+            return []
+
+    def capture_json_responses(self, url_pattern=None, content_types=('application/json', '+json'),
+                               max_responses=100, max_body_bytes=5 * 2**20):
+        """Récupère les réponses XHR/fetch chargées depuis la dernière navigation
+        
+        Nécessite capture_network=True. Le journal est consommé : un second appel
+        ne retourne que les réponses arrivées entre-temps.
+        
+        Args:
+            url_pattern (str): Expression régulière que l'URL de la requête doit contenir (optionnel)
+            content_types (tuple): Fragments de type MIME acceptés
+            max_responses (int): Nombre maximal de réponses retournées
+            max_body_bytes (int): Taille maximale d'une réponse (les plus grosses sont ignorées)
+            
+        Returns:
+            list: [{'url', 'status', 'mime_type', 'body'}] dans l'ordre d'arrivée
+        """
+        if not self.capture_network:
+            return []
+        pattern = re.compile(url_pattern) if isinstance(url_pattern, str) else url_pattern
+        responses = {}
+        finished = set()
+        for entry in self.drain_network_log():
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params') or {}
+            if method == 'Network.responseReceived':
+                if params.get('type') not in ('XHR', 'Fetch'):
+                    continue
+                response = params.get('response') or {}
+                mime_type = (response.get('mimeType') or '').lower()
+                if not any(content_type in mime_type for content_type in content_types):
+                    continue
+                if pattern is not None and not pattern.search(response.get('url', '')):
+                    continue
+                responses[params['requestId']] = {
+                    'url': response.get('url'),
+                    'status': response.get('status'),
+                    'mime_type': mime_type
+                }
+            elif method == 'Network.loadingFinished':
+                if params.get('encodedDataLength', 0) <= max_body_bytes:
+                    finished.add(params.get('requestId'))
+        
+        captured = []
+        for request_id, response in responses.items():
+            if len(captured) >= max_responses:
+                break
+            # Réponse interrompue ou trop grosse : son corps n'est pas récupérable
+            if request_id not in finished:
+                continue
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception:
+                # Corps déjà libéré par le navigateur (navigation, cache plein)
+                continue
+            text = body.get('body', '')
+            if body.get('base64Encoded'):
+                text = base64.b64decode(text).decode('utf-8', errors='replace')
+            captured.append(dict(response, body=text))
+        return captured
+
     def wait_for_element(self, by, value, timeout=10):
         """Attend qu'un élément soit présent sur la page"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
             element = WebDriverWait(self.driver, timeout).until(
                 EC.presence_of_element_located((by, value))
             )
             return element
         except Exception as e:
-            self.logger.error(f"Timeout en attendant l'élément {value}: {str(e)}")
+            self.logger.error("Timeout en attendant l'élément %s: %s", value, e)
             return None
 
     def extract_data(self, selector, multiple=False, attribute=None, as_elements=False):
@@ -103,7 +300,7 @@ class WebScraper:
                     return element.text.strip()
                 return None
         except Exception as e:
-            self.logger.error(f"Erreur lors de l'extraction des données: {str(e)}")
+            self.logger.error("Erreur lors de l'extraction des données: %s", e)
             return [] if multiple or as_elements else None
 
     def extract_data_from_element(self, container, selector, attribute=None):
@@ -119,7 +316,7 @@ class WebScraper:
                 return element.text.strip()
             return None
         except Exception as e:
-            self.logger.error(f"Erreur lors de l'extraction des données de l'élément: {str(e)}")
+            self.logger.error("Erreur lors de l'extraction des données de l'élément: %s", e)
             return None
 
     def get_page_source(self):
@@ -131,37 +328,126 @@ class WebScraper:
         try:
             return self.driver.execute_script(script)
         except Exception as e:
-            self.logger.error(f"Erreur lors de l'exécution du JavaScript: {str(e)}")
+            self.logger.error("Erreur lors de l'exécution du JavaScript: %s", e)
             return None
 
-    def scroll_to_bottom(self):
-        """Fait défiler jusqu'au bas de la page pour charger le contenu dynamique"""
+    def scroll_to_bottom(self, max_steps=30, time_budget=60, pause=2):
+        """Fait défiler jusqu'au bas de la page pour charger le contenu dynamique
+        
+        Le défilement s'arrête quand la hauteur ne change plus, après `max_steps`
+        défilements ou après `time_budget` secondes (flux infinis).
+        :return: Nombre de défilements effectués
+        """
+        steps = 0
+        deadline = time.monotonic() + time_budget if time_budget else None
         try:
             last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
+            while max_steps is None or steps < max_steps:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.logger.info("Défilement interrompu après %s pas (budget de %ss)", steps, time_budget)
+                    break
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                steps += 1
+                if not self.sleep(pause):
+                    break
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
                 if new_height == last_height:
                     break
                 last_height = new_height
         except Exception as e:
-            self.logger.error(f"Erreur lors du défilement: {str(e)}")
+            self.logger.error("Erreur lors du défilement: %s", e)
+        return steps
+
+    # Retourne le HTML des éléments apparus depuis l'appel précédent, pour chaque sélecteur.
+    # Les éléments déjà vus sont mémorisés dans des WeakSet ; avec remove_seen, ceux du
+    # lot précédent sont retirés du DOM (le dernier lot reste en place pour le défilement).
+    HARVEST_SCRIPT = """
+        const selectors = arguments[0], removeSeen = arguments[1];
+        const state = window.__whHarvest = window.__whHarvest || {seen: {}, harvested: []};
+        if (removeSeen) {
+            state.harvested.forEach(el => el.remove());
+            state.harvested = [];
+        }
+        return selectors.map(selector => {
+            const seen = state.seen[selector] = state.seen[selector] || new WeakSet();
+            const fresh = [];
+            document.querySelectorAll(selector).forEach(el => {
+                if (seen.has(el)) return;
+                seen.add(el);
+                fresh.push(el.outerHTML);
+                if (removeSeen) state.harvested.push(el);
+            });
+            return fresh;
+        });
+    """
+
+    def harvest_scroll(self, selectors, max_steps=50, max_items=None, time_budget=60, pause=1.5,
+                       remove_seen=False, idle_steps=2):
+        """Défile par lots et retourne au fur et à mesure les nouveaux éléments
+        
+        Args:
+            selectors (list): Sélecteurs CSS des conteneurs d'items
+            max_steps (int): Nombre maximal de défilements
+            max_items (int): Nombre maximal d'éléments retournés (tous sélecteurs confondus)
+            time_budget (float): Durée maximale du défilement en secondes
+            remove_seen (bool): Retire du DOM les éléments déjà extraits pour borner la mémoire du navigateur
+            idle_steps (int): Arrêt après ce nombre de défilements sans nouvel élément
+            
+        Yields:
+            list: Pour chaque sélecteur, la liste du HTML des éléments nouvellement apparus
+        """
+        selectors = list(selectors)
+        deadline = time.monotonic() + time_budget if time_budget else None
+        steps = idle = total = 0
+        try:
+            while True:
+                batch = self.driver.execute_script(self.HARVEST_SCRIPT, selectors, remove_seen) or []
+                if max_items is not None:
+                    trimmed = []
+                    for fragments in batch:
+                        fragments = fragments[:max(0, max_items - total)]
+                        total += len(fragments)
+                        trimmed.append(fragments)
+                    batch = trimmed
+                found = sum(len(fragments) for fragments in batch)
+                idle = 0 if found else idle + 1
+                if found:
+                    yield batch
+
+                if max_items is not None and total >= max_items:
+                    break
+                if idle >= idle_steps or (max_steps is not None and steps >= max_steps):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.logger.info("Défilement incrémental interrompu après %s pas (budget de %ss)", steps, time_budget)
+                    break
+
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                steps += 1
+                if not self.sleep(pause):
+                    break
+        except Exception as e:
+            self.logger.error("Erreur lors du défilement incrémental: %s", e)
 
     def click_show_more(self, selector):
         """Clique sur les boutons 'Voir plus' pour charger plus de contenu"""
+        from selenium.webdriver.common.by import By
+        
         try:
             while True:
                 show_more = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 if not show_more:
                     break
                 show_more[0].click()
-                time.sleep(2)
+                if not self.sleep(2):
+                    break
         except Exception as e:
-            self.logger.error(f"Erreur lors du clic sur 'Voir plus': {str(e)}")
+            self.logger.error("Erreur lors du clic sur 'Voir plus': %s", e)
 
     def expand_all_elements(self):
         """Tente d'expandre tous les éléments pliables de la page"""
+        from selenium.webdriver.common.by import By
+        
         expand_selectors = [
             '.show-more',
             '.load-more',
@@ -172,14 +458,17 @@ class WebScraper:
         ]
         
         for selector in expand_selectors:
+            if self.cancelled:
+                return
             try:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 for element in elements:
                     try:
                         element.click()
-                        time.sleep(0.5)
                     except:
                         continue
+                    if not self.sleep(0.5):
+                        return
             except:
                 continue
 
@@ -207,10 +496,11 @@ class WebScraper:
             while time.time() - start_time < timeout:
                 if self.driver.execute_script("return window.ajaxComplete;"):
                     break
-                time.sleep(0.5)
+                if not self.sleep(0.5):
+                    break
                 
         except Exception as e:
-            self.logger.error(f"Erreur lors de l'attente du contenu dynamique: {str(e)}")
+            self.logger.error("Erreur lors de l'attente du contenu dynamique: %s", e)
 
     def get_hidden_elements(self):
         """Récupère les éléments cachés de la page"""
@@ -226,7 +516,7 @@ class WebScraper:
             """)
             return hidden_elements
         except Exception as e:
-            self.logger.error(f"Erreur lors de la récupération des éléments cachés: {str(e)}")
+            self.logger.error("Erreur lors de la récupération des éléments cachés: %s", e)
             return []
 
     def reveal_hidden_elements(self):
@@ -249,19 +539,422 @@ class WebScraper:
                 });
             """)
         except Exception as e:
-            self.logger.error(f"Erreur lors de la révélation des éléments cachés: {str(e)}")
+            self.logger.error("Erreur lors de la révélation des éléments cachés: %s", e)
 
     def save_to_json(self, data, filename):
         """Sauvegarde les données au format JSON"""
         try:
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=4)
-            self.logger.info(f"Données sauvegardées dans {filename}")
+            self.logger.info("Données sauvegardées dans %s", filename)
+        except Exception as e:
+            self.logger.error("Erreur lors de la sauvegarde des données: %s", e)
+
+    def close(self):
+        """Ferme le navigateur (sans le démarrer s'il n'a jamais servi)
+
+        Le scraper est ensuite inutilisable : un worker interrompu pendant une page
+        ne relance pas Chrome en accédant à nouveau au driver.
+        """
+        with self._driver_lock:
+            self.closed = True
+        if self._driver:
+            self._driver.quit()
+            self._driver = None
+            self.logger.info("Session de navigation fermée")
+
+class DriverPool:
+    """Pool de navigateurs partageable entre plusieurs SiteMapper
+
+    Les navigateurs sont créés à la demande jusqu'à `size`. Quand le pool est
+    saturé, les demandes sont servies à tour de rôle entre propriétaires
+    (un SiteMapper par site) : un site avec beaucoup de workers ne peut pas
+    affamer les autres.
+    """
+    
+    def __init__(self, size=5, headless=True, factory=None, capture_network=False):
+        self.size = size
+        self.capture_network = capture_network  # Lu à chaque création : s'applique aux navigateurs suivants
+        self.factory = factory or (lambda: WebScraper(headless=headless, capture_network=self.capture_network))
+        self.scrapers = []
+        self.idle = []
+        self.creating = 0
+        self.waiters = {}        # propriétaire -> file des tickets en attente
+        self.rotation = deque()  # ordre de passage des propriétaires
+        self.condition = threading.Condition()
+        self.closed = False
+    
+    def warm(self, count=None):
+        """Crée à l'avance des navigateurs (tous par défaut)"""
+        count = self.size if count is None else min(count, self.size)
+        created = []
+        try:
+            for _ in range(count - len(self.scrapers)):
+                created.append(self.acquire())
+        finally:
+            for scraper in created:
+                self.release(scraper)
+    
+    def acquire(self, owner=None, timeout=None):
+        """Obtient un navigateur, en attendant son tour si le pool est saturé"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self.condition:
+            self.waiters.setdefault(owner, deque()).append(ticket)
+            if owner not in self.rotation:
+                self.rotation.append(owner)
+            try:
+                # Un pool fermé ne crée plus de navigateur, même si des places se sont libérées
+                while self.closed or not self._is_turn(owner, ticket) or not self._available():
+                    if self.closed:
+                        raise RuntimeError("Le pool de navigateurs est fermé")
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Aucun navigateur disponible")
+                    self.condition.wait(remaining)
+            except BaseException:
+                self._leave(owner, ticket)
+                self.condition.notify_all()
+                raise
+            self._leave(owner, ticket)
+            if self.idle:
+                scraper = self.idle.pop()
+                self.condition.notify_all()
+                return scraper
+            self.creating += 1
+        
+        # Création hors verrou : le démarrage de Chrome prend plusieurs secondes
+        try:
+            scraper = self.factory()
+        except BaseException:
+            with self.condition:
+                self.creating -= 1
+                self.condition.notify_all()
+            raise
+        with self.condition:
+            self.creating -= 1
+            self.scrapers.append(scraper)
+            self.condition.notify_all()
+        return scraper
+    
+    def release(self, scraper):
+        """Rend un navigateur au pool (un navigateur fermé entre-temps libère sa place)"""
+        if scraper.closed:
+            self.discard(scraper)
+            return
+        with self.condition:
+            if self.closed:
+                self._quit(scraper)
+                return
+            self.idle.append(scraper)
+            self.condition.notify_all()
+    
+    def discard(self, scraper):
+        """Retire un navigateur défaillant du pool et libère sa place"""
+        with self.condition:
+            if scraper in self.scrapers:
+                self.scrapers.remove(scraper)
+            self.condition.notify_all()
+        self._quit(scraper)
+    
+    def close(self):
+        """Ferme tous les navigateurs du pool"""
+        with self.condition:
+            self.closed = True
+            scrapers, self.scrapers, self.idle = self.scrapers, [], []
+            self.condition.notify_all()
+        for scraper in scrapers:
+            self._quit(scraper)
+    
+    def _is_turn(self, owner, ticket):
+        return self.rotation[0] == owner and self.waiters[owner][0] is ticket
+    
+    def _available(self):
+        return bool(self.idle) or len(self.scrapers) + self.creating < self.size
+    
+    def _leave(self, owner, ticket):
+        """Retire un ticket et fait passer son propriétaire en fin de rotation"""
+        queue = self.waiters[owner]
+        queue.remove(ticket)
+        self.rotation.remove(owner)
+        if queue:
+            self.rotation.append(owner)
+        else:
+            del self.waiters[owner]
+    
+    def _quit(self, scraper):
+        try:
+            scraper.close()
+        except Exception:
+            pass
+
+
+# Messages d'erreur Selenium signalant un onglet ou un navigateur perdu
+TAB_CRASH_ERRORS = ('tab crashed', 'no such window', 'target window already closed', 'target frame detached')
+BROWSER_CRASH_ERRORS = ('invalid session id', 'session deleted', 'disconnected', 'chrome not reachable',
+                        'connection refused', 'max retries exceeded')
+
+
+class SharedBrowser:
+    """Navigateur Chrome dont les onglets servent des workers différents
+
+    Une session WebDriver n'a qu'un onglet courant : chaque commande est
+    exécutée sous le verrou du navigateur après bascule sur l'onglet concerné.
+    Les attentes (délais, pauses de défilement, chargements) se font hors verrou,
+    les autres onglets travaillent pendant ce temps. Les onglets partagent les
+    cookies et le cache du navigateur.
+    """
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        # Chargements non bloquants : TabScraper.navigate_to attend le chargement hors verrou
+        self.scraper.page_load_strategy = 'none'
+        self.lock = threading.RLock()
+        self.handles = set()
+        self.opening = 0            # onglets réservés, en cours d'ouverture (sous self.lock)
+        self.current = None
+        self.initial_used = False   # la fenêtre ouverte au démarrage sert de premier onglet
+        self.network_buffers = {}   # onglet -> entrées du journal réseau pas encore lues
+        self.dead = False
+
+    def reserve(self, limit):
+        """Réserve la place d'un onglet si le navigateur en héberge moins de `limit`"""
+        with self.lock:
+            if self.dead or len(self.handles) + self.opening >= limit:
+                return False
+            self.opening += 1
+            return True
+
+    def open_tab(self):
+        """Ouvre un onglet réservé par reserve et retourne son identifiant"""
+        try:
+            # Le premier onglet démarre Chrome, hors verrou : les autres onglets restent utilisables
+            self.scraper.start()
+            with self.lock:
+                driver = self.scraper.driver
+                if self.initial_used:
+                    driver.switch_to.new_window('tab')
+                self.initial_used = True
+                handle = driver.current_window_handle
+                self.handles.add(handle)
+                self.current = handle
+                return handle
+        finally:
+            with self.lock:
+                self.opening -= 1
+
+    def call(self, tab, function, *args, **kwargs):
+        """Exécute une commande WebDriver dans l'onglet d'un TabScraper"""
+        with self.lock:
+            try:
+                if self.current != tab.handle:
+                    self.current = None
+                    self.scraper.driver.switch_to.window(tab.handle)
+                    self.current = tab.handle
+                return function(*args, **kwargs)
+            except Exception as e:
+                message = str(e).lower()
+                if any(error in message for error in BROWSER_CRASH_ERRORS):
+                    self.dead = True
+                    tab.crashed = True
+                elif any(error in message for error in TAB_CRASH_ERRORS):
+                    tab.crashed = True
+                raise
+
+    def network_entries(self, handle):
+        """Entrées du journal réseau (commun au navigateur) concernant un onglet"""
+        with self.lock:
+            for entry in self.scraper.drain_network_log():
+                try:
+                    webview = json.loads(entry['message']).get('webview', '')
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self.network_buffers.setdefault(webview.upper(), []).append(entry)
+            return self.network_buffers.pop(handle.replace('CDwindow-', '').upper(), [])
+
+    def close_tab(self, handle):
+        """Ferme un onglet ; le navigateur est fermé avec son dernier onglet"""
+        with self.lock:
+            self.handles.discard(handle)
+            self.network_buffers.pop(handle.replace('CDwindow-', '').upper(), None)
+            if not self.handles and not self.opening:
+                self.dead = True
+                try:
+                    self.scraper.close()
+                except Exception:
+                    pass
+                return
+            if self.dead:
+                return
+            try:
+                self.scraper.driver.switch_to.window(handle)
+                self.scraper.driver.close()
+            except Exception:
+                pass
+            self.current = None
+
+
+class _TabProxy:
+    """Driver (ou élément) vu depuis un onglet : chaque commande passe par SharedBrowser.call"""
+
+    def __init__(self, tab, target):
+        self._tab = tab
+        self._target = target
+
+    def __getattr__(self, name):
+        tab, target = self._tab, self._target
+        if isinstance(getattr(type(target), name, None), property):
+            # page_source, current_url, title... sont des commandes WebDriver
+            return self._wrap(tab.browser.call(tab, getattr, target, name))
+        attribute = getattr(target, name)
+        if not callable(attribute):
+            return attribute
+
+        def command(*args, **kwargs):
+            return self._wrap(tab.browser.call(tab, attribute, *args, **kwargs))
+        return command
+
+    def _wrap(self, value):
+        """Les éléments retournés agissent aussi dans l'onglet (click, text...)"""
+        from selenium.webdriver.remote.webelement import WebElement
+
+        if isinstance(value, WebElement):
+            return _TabProxy(self._tab, value)
+        if isinstance(value, list) and value and isinstance(value[0], WebElement):
+            return [_TabProxy(self._tab, element) for element in value]
+        return value
+
+
+class TabScraper(WebScraper):
+    """WebScraper travaillant dans un onglet d'un SharedBrowser"""
+
+    def __init__(self, browser, handle, load_timeout=30, poll_interval=0.25):
+        self.browser = browser
+        self.handle = handle
+        self.crashed = False
+        self.load_timeout = load_timeout
+        self.poll_interval = poll_interval
+        super().__init__(headless=browser.scraper.headless, capture_network=browser.scraper.capture_network)
+        self._driver = _TabProxy(self, browser.scraper.driver)
+
+    # Le document courant est marqué avant la navigation : la marque disparaît avec lui
+    LOAD_STATE_SCRIPT = """
+        if (window.__whLoading) return null;
+        const code = document.querySelector('.error-code');
+        return [document.readyState, location.href, code ? code.textContent : null];
+    """
+
+    def navigate_to(self, url):
+        """Navigate vers une URL sans bloquer le navigateur pendant le chargement (voir WebScraper.navigate_to)"""
+        if self.cancelled:
+            return self._cancelled_fetch()
+        if self.capture_network:
+            self.drain_network_log()
+        started = time.perf_counter()
+        try:
+            self.driver.execute_script("window.__whLoading = true;")
+            # pageLoadStrategy 'none' : get rend la main dès que la navigation a commencé
+            self.driver.get(url)
+            deadline = time.monotonic() + self.load_timeout
+            while True:
+                if not self.sleep(self.poll_interval):
+                    self.driver.execute_script("window.stop();")
+                    return self._cancelled_fetch()
+                state = self.driver.execute_script(self.LOAD_STATE_SCRIPT)
+                if state and state[0] == 'complete':
+                    break
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Chargement non terminé après {self.load_timeout}s")
+            if state[1].startswith('chrome-error://'):
+                # Page d'erreur réseau de Chrome (DNS, certificat, connexion...)
+                raise ConnectionError(f"net::{state[2] or 'ERR_FAILED'}")
+            self.last_fetch = {
+                'outcome': 'ok',
+                'latency': time.perf_counter() - started,
+                'status': self.get_response_status(),
+                'error': None
+            }
+            self.logger.debug("Navigation réussie vers %s", url, extra={'url': url})
+            return True
         except Exception as e:
-            self.logger.error(f"Erreur lors de la sauvegarde des données: {str(e)}")
+            self.last_fetch = {
+                'outcome': 'timeout' if 'Timeout' in type(e).__name__ else 'error',
+                'latency': time.perf_counter() - started,
+                'status': None,
+                'error': str(e)
+            }
+            self.logger.error("Erreur lors de la navigation vers %s: %s", url, e, extra={'url': url})
+            return False
+
+    def apply_page_budget(self, budget):
+        """Délai de chargement de l'onglet (le navigateur partagé garde la stratégie 'none')"""
+        self.load_timeout = budget.load_timeout
+        self.script_timeout = budget.script_timeout
+
+    def drain_network_log(self):
+        """Vide la part du journal réseau concernant cet onglet"""
+        try:
+            return self.browser.network_entries(self.handle)
+        except Exception as e:
+            self.logger.error("Journal réseau indisponible: %s", e)
+            return []
 
     def close(self):
-        """Ferme le navigateur"""
-        if self.driver:
-            self.driver.quit()
-            self.logger.info("Session de navigation fermée") 
\ No newline at end of file
+        """Ferme l'onglet (et le navigateur avec son dernier onglet)"""
+        with self._driver_lock:
+            self.closed = True
+        if self._driver is not None:
+            self._driver = None
+            self.crashed = True  # un onglet fermé n'est plus utilisable : le pool le remplace
+            self.browser.close_tab(self.handle)
+
+
+class TabPool(DriverPool):
+    """Pool d'onglets : chaque navigateur héberge jusqu'à `tabs_per_browser` workers
+
+    `size` est le nombre total d'onglets. Un onglet planté est fermé à sa remise
+    dans le pool et remplacé à la demande suivante ; un navigateur perdu est
+    abandonné avec tous ses onglets et un nouveau est démarré au besoin.
+    """
+
+    def __init__(self, size=12, tabs_per_browser=4, headless=True, capture_network=False):
+        super().__init__(size=size, headless=headless, factory=self._open_tab, capture_network=capture_network)
+        self.headless = headless
+        self.tabs_per_browser = tabs_per_browser
+        self.browsers = []
+        self.browser_lock = threading.Lock()
+
+    def _open_tab(self):
+        with self.browser_lock:
+            browser = next((browser for browser in self.browsers if browser.reserve(self.tabs_per_browser)), None)
+            if browser is None:
+                browser = SharedBrowser(WebScraper(headless=self.headless, capture_network=self.capture_network))
+                browser.reserve(self.tabs_per_browser)
+                self.browsers.append(browser)
+        # Hors verrou du pool : le premier onglet démarre Chrome
+        try:
+            handle = browser.open_tab()
+        except Exception:
+            browser.dead = True
+            raise
+        return TabScraper(browser, handle)
+
+    def acquire(self, owner=None, timeout=None):
+        """Obtient un onglet en état de marche (les onglets d'un navigateur perdu sont écartés)"""
+        while True:
+            tab = super().acquire(owner, timeout)
+            if not tab.crashed and not tab.browser.dead:
+                return tab
+            self.discard(tab)
+
+    def release(self, tab):
+        """Rend un onglet au pool, ou le ferme s'il a planté"""
+        if tab.crashed or tab.browser.dead:
+            self.discard(tab)
+        else:
+            super().release(tab)
+
+    def _quit(self, tab):
+        super()._quit(tab)
+        with self.browser_lock:
+            self.browsers = [browser for browser in self.browsers if browser.handles or browser.opening]
@@ -0,0 +1,208 @@
+import gzip
+import io
+import json
+import os
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+from xml.etree.ElementTree import iterparse, ParseError
+
+import requests
+
+
+def _local_name(tag):
+    """Retire l'espace de noms d'une balise XML ({ns}loc -> loc)"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_lastmod(value):
+    """Convertit un lastmod W3C (date ou date+heure) en datetime comparable"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Les dates sans fuseau sont considérées en UTC pour rester comparables
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class SitemapIngester:
+    """Découverte et lecture en flux des sitemaps d'un site
+
+    Les sitemaps sont trouvés via robots.txt puis /sitemap.xml. Chaque fichier
+    (éventuellement compressé en gzip) est lu en flux avec iterparse, les index
+    de sitemaps sont suivis récursivement. Les lastmod déjà vus lors d'un
+    précédent crawl sont conservés dans un fichier d'état pour ne pas
+    réexplorer les pages inchangées.
+    """
+
+    def __init__(self, base_url, state_file=None, timeout=15, max_sitemaps=100, max_urls=100000,
+                 user_agent='WebHarvestPro', log=print):
+        self.base_url = base_url
+        self.state_file = state_file
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.max_urls = max_urls
+        self.log = log
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+
+        self.state = self.load_state()
+        self.pending_lastmod = {}  # url -> lastmod annoncé, validé une fois la page explorée
+
+    def load_state(self):
+        """Charge les lastmod du précédent crawl"""
+        if not self.state_file:
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        """Enregistre les lastmod des pages explorées"""
+        if not self.state_file:
+            return
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+
+    def mark_crawled(self, url):
+        """Mémorise le lastmod d'une page explorée avec succès"""
+        lastmod = self.pending_lastmod.pop(url, None)
+        if lastmod:
+            self.state[url] = lastmod
+
+    def discover(self):
+        """Retourne les URLs de sitemaps déclarées dans robots.txt, ou /sitemap.xml par défaut"""
+        sitemaps = []
+        robots_url = urljoin(self.base_url, '/robots.txt')
+        try:
+            response = self.session.get(robots_url, timeout=self.timeout)
+            if response.ok:
+                for line in response.text.splitlines():
+                    key, _, value = line.partition(':')
+                    if key.strip().lower() == 'sitemap' and value.strip():
+                        sitemaps.append(urljoin(robots_url, value.strip()))
+        except requests.RequestException as e:
+            self.log(f"robots.txt inaccessible ({robots_url}): {str(e)}")
+
+        if not sitemaps:
+            sitemaps.append(urljoin(self.base_url, '/sitemap.xml'))
+        return sitemaps
+
+    def iter_entries(self, sitemap_urls=None):
+        """
+        Parcourt les sitemaps et leurs index
+        :return: Générateur de dicts {'url', 'lastmod', 'priority', 'changefreq'}
+        """
+        queue = deque(sitemap_urls or self.discover())
+        seen = set()
+        emitted = 0
+        while queue and len(seen) < self.max_sitemaps:
+            sitemap_url = queue.popleft()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            try:
+                for kind, entry in self._parse(sitemap_url):
+                    if kind == 'sitemap':
+                        queue.append(entry['url'])
+                        continue
+                    yield entry
+                    emitted += 1
+                    if emitted >= self.max_urls:
+                        return
+            except (requests.RequestException, ParseError, OSError, EOFError) as e:
+                self.log(f"Sitemap illisible ({sitemap_url}): {str(e)}")
+
+    def _parse(self, sitemap_url):
+        """Lit un sitemap en flux et produit ('url' | 'sitemap', entrée)"""
+        with self.session.get(sitemap_url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            stream = io.BufferedReader(response.raw)
+            if stream.peek(2)[:2] == b'\x1f\x8b':
+                stream = gzip.GzipFile(fileobj=stream)
+
+            entry = {}
+            root = None
+            # Noms locaux des éléments ouverts : seuls les enfants directs de <url>/<sitemap> comptent
+            # (<image:loc>, <video:loc>... sont ignorés)
+            path = []
+            for event, elem in iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    path.append(_local_name(elem.tag))
+                    continue
+                name = path.pop()
+                parent = path[-1] if path else None
+                if name in ('loc', 'lastmod', 'priority', 'changefreq'):
+                    if parent in ('url', 'sitemap'):
+                        entry[name] = (elem.text or '').strip()
+                elif name in ('url', 'sitemap'):
+                    if entry.get('loc'):
+                        yield name, {
+                            'url': urljoin(sitemap_url, entry['loc']),
+                            'lastmod': entry.get('lastmod') or None,
+                            'priority': self._parse_priority(entry.get('priority')),
+                            'changefreq': entry.get('changefreq') or None
+                        }
+                    entry = {}
+                    # Libère les éléments traités pour garder une mémoire constante
+                    root.clear()
+
+    def _parse_priority(self, value):
+        try:
+            return min(1.0, max(0.0, float(value)))
+        except (TypeError, ValueError):
+            return None
+
+    def is_unchanged(self, url, lastmod):
+        """Indique si la page n'a pas changé depuis le précédent crawl"""
+        previous = self.state.get(url)
+        if not previous or not lastmod:
+            return False
+        previous_date, current_date = _parse_lastmod(previous), _parse_lastmod(lastmod)
+        if previous_date is None or current_date is None:
+            return previous == lastmod
+        return current_date <= previous_date
+
+    def ingest(self, frontier, canonicalize=None, accept=None, depth=1):
+        """
+        Insère en masse les URLs des sitemaps dans la frontière
+        :param frontier: Frontier recevant les URLs
+        :param canonicalize: Fonction de normalisation des URLs (optionnelle)
+        :param accept: Filtre des URLs à garder (optionnel)
+        :param depth: Profondeur attribuée aux URLs découvertes
+        :return: Statistiques {'found', 'added', 'unchanged', 'rejected'}
+        """
+        counts = {'found': 0, 'added': 0, 'unchanged': 0, 'rejected': 0}
+        batch = []
+        for entry in self.iter_entries():
+            counts['found'] += 1
+            url = canonicalize(entry['url']) if canonicalize else entry['url']
+            if accept and not accept(url):
+                counts['rejected'] += 1
+                continue
+            if self.is_unchanged(url, entry['lastmod']):
+                counts['unchanged'] += 1
+                continue
+            if entry['lastmod']:
+                self.pending_lastmod[url] = entry['lastmod']
+            hints = {'lastmod': entry['lastmod'], 'sitemap_priority': entry['priority']}
+            batch.append((url, depth, entry['priority'], hints))
+            if len(batch) >= 1000:
+                counts['added'] += frontier.add_many(batch)
+                batch = []
+        if batch:
+            counts['added'] += frontier.add_many(batch)
+        return counts
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import batch_runner
+from batch_runner import load_config
+
+
+def write_config(tmp_path, config):
+    path = tmp_path / 'sites.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+    return str(path)
+
+
+def test_defaults_are_applied(tmp_path):
+    config = load_config(write_config(tmp_path, {
+        'pool_size': 3,
+        'defaults': {'max_pages': 10},
+        'sites': ['https://exemple.com/', {'url': 'https://exemple.org/', 'max_depth': 4}]
+    }))
+    assert config['concurrent_sites'] == 3 and config['tabs_per_browser'] == 1
+    first, second = config['sites']
+    assert first['max_pages'] == 10 and first['max_depth'] == 2 and first['explore_external'] is False
+    assert second['max_pages'] == 10 and second['max_depth'] == 4
+
+
+@pytest.mark.parametrize('key', ['pool_size', 'tabs_per_browser', 'concurrent_sites'])
+def test_rejects_non_positive_pool_settings(tmp_path, key):
+    with pytest.raises(ValueError, match=key):
+        load_config(write_config(tmp_path, {key: 0, 'sites': ['https://exemple.com/']}))
+
+
+@pytest.mark.parametrize('key', ['max_pages', 'max_depth', 'max_workers'])
+def test_rejects_non_positive_site_limits(tmp_path, key):
+    with pytest.raises(ValueError, match=key):
+        load_config(write_config(tmp_path, {'sites': [{'url': 'https://exemple.com/', key: 0}]}))
+    with pytest.raises(ValueError, match=key):
+        load_config(write_config(tmp_path, {'defaults': {key: -1}, 'sites': ['https://exemple.com/']}))
+
+
+@pytest.mark.parametrize('value', ['false', 0, 1, None])
+def test_requires_json_booleans(tmp_path, value):
+    with pytest.raises(ValueError, match='explore_external'):
+        load_config(write_config(tmp_path, {'sites': [{'url': 'https://exemple.com/', 'explore_external': value}]}))
+
+
+@pytest.mark.parametrize('config, message', [
+    ({'sites': []}, 'Aucun site'),
+    ({'sites': [{'max_pages': 5}]}, 'url manquante'),
+    ({'sites': ['https://exemple.com/'], 'workers': 2}, 'clés inconnues'),
+    ({'sites': ['pas une url']}, 'URL invalide'),
+])
+def test_rejects_invalid_configurations(tmp_path, config, message):
+    with pytest.raises(ValueError, match=message):
+        load_config(write_config(tmp_path, config))
+
+
+def test_invalid_configuration_exits_with_code_2(tmp_path, capsys):
+    path = write_config(tmp_path, {'concurrent_sites': 0, 'sites': ['https://exemple.com/']})
+    assert batch_runner.main([path]) == 2
+    assert 'concurrent_sites' in json.loads(capsys.readouterr().out)['error']
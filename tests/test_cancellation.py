@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from cancellation import CancellationToken, CancelledError
+
+# Aucune attente de ces tests n'arrive à échéance : seul l'état du jeton les termine
+LONG = 60
+
+
+def in_thread(function, *args):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function(*args)), daemon=True)
+    thread.start()
+    return thread, result
+
+
+def test_cancel_wakes_a_sleeping_thread():
+    token = CancellationToken()
+    thread, result = in_thread(token.sleep, LONG)
+    token.cancel()
+    thread.join(5)
+    assert not thread.is_alive() and result == [False]
+    assert token.sleep(LONG) is False
+
+
+def test_pause_blocks_until_resume():
+    token = CancellationToken()
+    token.pause()
+    assert token.paused
+    thread, result = in_thread(token.wait_if_paused)
+    thread.join(0.05)
+    assert thread.is_alive()
+    token.resume()
+    thread.join(5)
+    assert result == [True] and not token.paused
+
+
+def test_cancel_ends_a_pause_and_pause_is_ignored_once_cancelled():
+    token = CancellationToken()
+    token.pause()
+    thread, result = in_thread(token.sleep, LONG)
+    token.cancel()
+    thread.join(5)
+    assert result == [False] and not token.paused
+    token.pause()
+    assert not token.paused
+
+
+def test_check_and_reset():
+    token = CancellationToken()
+    token.check()
+    token.cancel()
+    with pytest.raises(CancelledError):
+        token.check()
+    token.reset()
+    assert not token.cancelled and token.sleep(0) is True
+
+
+def test_stop_requested_before_the_crawl_is_kept():
+    from main import SiteMapper
+
+    mapper = SiteMapper('https://exemple.com')
+    mapper.stop()
+    mapper.explore_site(max_pages=5)
+    assert mapper.should_stop and not mapper.visited_urls
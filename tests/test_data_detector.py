@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+
+from main import DataDetector
+from text_stream import visible_text_chunks
+
+FILLER = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. '
+
+
+def sample_text():
+    blocks = []
+    for n in range(40):
+        blocks.append(FILLER * (n % 4))
+        blocks.append(f'Contact : equipe{n}@exemple-{n}.fr, tel: 01 23 45 67 {n:02d}')
+        if n % 5 == 0:
+            blocks.append(f'Suivez-nous sur facebook.com/page{n} et linkedin.com/company/societe-{n}')
+    return '\n'.join(blocks)
+
+
+def chunked(text, size):
+    return [(offset, text[offset:offset + size]) for offset in range(0, len(text), size)]
+
+
+def normalized(result):
+    """Résultats comparables indépendamment de l'ordre de découverte"""
+    emails, phones, social = result
+    return (sorted(json.dumps(entry, sort_keys=True) for entry in emails),
+            sorted(json.dumps(entry, sort_keys=True) for entry in phones),
+            {platform: sorted(links) for platform, links in social.items()})
+
+
+def full_scan(detector, text):
+    return detector.extract_emails(text), detector.extract_phones(text), detector.extract_social_media(text)
+
+
+@pytest.mark.parametrize('size', [1, 7, 64, 255, 256, 257, 511, 512, 1000, 100000])
+def test_scan_chunks_matches_full_text_scan(size):
+    detector = DataDetector()
+    text = sample_text()
+    assert normalized(detector.scan_chunks(chunked(text, size))) == normalized(full_scan(detector, text))
+
+
+def test_match_straddling_a_chunk_boundary_is_reported_once_with_its_context():
+    detector = DataDetector()
+    text = FILLER * 20 + 'Écrivez à service.client@exemple.fr pour toute question. ' + FILLER * 20
+    start = text.index('service.client')
+    # Coupure au milieu de l'adresse, puis morceaux de taille fixe
+    chunks = [(0, text[:start + 8])] + [(offset, text[offset:offset + 300])
+                                        for offset in range(start + 8, len(text), 300)]
+    emails, _, _ = detector.scan_chunks(chunks)
+    assert emails == detector.extract_emails(text)
+    assert [email['email'] for email in emails] == ['service.client@exemple.fr']
+
+
+def test_extract_all_data_gives_the_same_result_from_visible_text_chunks():
+    detector = DataDetector()
+    html = '<html><body>' + ''.join(f'<p>{block}</p>' for block in sample_text().split('\n')) + \
+        '<script>var mail = "cache@exemple.fr";</script></body></html>'
+    soup = BeautifulSoup(html, 'html.parser')
+    text = ''.join(chunk for _, chunk in visible_text_chunks(soup, max_chars=200))
+    assert 'cache@exemple.fr' not in text
+    from_chunks = detector.extract_all_data(visible_text_chunks(soup, max_chars=200), html)
+    from_text = detector.extract_all_data(text, html)
+    assert normalized((from_chunks['emails'], from_chunks['phones'], from_chunks['social_media'])) == \
+        normalized((from_text['emails'], from_text['phones'], from_text['social_media']))
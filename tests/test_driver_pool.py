@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from scraper import DriverPool
+
+
+class FakeScraper:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.005)
+
+
+def test_creates_browsers_on_demand_up_to_size():
+    pool = DriverPool(size=2, factory=FakeScraper)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second and len(pool.scrapers) == 2
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(first)
+    assert pool.acquire(timeout=0.05) is first
+
+
+def test_waiting_owners_are_served_round_robin():
+    pool = DriverPool(size=1, factory=FakeScraper)
+    held = pool.acquire()
+    order = []
+
+    def worker(owner):
+        scraper = pool.acquire(owner)
+        order.append(owner)
+        pool.release(scraper)
+
+    threads = []
+    # Trois demandes du site A, puis une du site B : B ne doit pas attendre que A ait tout obtenu
+    for count, owner in enumerate(['A', 'A', 'A', 'B']):
+        thread = threading.Thread(target=worker, args=(owner,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: sum(len(queue) for queue in pool.waiters.values()) == count + 1)
+    pool.release(held)
+    for thread in threads:
+        thread.join(2)
+    assert order == ['A', 'B', 'A', 'A']
+
+
+def test_discard_frees_a_slot():
+    pool = DriverPool(size=1, factory=FakeScraper)
+    broken = pool.acquire()
+    pool.discard(broken)
+    assert broken.closed
+    replacement = pool.acquire(timeout=0.05)
+    assert replacement is not broken and pool.scrapers == [replacement]
+
+
+def test_close_wakes_waiters_and_quits_released_browsers():
+    pool = DriverPool(size=1, factory=FakeScraper)
+    held = pool.acquire()
+    errors = []
+
+    def waiter():
+        try:
+            pool.acquire('B')
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    wait_until(lambda: 'B' in pool.waiters)
+    pool.close()
+    thread.join(2)
+    assert len(errors) == 1 and held.closed
+    # Un navigateur rendu après la fermeture est arrêté
+    late = FakeScraper()
+    pool.release(late)
+    assert late.closed
+
+
+def test_failed_creation_releases_the_reservation():
+    calls = []
+
+    def factory():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("Chrome introuvable")
+        return FakeScraper()
+
+    pool = DriverPool(size=1, factory=factory)
+    with pytest.raises(OSError):
+        pool.acquire()
+    assert pool.creating == 0
+    assert isinstance(pool.acquire(timeout=0.05), FakeScraper)
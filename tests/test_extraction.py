@@ -0,0 +1,125 @@
+import os
+
+import pytest
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from dom_index import DomIndex
+from extraction import ExtractionPlan, child_path, simple_matcher
+from main import detect_repeated_records
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'listings')
+PAGES = sorted(name for name in os.listdir(FIXTURES) if name.endswith('.html'))
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return BeautifulSoup(f.read(), 'html.parser')
+
+
+def at_path(container, path):
+    element = container
+    for rank in path:
+        children = [child for child in element.children if isinstance(child, Tag)]
+        if rank >= len(children):
+            return None
+        element = children[rank]
+    return element
+
+
+def reference_rows(soup, structure):
+    """Extraction de référence, sans plan : élément au chemin relatif s'il correspond au sélecteur,
+    sinon le premier select_one"""
+    rows = []
+    for container in soup.select(structure['container']):
+        row = {}
+        for name, config in structure['fields'].items():
+            element = None
+            if config.get('path') is not None:
+                element = at_path(container, config['path'])
+                if element is not None and not soupsieve.match(config['selector'], element):
+                    element = None
+            if element is None:
+                element = container.select_one(config['selector'])
+            if element is None:
+                row[name] = None
+            elif config.get('attribute'):
+                row[name] = element.get(config['attribute'], '')
+            else:
+                row[name] = element.get_text().strip()
+        rows.append(row)
+    return rows
+
+
+def without_paths(structure):
+    return {**structure, 'fields': {name: {key: value for key, value in config.items() if key != 'path'}
+                                    for name, config in structure['fields'].items()}}
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_plan_matches_reference_extraction(name):
+    soup = load(name)
+    for structure in detect_repeated_records(DomIndex(soup)):
+        for variant in (structure, without_paths(structure)):
+            plan = ExtractionPlan(variant)
+            assert list(plan.rows(plan.containers(soup))) == reference_rows(soup, variant)
+
+
+def test_paths_tell_apart_fields_sharing_a_selector():
+    soup = load('directory.html')
+    structure = detect_repeated_records(DomIndex(soup))[0]
+    plan = ExtractionPlan(structure)
+    first = next(plan.rows(plan.containers(soup)))
+    assert first['phone'] == '04 78 12 34 56' and first['email'] == 'contact@dupont.fr'
+
+
+SOUP = BeautifulSoup("""
+<ul>
+  <li class="item"><h3>Premier</h3><span class="prix">10 €</span><a href="/1">voir</a></li>
+  <li class="item"><em>Nouveau</em><h3>Second</h3><span class="prix">20 €</span><a href="/2">voir</a></li>
+  <li class="item"><h3>Sans prix</h3></li>
+</ul>
+""", 'html.parser')
+
+STRUCTURE = {
+    'container': 'li.item',
+    'fields': {
+        'titre': {'selector': 'h3', 'path': [0]},
+        'prix': {'selector': '.prix', 'path': [1]},
+        'lien': {'selector': 'a', 'attribute': 'href', 'path': [2]}
+    }
+}
+
+
+def test_path_mismatch_falls_back_to_the_selector():
+    plan = ExtractionPlan(STRUCTURE)
+    rows = list(plan.rows(plan.containers(SOUP), {'source_url': 'https://exemple.com'}))
+    assert rows == [
+        {'source_url': 'https://exemple.com', 'titre': 'Premier', 'prix': '10 €', 'lien': '/1'},
+        {'source_url': 'https://exemple.com', 'titre': 'Second', 'prix': '20 €', 'lien': '/2'},
+        {'source_url': 'https://exemple.com', 'titre': 'Sans prix', 'prix': None, 'lien': None}
+    ]
+
+
+def test_invalid_css_class_uses_the_path_only():
+    soup = BeautifulSoup('<div class="card"><p class="2col">A</p></div><div class="card"></div>', 'html.parser')
+    plan = ExtractionPlan({'container': '.card', 'fields': {'texte': {'selector': '.2col', 'path': [0]}}})
+    assert [plan.extract(container) for container in plan.containers(soup)] == [{'texte': 'A'}, {'texte': None}]
+
+
+def test_child_path_and_resolve_round_trip():
+    container = SOUP.select('li.item')[1]
+    link = container.select_one('a')
+    path = child_path(container, link)
+    assert path == [3]
+    assert ExtractionPlan(STRUCTURE).resolve(container, tuple(path), {}) is link
+    assert child_path(SOUP.select('li.item')[0], link) is None
+
+
+@pytest.mark.parametrize('selector, matched', [
+    ('h3', True), ('#titre', True), ('.a.b', True), ('.a.c', False), ('div > h3', None)
+])
+def test_simple_matcher(selector, matched):
+    element = BeautifulSoup('<h3 id="titre" class="a b">x</h3>', 'html.parser').h3
+    matcher = simple_matcher(selector)
+    assert (None if matcher is None else matcher(element)) == matched
@@ -0,0 +1,109 @@
+import time
+
+from frontier import Frontier
+
+
+def drain(frontier):
+    urls = []
+    while True:
+        entry = frontier.pop()
+        if entry is None:
+            return urls
+        urls.append(entry[0])
+
+
+def test_priority_then_arrival_order():
+    frontier = Frontier()
+    frontier.add('a', 0)
+    frontier.add('b', 0, priority=0.9)
+    frontier.add('c', 0)
+    assert drain(frontier) == ['b', 'a', 'c']
+
+
+def test_duplicates_keep_smallest_depth_and_highest_priority():
+    frontier = Frontier()
+    assert frontier.add('a', 3)
+    assert not frontier.add('a', 1, priority=0.8)
+    frontier.add('b', 0, priority=0.6)
+    assert frontier.pop() == ('a', 1)
+    assert len(frontier) == 1
+
+
+def test_add_many_and_hints():
+    frontier = Frontier()
+    assert frontier.add_many([('a', 1), ('b', 1, 0.9, {'lastmod': '2024-01-01'}), ('a', 0)]) == 2
+    assert frontier.get_hints('b') == {'lastmod': '2024-01-01'}
+    assert frontier.pop() == ('b', 1)
+    assert frontier.get_hints('b') == {}
+    assert frontier.pop() == ('a', 0)
+
+
+def test_discard_removes_pending_urls():
+    frontier = Frontier()
+    frontier.add('a', 0)
+    frontier.add('b', 0)
+    frontier.discard('a')
+    assert 'a' not in frontier
+    assert drain(frontier) == ['b'] and not frontier
+
+
+def test_not_before_delays_an_url():
+    frontier = Frontier()
+    frontier.add('retry', 0, priority=1.0, not_before=time.monotonic() + 0.1)
+    frontier.add('other', 0)
+    assert frontier.delayed_count() == 1 and 'retry' in frontier
+    assert frontier.pop() == ('other', 0)
+    assert frontier.pop() is None
+    time.sleep(0.12)
+    assert frontier.pop() == ('retry', 0)
+    assert frontier.delayed_count() == 0
+
+
+def test_discard_removes_delayed_urls():
+    frontier = Frontier()
+    frontier.add('a', 0, not_before=time.monotonic() + 0.05)
+    frontier.discard('a')
+    time.sleep(0.06)
+    assert drain(frontier) == [] and not frontier
+
+
+def test_blocked_hosts_are_parked_until_they_recover():
+    frontier = Frontier()
+    # Plus d'URLs bloquées en tête que max_scan : l'hôte disponible sort quand même
+    for n in range(1500):
+        frontier.add(f'https://down.test/{n}', 0, priority=0.9)
+    frontier.add('https://up.test/', 0)
+    down = {'down.test'}
+    blocked = lambda host: host in down
+    assert frontier.pop(blocked=blocked) == ('https://up.test/', 0)
+    assert frontier.pop(blocked=blocked) is None
+    assert frontier.parked_count() == 1500 and len(frontier) == 1500
+    down.clear()
+    assert frontier.pop(blocked=blocked) == ('https://down.test/0', 0)
+    assert frontier.parked_count() == 0
+
+
+def test_pop_accept_keeps_refused_urls_in_place():
+    frontier = Frontier()
+    for url in ('a', 'b', 'c'):
+        frontier.add(url, 0)
+    assert frontier.pop(accept=lambda url: url != 'a') == ('b', 0)
+    assert drain(frontier) == ['a', 'c']
+
+
+def test_reprioritize_rebuilds_order_and_keeps_fifo_ties():
+    frontier = Frontier()
+    for url in ('a', 'b', 'c', 'd'):
+        frontier.add(url, 0)
+    frontier.reprioritize({'c': 0.9, 'd': 0.9, 'a': 0.1})
+    assert drain(frontier) == ['c', 'd', 'b', 'a']
+
+
+def test_reprioritize_leaves_delayed_urls_delayed():
+    frontier = Frontier()
+    frontier.add('later', 0, not_before=time.monotonic() + 0.1)
+    frontier.add('now', 0)
+    frontier.reprioritize({'later': 1.0})
+    assert drain(frontier) == ['now']
+    time.sleep(0.12)
+    assert drain(frontier) == ['later']
@@ -0,0 +1,163 @@
+import json
+
+import pytest
+
+from json_parser import CrawlFileReader, JsonParser, ValidationError
+
+SCHEMA = {
+    'nom': {'type': 'string'},
+    'age': {'type': 'integer'},
+    'prix': {'type': 'float'},
+    'email': {'type': 'email'},
+    'inscription': {'type': 'date'},
+    'site': {'type': 'url'},
+    'adresse': {'ville': {'type': 'string'}, 'code': {'type': 'integer'}}
+}
+
+RECORDS = [
+    {'nom': 'Jean', 'age': '30', 'prix': '9.99', 'email': 'jean@example.com',
+     'inscription': '2025-02-25', 'site': 'https://example.com', 'adresse': {'ville': 'Lyon', 'code': '69001'}},
+    {'nom': 42, 'age': 7.9, 'inscription': '2025-02-25T10:00:00Z', 'adresse': {}},
+    {'email': 'pas-un-email'},
+    {'age': 'trente'},
+    {'site': 'example.com'},
+    {'inscription': '25/02/2025'},
+    {'adresse': {'code': 'x'}}
+]
+
+
+def legacy_validate(parser, data, schema):
+    """Ancien validateur interprété : le schéma est parcouru à chaque enregistrement"""
+    if isinstance(schema, dict):
+        if 'type' not in schema:
+            return {k: legacy_validate(parser, v, schema.get(k, {})) for k, v in data.items()}
+        converter = parser.type_converters[schema['type']]
+        try:
+            return converter(data)
+        except Exception as e:
+            raise ValueError(f"Erreur de conversion en {schema['type']}: {str(e)}")
+    return data
+
+
+def outcome(function, *args):
+    try:
+        return 'ok', function(*args)
+    except ValueError as e:
+        return 'error', str(e)
+
+
+@pytest.mark.parametrize('record', RECORDS)
+def test_compiled_schema_matches_interpreted_validator(record):
+    parser = JsonParser()
+    compiled = parser.compile(SCHEMA)
+    assert outcome(compiled.validate, record) == outcome(legacy_validate, parser, record, SCHEMA)
+
+
+def test_errors_carry_the_field_path():
+    compiled = JsonParser().compile(SCHEMA)
+    with pytest.raises(ValidationError) as error:
+        compiled.validate({'adresse': {'code': 'x'}})
+    assert error.value.field == 'adresse.code'
+    with pytest.raises(ValidationError, match='Objet attendu'):
+        compiled.validate({'adresse': 'Lyon'})
+
+
+def test_unsupported_type_is_rejected_at_compile_time():
+    with pytest.raises(ValueError, match='Type non supporté'):
+        JsonParser().compile({'x': {'type': 'complex'}})
+
+
+def test_validate_many_collects_every_error():
+    compiled = JsonParser().compile(SCHEMA)
+    valid, errors = compiled.validate_many(RECORDS)
+    assert len(valid) == 2 and valid[0]['age'] == 30 and valid[1]['nom'] == '42'
+    assert [(error['index'], error['field']) for error in errors] == \
+        [(2, 'email'), (3, 'age'), (4, 'site'), (5, 'inscription'), (6, 'adresse.code')]
+
+
+def test_validate_many_stops_after_max_errors():
+    compiled = JsonParser().compile(SCHEMA)
+    valid, errors = compiled.validate_many(RECORDS, max_errors=2)
+    assert len(valid) == 2 and [error['index'] for error in errors] == [2, 3]
+
+
+def test_validate_stream_is_lazy():
+    compiled = JsonParser().compile({'age': {'type': 'integer'}})
+    consumed = []
+
+    def records():
+        for age in ('1', 'x', '3', '4'):
+            consumed.append(age)
+            yield {'age': age}
+
+    errors = []
+    stream = compiled.validate_stream(records(), errors)
+    assert next(stream) == {'age': 1} and consumed == ['1']
+    assert next(stream) == {'age': 3} and errors[0]['index'] == 1
+    assert list(stream) == [{'age': 4}]
+
+
+def crawl_document(pages):
+    return {'metadata': {'url': 'https://exemple.com', 'pages_count': len(pages)}, 'pages': pages}
+
+
+PAGES = {
+    f'page{n}': {'url': f'https://exemple.com/{n}', 'titre': 'Café à 3 € — ünïcode ' * n, 'depth': n,
+                 'items': [{'prix': 10 ** n, 'ratio': n / 7}]}
+    for n in range(12)
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1 << 20])
+def test_reader_matches_json_load_across_chunk_boundaries(tmp_path, chunk_size):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(crawl_document(PAGES), ensure_ascii=False, indent=2), encoding='utf-8')
+    reader = CrawlFileReader(str(path), chunk_size=chunk_size)
+    assert dict(reader) == PAGES
+    assert reader.metadata == {'url': 'https://exemple.com', 'pages_count': len(PAGES)}
+
+
+def test_reader_decodes_a_page_larger_than_many_chunks(tmp_path):
+    pages = {'grande': {'texte': 'é' * 300000, 'liens': list(range(20000))}, 'petite': {'n': 1}}
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(crawl_document(pages), ensure_ascii=False), encoding='utf-8')
+    assert dict(CrawlFileReader(str(path), chunk_size=4096)) == pages
+    assert dict(CrawlFileReader(str(path), chunk_size=4096, use_mmap=True)) == pages
+
+
+def test_number_at_the_end_of_a_chunk_is_not_truncated(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_bytes(b'{"pages": {"a": 123456789}}')
+    # Le premier morceau se termine au milieu du nombre
+    assert dict(CrawlFileReader(str(path), chunk_size=15)) == {'a': 123456789}
+
+
+def test_reader_handles_line_delimited_files(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    lines = [json.dumps({'metadata': {'url': 'https://exemple.com'}})]
+    lines += [json.dumps({'page_id': page_id, 'page': page}, ensure_ascii=False) for page_id, page in PAGES.items()]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    reader = CrawlFileReader(str(path), chunk_size=5)
+    assert dict(reader) == PAGES and reader.metadata == {'url': 'https://exemple.com'}
+
+
+def test_reader_keeps_unknown_keys_and_empty_pages(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('{"version": 2, "pages": {}, "metadata": {"url": "u"}}', encoding='utf-8')
+    reader = CrawlFileReader(str(path), chunk_size=4)
+    assert list(reader) == [] and reader.metadata == {'version': 2, 'url': 'u'}
+
+
+def test_reader_skips_invalid_pages_and_reports_them(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(crawl_document({'a': {'depth': '1'}, 'b': {'depth': 'x'}})), encoding='utf-8')
+    reader = JsonParser().stream_file(str(path), schema={'depth': {'type': 'integer'}}, chunk_size=8)
+    assert dict(reader) == {'a': {'depth': 1}}
+    assert [(error['page_id'], error['field']) for error in reader.errors] == [('b', 'depth')]
+
+
+def test_truncated_file_raises(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(crawl_document(PAGES))[:-40], encoding='utf-8')
+    with pytest.raises(ValueError, match='JSON invalide'):
+        list(CrawlFileReader(str(path), chunk_size=16))
@@ -0,0 +1,94 @@
+import pytest
+
+from link_graph import LinkGraph
+
+# NumPy n'est requis qu'au calcul des scores (voir link_graph)
+np = pytest.importorskip('numpy')
+
+LINKS = {
+    'a': ['b', 'c'],
+    'b': ['c'],
+    'c': ['a'],
+    'd': ['c', 'e']  # 'e' n'a pas encore été explorée : nœud sans lien sortant
+}
+
+
+def build(links=LINKS):
+    graph = LinkGraph()
+    for url, targets in links.items():
+        graph.add_page(url, targets)
+    return graph
+
+
+def reference_pagerank(links, damping=0.85, iterations=100):
+    """PageRank direct sur des dictionnaires, sans forme CSR"""
+    nodes = list(dict.fromkeys(list(links) + [target for targets in links.values() for target in targets]))
+    rank = {node: 1 / len(nodes) for node in nodes}
+    for _ in range(iterations):
+        dangling = sum(rank[node] for node in nodes if not links.get(node))
+        updated = {node: (1 - damping) / len(nodes) + damping * dangling / len(nodes) for node in nodes}
+        for source, targets in links.items():
+            for target in targets:
+                updated[target] += damping * rank[source] / len(targets)
+        rank = updated
+    return rank
+
+
+def test_csr_lists_sorted_targets_of_each_node():
+    graph = build()
+    indptr, indices = graph.csr()
+    targets = {graph.table.url(node): [graph.table.url(i) for i in indices[indptr[node]:indptr[node + 1]]]
+               for node in range(len(indptr) - 1)}
+    assert targets == {'a': ['b', 'c'], 'b': ['c'], 'c': ['a'], 'd': ['c', 'e'], 'e': []}
+    assert graph.edge_count == 6
+
+
+def test_adding_a_page_again_replaces_its_links_and_the_csr():
+    graph = build()
+    first = graph.csr()
+    graph.add_page('a', ['a', 'f', 'f'])
+    indptr, indices = graph.csr()
+    assert graph.csr() is not first and graph.edge_count == 5
+    node = graph.table.ids['a']
+    assert [graph.table.url(i) for i in indices[indptr[node]:indptr[node + 1]]] == ['f']
+
+
+def test_in_degree():
+    graph = build()
+    degrees = graph.in_degree()
+    assert {url: int(degrees[graph.table.ids[url]]) for url in 'abcde'} == {'a': 1, 'b': 1, 'c': 3, 'd': 0, 'e': 1}
+
+
+def test_pagerank_matches_reference():
+    graph = build()
+    rank = graph.pagerank(iterations=100, tolerance=0)
+    expected = reference_pagerank(LINKS)
+    assert rank.sum() == pytest.approx(1.0)
+    for url, value in expected.items():
+        assert rank[graph.table.ids[url]] == pytest.approx(value, abs=1e-9)
+
+
+def test_priorities_rank_known_urls_and_reset_the_counter():
+    graph = build()
+    assert graph.pages_since_rank == 4
+    priorities = graph.priorities(['e', 'c', 'inconnue', 'd'])
+    assert set(priorities) == {'c', 'd', 'e'}
+    assert priorities['c'] == 1.0 and priorities['d'] == 0.0
+    assert graph.pages_since_rank == 0
+    assert graph.priorities(['c', 'b'], measure='in_degree') == {'c': 1.0, 'b': 0.0}
+
+
+def test_empty_graph():
+    graph = LinkGraph()
+    assert len(graph.pagerank()) == 0 and graph.priorities(['a']) == {}
+
+
+def test_export_writes_a_loadable_archive(tmp_path):
+    graph = build()
+    path = graph.export(str(tmp_path / 'graph.npz'))
+    with np.load(path) as archive:
+        indptr, indices = graph.csr()
+        assert np.array_equal(archive['indptr'], indptr) and np.array_equal(archive['indices'], indices)
+        assert list(archive['urls']) == ['a', 'b', 'c', 'd', 'e']
+        assert np.allclose(archive['pagerank'], graph.pagerank())
+        assert list(archive['in_degree']) == [1, 1, 3, 0, 1]
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+import page_budget
+from page_budget import PageBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(page_budget, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+class FakeScraper:
+    def __init__(self, count):
+        self.count = count
+
+    def execute_js(self, script):
+        return self.count
+
+
+def test_steps_are_shortened_then_skipped_as_the_deadline_approaches(clock):
+    tracker = PageBudget(wall_time=10).track()
+    assert tracker.limit(4) == 4 and not tracker.degraded
+    clock.now += 8
+    assert tracker.remaining() == 2
+    assert tracker.limit(4) == 2 and tracker.exceeded == ['wall_time']
+    clock.now += 5
+    assert tracker.limit(4) == 0 and tracker.degraded
+    assert tracker.exceeded == ['wall_time']
+
+
+def test_degraded_once_the_wall_time_is_spent(clock):
+    tracker = PageBudget(wall_time=10).track()
+    clock.now += 10
+    assert tracker.degraded and tracker.exceeded == ['wall_time']
+
+
+def test_no_wall_time_means_no_deadline(clock):
+    tracker = PageBudget(wall_time=None).track()
+    clock.now += 10 ** 6
+    assert tracker.limit(30) == 30 and not tracker.degraded
+
+
+def test_dom_node_limit():
+    tracker = PageBudget(max_nodes=100).track()
+    assert tracker.check_nodes(FakeScraper(100)) == 100 and not tracker.exceeded
+    assert tracker.check_nodes(FakeScraper(101)) == 101 and tracker.exceeded == ['dom_nodes']
+    assert tracker.degraded
+    assert PageBudget(max_nodes=0).track().check_nodes(FakeScraper(10 ** 6)) is None
+
+
+def test_html_is_clipped_to_the_byte_limit():
+    tracker = PageBudget(max_html_bytes=100).track()
+    small = '<p>é</p>' * 5
+    assert tracker.clip_html(small) is small and not tracker.exceeded
+    clipped = tracker.clip_html('<p>' + 'é' * 100 + '</p>')
+    assert len(clipped.encode('utf-8')) <= 100 and clipped.startswith('<p>éé')
+    assert tracker.exceeded == ['html_bytes']
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from dom_index import DomIndex
+from main import FIELD_DETECTORS, detect_repeated_records
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'listings')
+PAGES = sorted(name for name in os.listdir(FIXTURES) if name.endswith('.html'))
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return BeautifulSoup(f.read(), 'html.parser')
+
+
+def legacy_detect(soup):
+    """Ancien détecteur : les classes complètes les plus fréquentes, champs lus sur la première occurrence"""
+    counts = {}
+    for tag in soup.find_all():
+        if tag.get('class'):
+            key = ' '.join(tag.get('class'))
+            counts[key] = counts.get(key, 0) + 1
+    structures = []
+    for container, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:3]:
+        if count <= 1:
+            continue
+        first_item = soup.find(class_=container.split())
+        fields = {name: data for name, detector in FIELD_DETECTORS for data in [detector(first_item)] if data}
+        if fields:
+            structures.append({'container': f".{container.replace(' ', '.')}", 'fields': fields})
+    return structures
+
+
+def finds_records(soup, structures):
+    """La structure classée en premier sélectionne exactement les enregistrements attendus"""
+    expected = soup.find_all(attrs={'data-expected': 'record'})
+    if not structures:
+        return False
+    return [id(e) for e in soup.select(structures[0]['container'])] == [id(e) for e in expected]
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_detects_expected_records(name):
+    soup = load(name)
+    structures = detect_repeated_records(DomIndex(soup))
+    assert finds_records(soup, structures), structures[:1]
+    assert structures[0]['count'] == len(soup.find_all(attrs={'data-expected': 'record'}))
+
+
+def test_not_worse_than_legacy_detector():
+    new_hits = legacy_hits = 0
+    for name in PAGES:
+        soup = load(name)
+        new = finds_records(soup, detect_repeated_records(DomIndex(soup)))
+        legacy = finds_records(soup, legacy_detect(soup))
+        assert new or not legacy, f"{name}: régression par rapport à l'ancien détecteur"
+        new_hits += new
+        legacy_hits += legacy
+    assert new_hits > legacy_hits
@@ -0,0 +1,80 @@
+import json
+
+from records import PageRecord, PageStore, UrlTable, export_page
+
+
+def page(n, **extra):
+    url = f'https://exemple.com/produits/page-{n}'
+    timestamp = f'2024-03-0{n % 9 + 1}T10:15:30.{n:06d}'
+    context = f'Écrivez à contact{n}@exemple.com ou appelez le 01 02 03 04 05'
+    return {
+        'url': url,
+        'structure': [{'container': '.card', 'fields': {'titre': {'selector': 'h3'}}}],
+        'items': [{'source_url': url, 'timestamp': timestamp, 'titre': f'Produit {i}', 'prix': '9,99 €'}
+                  for i in range(3)] + [{'titre': 'Sans base', 'note': 4.5, 'tags': ['a', 'b']}],
+        'sensitive_data': {
+            'emails': [{'email': f'contact{n}@exemple.com', 'context': context, 'confidence': 0.5}] * 2,
+            'phones': [{'phone': '01 02 03 04 05', 'context': context, 'confidence': 0.66}],
+            'social_media': {'facebook': ['https://facebook.com/exemple'], 'twitter': []},
+            'potential_sensitive': [{'type': 'potential_contact', 'value': f'contact{n}@exemple.com',
+                                     'context': context}]
+        },
+        'internal_links': [f'https://exemple.com/produits/page-{i}' for i in range(5)],
+        'external_links': ['https://partenaire.com/'],
+        'timestamp': timestamp,
+        'depth': n % 3,
+        **extra
+    }
+
+
+def test_record_round_trips_to_the_original_page():
+    table = UrlTable()
+    original = page(1, resources=[{'url': 'https://exemple.com/a.pdf', 'type': 'document'}])
+    record = PageRecord(table, json.loads(json.dumps(original)))
+    assert record.to_dict() == original
+    assert list(record.to_dict()) == list(original)
+    assert record['depth'] == 1 and record.get('absent', 'x') == 'x' and 'resources' in record
+
+
+def test_item_urls_and_timestamps_are_packed():
+    table = UrlTable()
+    record = PageRecord(table, page(2))
+    (keys, packed), rows = record.items[0]
+    assert keys[:2] == ('source_url', 'timestamp') and packed == (0, 1)
+    assert rows[0][0] == table.intern(record.url) and isinstance(rows[0][1], int)
+    assert record['items'][0]['source_url'] == record.url
+
+
+def test_unusual_timestamps_are_kept_as_is():
+    table = UrlTable()
+    original = page(3)
+    original['items'][0]['timestamp'] = '2024-03-01 10:15:30'
+    original['items'][1]['timestamp'] = '2024-03-01T10:15:30+02:00'
+    original['items'][2]['timestamp'] = 1709288130
+    original['timestamp'] = 'hier'
+    assert PageRecord(table, original).to_dict() == original
+
+
+def test_empty_page_round_trips():
+    minimal = {'url': 'https://exemple.com/', 'structure': None, 'items': [],
+               'sensitive_data': {'emails': [], 'phones': [], 'social_media': {}, 'potential_sensitive': []},
+               'internal_links': [], 'external_links': [], 'timestamp': None, 'depth': 0}
+    assert PageRecord(UrlTable(), minimal).to_dict() == minimal
+
+
+def test_classified_blocks_are_exported():
+    record = PageRecord(UrlTable(), page(4))
+    record.add_classified_block({'text': 'IBAN FR76...', 'score': 0.9})
+    assert record['sensitive_data']['classified_blocks'] == [{'text': 'IBAN FR76...', 'score': 0.9}]
+
+
+def test_page_store_shares_one_url_table():
+    store = PageStore()
+    pages = {f'id{n}': page(n) for n in range(5)}
+    for page_id, original in pages.items():
+        store[page_id] = original
+    assert len(store.table) == 6
+    assert store.to_dict() == pages
+    assert {page_id: export_page(store[page_id]) for page_id in store} == pages
+    del store['id0']
+    assert len(store) == 4 and 'id0' not in store
@@ -0,0 +1,58 @@
+import math
+
+from recrawl import RecrawlScheduler, content_hash
+
+DAY = 86400
+
+
+def test_content_hash_ignores_whitespace():
+    assert content_hash("Prix :  10 €\n") == content_hash("Prix : 10 €")
+    assert content_hash("Prix : 10 €") != content_hash("Prix : 12 €")
+
+
+def test_record_detects_changes():
+    scheduler = RecrawlScheduler()
+    assert scheduler.record('a', 'h1', depth=2, now=0)
+    assert not scheduler.record('a', 'h1', depth=1, now=DAY)
+    assert scheduler.record('a', 'h2', now=2 * DAY)
+    entry = scheduler.history['a']
+    assert (entry['checks'], entry['changes'], entry['observed'], entry['depth']) == (2, 1, 2 * DAY, 1)
+
+
+def test_change_interval_estimator():
+    scheduler = RecrawlScheduler(default_interval=DAY, min_interval=60)
+    entry = {'checks': 10, 'changes': 5, 'observed': 10 * DAY}
+    rate = -math.log((10 - 5 + 0.5) / (10 + 0.5)) / DAY
+    assert math.isclose(scheduler.change_interval(entry), 1 / rate)
+    # Jamais de changement : au moins le double de la durée observée
+    assert scheduler.change_interval({'checks': 4, 'changes': 0, 'observed': 4 * DAY}) == 8 * DAY
+    # Pas encore revue : intervalle par défaut
+    assert scheduler.change_interval({'checks': 0, 'changes': 0, 'observed': 0}) == DAY
+
+
+def test_change_interval_is_bounded_below():
+    scheduler = RecrawlScheduler(min_interval=3600)
+    assert scheduler.change_interval({'checks': 10, 'changes': 10, 'observed': 600}) == 3600
+
+
+def test_plan_orders_stale_then_likely_within_budget():
+    scheduler = RecrawlScheduler(budget=2, threshold=0.5, max_staleness=30 * DAY, default_interval=DAY)
+    for url, digest in (('volatile', 'a'), ('stable', 'a'), ('ancienne', 'a')):
+        scheduler.record(url, digest, now=0)
+    for day in range(1, 11):
+        scheduler.record('volatile', f"v{day}", now=day * DAY)
+        scheduler.record('stable', 'a', now=day * DAY)
+    scheduler.history['ancienne']['last_crawl'] = -40 * DAY
+
+    planned = scheduler.plan(now=11 * DAY)
+    assert [url for url, _, _ in planned] == ['ancienne', 'volatile']
+    assert scheduler.should_visit('volatile') and not scheduler.should_visit('stable')
+    assert scheduler.should_visit('nouvelle')
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / 'etat' / 'recrawl.json')
+    scheduler = RecrawlScheduler(path)
+    scheduler.record('a', 'h1', depth=0, now=0)
+    scheduler.save_state()
+    assert RecrawlScheduler(path).history == scheduler.history
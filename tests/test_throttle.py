@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+
+import throttle
+from throttle import CircuitBreaker, HostConcurrencyController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_breaker_opens_then_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=30)
+    assert not breaker.record('a.test', 'transient')
+    assert breaker.record('a.test', 'transient')
+    assert breaker.blocked('a.test') and not breaker.allow('a.test')
+    clock.now += 30
+    assert not breaker.blocked('a.test')
+    assert breaker.allow('a.test')
+    assert breaker.blocked('a.test') and not breaker.allow('a.test')
+    breaker.record('a.test', None)
+    assert breaker.open_hosts() == []
+
+
+def test_released_probe_can_be_taken_again(clock):
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+    breaker.record('a.test', 'transient')
+    clock.now += 30
+    assert breaker.allow('a.test')
+    # L'URL qui tenait la sonde est écartée avant son chargement
+    breaker.release('a.test')
+    assert not breaker.blocked('a.test')
+    assert breaker.allow('a.test')
+
+
+def test_failed_probe_doubles_the_open_duration(clock):
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+    breaker.record('a.test', 'transient')
+    clock.now += 30
+    assert breaker.allow('a.test')
+    assert breaker.record('a.test', 'transient')
+    clock.now += 30
+    assert breaker.blocked('a.test')
+    clock.now += 30
+    assert breaker.allow('a.test')
+
+
+OK = {'outcome': 'ok', 'latency': 0.5, 'status': 200}
+
+
+def run(controller, host, fetch):
+    controller.start(host)
+    controller.finish(host, fetch)
+
+
+def test_limit_grows_by_one_after_a_window_of_fast_successes(clock):
+    controller = HostConcurrencyController(global_limit=8, initial_limit=2)
+    for expected in (2, 3, 3, 3, 4):
+        run(controller, 'a.test', OK)
+        assert controller.snapshot()['a.test']['limit'] == expected
+
+
+def test_throttling_halves_the_limit_at_most_once_per_cooldown(clock):
+    controller = HostConcurrencyController(global_limit=8, initial_limit=8, cooldown=5)
+    run(controller, 'a.test', {'outcome': 'ok', 'latency': 0.5, 'status': 429})
+    assert controller.snapshot()['a.test']['limit'] == 4
+    clock.now += 1
+    run(controller, 'a.test', {'outcome': 'timeout', 'latency': None, 'status': None})
+    assert controller.snapshot()['a.test']['limit'] == 4
+    clock.now += 5
+    run(controller, 'a.test', {'outcome': 'timeout', 'latency': None, 'status': None})
+    assert controller.snapshot()['a.test']['limit'] == 2
+    for _ in range(3):
+        clock.now += 5
+        run(controller, 'a.test', {'outcome': 'ok', 'latency': 0.5, 'status': 503})
+    assert controller.snapshot()['a.test']['limit'] == 1
+
+
+def test_slow_pages_and_error_rate_decrease_the_limit(clock):
+    controller = HostConcurrencyController(global_limit=8, initial_limit=8, target_latency=1.0, cooldown=5)
+    run(controller, 'a.test', {'outcome': 'ok', 'latency': 2.5, 'status': 200})
+    assert controller.snapshot()['a.test']['limit'] == 4
+    clock.now += 5
+    for _ in range(3):
+        run(controller, 'b.test', {'outcome': 'error', 'latency': None, 'status': None})
+    assert controller.snapshot()['b.test']['limit'] == 8
+    run(controller, 'b.test', OK)
+    run(controller, 'b.test', {'outcome': 'error', 'latency': None, 'status': None})
+    assert controller.snapshot()['b.test']['limit'] == 4
+
+
+def test_can_start_respects_host_and_global_limits(clock):
+    controller = HostConcurrencyController(global_limit=3, initial_limit=2)
+    controller.start('a.test')
+    controller.start('a.test')
+    assert not controller.can_start('a.test') and controller.can_start('b.test')
+    controller.start('b.test')
+    assert not controller.can_start('b.test') and not controller.can_start('c.test')
+    controller.finish('a.test')
+    assert controller.can_start('c.test') and controller.can_start('a.test')
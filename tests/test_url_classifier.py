@@ -0,0 +1,108 @@
+import pytest
+
+from url_classifier import UrlClassifier, url_pattern
+
+
+@pytest.mark.parametrize('url, kind', [
+    ('https://exemple.com/docs/rapport.PDF', 'document'),
+    ('https://exemple.com/telechargements/archive.zip', 'archive'),
+    ('https://exemple.com/img/photo.jpg?w=300', 'image'),
+    ('https://exemple.com/videos/presentation.mp4', 'media'),
+    ('https://exemple.com/agenda.ics', 'data'),
+])
+def test_resources_are_recognised_by_extension(url, kind):
+    assert UrlClassifier().classify(url) == ('resource', kind)
+
+
+@pytest.mark.parametrize('url, reason', [
+    ('https://exemple.com/logout', 'logout'),
+    ('https://exemple.com/compte/sign-out?next=/', 'logout'),
+    ('https://exemple.com/boutique?add-to-cart=12', 'cart'),
+    ('https://exemple.com/page;jsessionid=ABC123', 'session_id'),
+    ('https://exemple.com/article?replytocom=42', 'reply'),
+    ('https://exemple.com/a/b/a/b/a/b', 'repeated_segments'),
+    ('https://exemple.com/' + '/'.join(f"n{i}" for i in range(20)), 'path_depth'),
+    ('https://exemple.com/recherche?' + '&'.join(f"f{i}=1" for i in range(8)), 'query_params'),
+    ('https://exemple.com/calendrier?mois=2099-01', 'calendar'),
+    ('https://exemple.com/agenda?year=1950', 'calendar'),
+])
+def test_traps_are_dropped(url, reason):
+    assert UrlClassifier().classify(url) == ('trap', reason)
+
+
+@pytest.mark.parametrize('url', [
+    'https://exemple.com/',
+    'https://exemple.com/blog/restaurer-un-meuble',
+    'https://exemple.com/produit.php?id=2500',
+    'https://exemple.com/login',
+])
+def test_ordinary_pages_are_kept(url):
+    assert UrlClassifier().classify(url) == ('page', None)
+
+
+def test_recent_dates_are_not_calendar_traps():
+    from datetime import date
+
+    year = date.today().year
+    assert UrlClassifier().classify(f"https://exemple.com/actualites/{year}/03/") == ('page', None)
+
+
+def test_faceted_search_quotas_per_path():
+    classifier = UrlClassifier(max_param_combinations=2, max_query_variants=5)
+    assert classifier.is_page('https://exemple.com/recherche?couleur=rouge')
+    assert classifier.is_page('https://exemple.com/recherche?taille=m')
+    # Troisième ensemble de paramètres sur le même chemin
+    assert classifier.classify('https://exemple.com/recherche?couleur=rouge&taille=m') == \
+        ('trap', 'query_combinations')
+    # Les combinaisons déjà vues restent acceptées jusqu'au quota de variantes
+    assert [classifier.is_page(f"https://exemple.com/recherche?couleur=c{i}") for i in range(4)] == \
+        [True, True, True, False]
+    # Un autre chemin a ses propres quotas
+    assert classifier.is_page('https://exemple.com/liste?page=2')
+
+
+def test_verdicts_are_cached_and_counted_once():
+    classifier = UrlClassifier(max_query_variants=1)
+    url = 'https://exemple.com/liste?page=1'
+    assert classifier.is_page(url) and classifier.is_page(url)
+    assert classifier.counts == {'page': 1}
+    assert classifier.summary()['routes'] == {'page': 1}
+
+
+class FakeResponse:
+    def __init__(self, content_type, disposition=''):
+        self.ok = True
+        self.headers = {'Content-Type': content_type, 'Content-Disposition': disposition}
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def head(self, url, **options):
+        self.calls.append(url)
+        for fragment, response in self.responses.items():
+            if fragment in url:
+                return response
+        return FakeResponse('text/html; charset=utf-8')
+
+
+def test_probe_is_made_once_per_url_pattern():
+    classifier = UrlClassifier(probe=True)
+    classifier.session = FakeSession({
+        'telecharger': FakeResponse('application/pdf'),
+        'export': FakeResponse('text/html', 'attachment; filename="export.html"')
+    })
+    for i in range(5):
+        assert classifier.classify(f"https://exemple.com/telecharger?id={i}") == ('resource', 'application/pdf')
+        assert classifier.classify(f"https://exemple.com/articles/{i}/texte-{i}") == ('page', None)
+    assert classifier.classify('https://exemple.com/export?format=html') == ('resource', 'attachment')
+    assert len(classifier.session.calls) == 3
+
+
+def test_url_pattern_generalises_identifiers():
+    assert url_pattern('https://Exemple.com/produits/123/photo.JPG?b=1&a=2') == \
+        ('exemple.com', 'produits/{id}/*.jpg', ('a', 'b'))
+    assert url_pattern('https://exemple.com/produits/456/autre.jpg?a=3&b=4') == \
+        url_pattern('https://exemple.com/produits/123/photo.jpg?b=1&a=2')
@@ -0,0 +1,84 @@
+from bs4 import CData, NavigableString
+
+# Mêmes types de chaînes que Tag.get_text() : ni commentaires, ni contenu de <script>/<style>
+TEXT_TYPES = (NavigableString, CData)
+
+# Éléments dont le contenu n'est jamais affiché
+HIDDEN_TAGS = frozenset({
+    'head', 'script', 'style', 'noscript', 'template', 'svg', 'math', 'iframe', 'object', 'canvas'
+})
+
+# Éléments qui commencent une nouvelle ligne : leur texte n'est jamais collé à celui des voisins
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'details', 'dialog', 'div',
+    'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'header', 'hr', 'legend', 'li', 'main', 'nav', 'ol', 'option', 'p', 'pre', 'section',
+    'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul'
+})
+
+
+def visible_text_chunks(root, max_chars=8192):
+    """
+    Texte visible d'un document, par morceaux, en un seul parcours de l'arbre
+
+    Le contenu des éléments jamais affichés (HIDDEN_TAGS) est ignoré et un
+    saut de ligne sépare le texte de deux blocs (BLOCK_TAGS). Un morceau se
+    termine de préférence à une limite de bloc une fois `max_chars` atteint,
+    et ne dépasse jamais 2 * max_chars.
+    :param root: Document ou élément BeautifulSoup
+    :return: Générateur de (décalage, texte) ; le décalage est la position du
+             morceau dans le texte visible complet (concaténation des morceaux)
+    """
+    parts = []
+    size = 0
+    offset = 0
+    pending_break = False
+    # Pile explicite (itérateur sur les enfants, élément de bloc) : pas de récursion sur les pages profondes
+    stack = [(iter(root.contents), False)]
+    while stack:
+        children, is_block = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            pending_break = pending_break or is_block
+            continue
+        if isinstance(child, NavigableString):
+            if type(child) not in TEXT_TYPES:
+                continue
+            text = str(child)
+            if pending_break:
+                if not text.strip():
+                    # Mise en forme entre deux blocs
+                    continue
+                if offset or size:
+                    parts.append('\n')
+                    size += 1
+                    if size >= max_chars:
+                        chunk = ''.join(parts)
+                        yield offset, chunk
+                        offset += len(chunk)
+                        parts, size = [], 0
+                pending_break = False
+            # Texte très long sans limite de bloc : découpé pour borner la taille des morceaux
+            while size + len(text) > 2 * max_chars:
+                cut = 2 * max_chars - size
+                parts.append(text[:cut])
+                chunk = ''.join(parts)
+                yield offset, chunk
+                offset += len(chunk)
+                parts, size, text = [], 0, text[cut:]
+            parts.append(text)
+            size += len(text)
+            continue
+        if child.name in HIDDEN_TAGS:
+            continue
+        is_block = child.name in BLOCK_TAGS
+        pending_break = pending_break or is_block
+        stack.append((iter(child.contents), is_block))
+    if parts:
+        yield offset, ''.join(parts)
+
+
+def visible_text(root):
+    """Texte visible complet (voir visible_text_chunks)"""
+    return ''.join(text for _, text in visible_text_chunks(root))
@@ -0,0 +1,259 @@
+import random
+import threading
+import time
+from collections import deque
+
+# Erreurs Chrome (net::ERR_*) qui ne se régleront pas en réessayant
+PERMANENT_ERRORS = (
+    'ERR_NAME_NOT_RESOLVED', 'ERR_NAME_RESOLUTION_FAILED', 'ERR_ADDRESS_INVALID',
+    'ERR_INVALID_URL', 'ERR_UNSAFE_PORT', 'ERR_UNKNOWN_URL_SCHEME', 'ERR_DISALLOWED_URL_SCHEME',
+    'ERR_TOO_MANY_REDIRECTS', 'ERR_BLOCKED_BY_CLIENT', 'ERR_BLOCKED_BY_RESPONSE',
+    'ERR_CERT_', 'ERR_SSL_', 'ERR_BAD_SSL_CLIENT_AUTH_CERT'
+)
+TRANSIENT_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+
+def classify_failure(fetch):
+    """
+    Classe le résultat d'un chargement
+    :param fetch: Résultat de WebScraper.navigate_to (last_fetch)
+    :return: None si le chargement a réussi, sinon 'transient' (à réessayer) ou 'permanent'
+    """
+    if not fetch:
+        return 'transient'
+    status = fetch.get('status')
+    if fetch.get('outcome', 'ok') == 'ok':
+        return 'transient' if status in TRANSIENT_STATUSES else None
+    if fetch.get('outcome') == 'timeout':
+        return 'transient'
+    error = fetch.get('error') or ''
+    if any(code in error for code in PERMANENT_ERRORS):
+        return 'permanent'
+    # Connexion refusée/réinitialisée, navigateur planté... : on retente
+    return 'transient'
+
+
+class RetryPolicy:
+    """Nombre de tentatives et délai (exponentiel, avec gigue) avant de réessayer une URL"""
+
+    def __init__(self, max_retries=3, base_delay=2.0, max_delay=120.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, failure, attempt):
+        """:param attempt: Nombre de tentatives déjà effectuées"""
+        return failure == 'transient' and attempt <= self.max_retries
+
+    def backoff(self, attempt):
+        """Délai avant la tentative suivante ("equal jitter" : tirage uniforme entre la moitié du plafond et le plafond)"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+class HostState:
+    """État de concurrence et mesures récentes d'un hôte"""
+
+    def __init__(self, limit, window):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.successes = 0           # succès depuis la dernière augmentation
+        self.last_decrease = 0.0
+
+
+class HostConcurrencyController:
+    """Limite adaptative (AIMD) du nombre de pages chargées en parallèle par hôte
+
+    Chaque hôte démarre à `initial_limit`. Une série de chargements rapides et
+    réussis ajoute une place (augmentation additive) ; une réponse 429/503, un
+    timeout, une latence excessive ou un taux d'erreur élevé divise la limite
+    (diminution multiplicative), au plus une fois par `cooldown` secondes. La
+    somme des pages en cours ne dépasse jamais `global_limit`.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, global_limit, initial_limit=None, min_limit=1, max_limit=None,
+                 target_latency=5.0, decrease_factor=0.5, window=20, max_error_rate=0.5,
+                 cooldown=5.0):
+        self.global_limit = global_limit
+        self.initial_limit = initial_limit or max(1, global_limit // 2)
+        self.min_limit = min_limit
+        self.max_limit = max_limit or global_limit
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+
+        self.hosts = {}
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(min(self.initial_limit, self.max_limit), self.window)
+            self.hosts[host] = state
+        return state
+
+    def can_start(self, host):
+        """Indique si une page de cet hôte peut être lancée maintenant"""
+        with self.lock:
+            if self.in_flight >= self.global_limit:
+                return False
+            state = self._state(host)
+            return state.in_flight < int(state.limit)
+
+    def start(self, host):
+        """Réserve une place pour l'hôte"""
+        with self.lock:
+            self._state(host).in_flight += 1
+            self.in_flight += 1
+
+    def finish(self, host, fetch=None):
+        """
+        Libère la place de l'hôte et ajuste sa limite
+        :param fetch: Résultat du chargement {'outcome', 'latency', 'status'} ou None s'il n'a pas eu lieu
+        """
+        with self.lock:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            self.in_flight = max(0, self.in_flight - 1)
+            if fetch:
+                self._adjust(state, fetch)
+
+    def _adjust(self, state, fetch):
+        outcome = fetch.get('outcome', 'ok')
+        latency = fetch.get('latency')
+        if fetch.get('status') in self.THROTTLE_STATUSES:
+            outcome = 'throttled'
+
+        state.outcomes.append(outcome)
+        if latency is not None:
+            state.latencies.append(latency)
+
+        if outcome in ('throttled', 'timeout'):
+            self._decrease(state)
+            return
+
+        errors = sum(1 for o in state.outcomes if o != 'ok')
+        if len(state.outcomes) >= min(5, self.window) and errors / len(state.outcomes) > self.max_error_rate:
+            self._decrease(state)
+            return
+
+        if outcome == 'ok' and latency is not None and latency > 2 * self.target_latency:
+            self._decrease(state)
+            return
+
+        if outcome == 'ok' and (latency is None or latency <= self.target_latency):
+            # Une place de plus après une "fenêtre" complète de succès
+            state.successes += 1
+            if state.successes >= int(state.limit):
+                state.successes = 0
+                state.limit = min(self.max_limit, state.limit + 1)
+
+    def _decrease(self, state):
+        now = time.monotonic()
+        state.successes = 0
+        if now - state.last_decrease < self.cooldown:
+            return
+        state.last_decrease = now
+        state.limit = max(self.min_limit, state.limit * self.decrease_factor)
+
+    def snapshot(self):
+        """Retourne les limites courantes par hôte, pour les statistiques"""
+        with self.lock:
+            return {
+                host: {
+                    'limit': int(state.limit),
+                    'in_flight': state.in_flight,
+                    'avg_latency': round(sum(state.latencies) / len(state.latencies), 3) if state.latencies else None
+                }
+                for host, state in self.hosts.items()
+            }
+
+
+class CircuitBreaker:
+    """Disjoncteur par hôte
+
+    Après `failure_threshold` échecs consécutifs, l'hôte est "ouvert" : ses URLs
+    restent en attente dans la frontière pendant `open_seconds`. Une seule page
+    sert ensuite de sonde (état "half-open") : un succès referme le disjoncteur,
+    un échec le rouvre pour une durée doublée (plafonnée à `max_open_seconds`).
+    """
+
+    def __init__(self, failure_threshold=5, open_seconds=30.0, max_open_seconds=600.0):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.hosts = {}  # host -> {'state', 'failures', 'open_until', 'duration', 'probe_until'}
+        self.lock = threading.Lock()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = {'state': 'closed', 'failures': 0, 'open_until': 0.0,
+                     'duration': self.open_seconds, 'probe_until': 0.0}
+            self.hosts[host] = state
+        return state
+
+    def allow(self, host):
+        """Indique si une page de cet hôte peut être lancée (réserve la sonde si besoin)"""
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None or state['state'] == 'closed':
+                return True
+            now = time.monotonic()
+            if state['state'] == 'open':
+                if now < state['open_until']:
+                    return False
+                state['state'] = 'half-open'
+            # Une sonde à la fois ; la réservation expire si la page n'a jamais été chargée
+            if now < state['probe_until']:
+                return False
+            state['probe_until'] = now + state['duration']
+            return True
+
+    def blocked(self, host):
+        """Indique si l'hôte refusera toute page pour l'instant (ouvert, ou sonde déjà en cours), sans rien réserver"""
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None or state['state'] == 'closed':
+                return False
+            now = time.monotonic()
+            return now < state['open_until'] or now < state['probe_until']
+
+    def release(self, host):
+        """Rend la sonde réservée par allow quand la page n'est finalement pas chargée"""
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is not None and state['state'] == 'half-open':
+                state['probe_until'] = 0.0
+
+    def record(self, host, failure):
+        """
+        Enregistre le résultat d'un chargement
+        :param failure: Résultat de classify_failure (None en cas de succès)
+        :return: True si le disjoncteur vient de s'ouvrir
+        """
+        with self.lock:
+            state = self._state(host)
+            if failure is None:
+                state.update(state='closed', failures=0, duration=self.open_seconds, probe_until=0.0)
+                return False
+
+            state['failures'] += 1
+            if state['state'] == 'half-open':
+                state['duration'] = min(self.max_open_seconds, state['duration'] * 2)
+            elif state['state'] == 'open' or state['failures'] < self.failure_threshold:
+                return False
+            state.update(state='open', open_until=time.monotonic() + state['duration'], probe_until=0.0)
+            return True
+
+    def open_hosts(self):
+        """Retourne les hôtes actuellement ouverts ou en sonde"""
+        with self.lock:
+            return sorted(host for host, state in self.hosts.items() if state['state'] != 'closed')
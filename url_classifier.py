@@ -0,0 +1,242 @@
+import re
+import threading
+from collections import Counter
+from datetime import date
+from urllib.parse import parse_qsl, unquote, urlparse
+
+# Extensions des ressources qui ne sont pas des pages HTML, par type
+RESOURCE_EXTENSIONS = {
+    'document': {'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'odt', 'ods', 'odp', 'rtf', 'csv', 'epub'},
+    'archive': {'zip', 'rar', '7z', 'tar', 'gz', 'tgz', 'bz2', 'xz'},
+    'image': {'jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'bmp', 'ico', 'tif', 'tiff', 'avif', 'heic'},
+    'media': {'mp4', 'm4v', 'mov', 'avi', 'wmv', 'flv', 'webm', 'mkv', 'mpg', 'mpeg',
+              'mp3', 'm4a', 'wav', 'ogg', 'oga', 'flac', 'aac'},
+    'binary': {'exe', 'msi', 'dmg', 'pkg', 'deb', 'rpm', 'apk', 'iso', 'bin', 'jar'},
+    'data': {'json', 'xml', 'rss', 'atom', 'ics', 'vcf', 'txt', 'css', 'js', 'map',
+             'woff', 'woff2', 'ttf', 'otf', 'eot'}
+}
+
+# Types MIME acceptés comme pages lors d'une sonde HEAD
+PAGE_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Liens qui ne mènent qu'à des actions ou à des variantes sans fin d'une même page
+# (motifs recherchés dans le chemin et la requête, en minuscules et décodés)
+TRAP_PATTERNS = [
+    ('logout', r'(?:^|/)(?:log-?out|sign-?out|d[ée]connexion)(?:[/.?]|$)|[?&]action=(?:log-?out|sign-?out)'),
+    ('cart', r'add[-_]to[-_]cart|(?:^|/)(?:cart|panier)/(?:add|ajout)|[?&]add-to-cart='),
+    ('session_id', r'(?:;jsessionid=|[?&](?:phpsessid|sid|sessionid|session_id)=)'),
+    ('reply', r'[?&]replytocom='),
+    ('print', r'[?&](?:print|printable|imprimer)=|(?:^|/)(?:print|imprimer)(?:/|$)'),
+    ('share', r'[?&]share=|(?:^|/)share(?:/|$)')
+]
+
+# Dates dans les URLs (calendriers, archives) : année-mois[-jour]
+DATE_PATTERN = re.compile(r'(?<!\d)((?:19|20)\d{2})[-/](0?[1-9]|1[0-2])(?:[-/](?:0?[1-9]|[12]\d|3[01]))?(?!\d)')
+YEAR_PARAMS = frozenset({'year', 'annee', 'année', 'yr', 'y'})
+
+# Segments variables d'un chemin (identifiants), remplacés pour former le motif d'une URL
+_ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$', re.I)
+
+
+def url_extension(path):
+    """Extension du dernier segment du chemin, en minuscules ('' s'il n'en a pas)"""
+    name = path.rsplit('/', 1)[-1]
+    return name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+
+
+def url_pattern(url):
+    """
+    Motif d'une URL : hôte, chemin dont les identifiants et le dernier segment
+    sont génériques, noms des paramètres
+    Deux URLs de même motif sont supposées servir le même type de contenu.
+    """
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    if segments:
+        extension = url_extension(parsed.path)
+        segments = ['{id}' if _ID_SEGMENT.match(segment) else segment.lower() for segment in segments[:-1]]
+        segments.append('*.' + extension if extension else '*')
+    keys = tuple(sorted({key for key, _ in parse_qsl(parsed.query, keep_blank_values=True)}))
+    return parsed.netloc.lower(), '/'.join(segments), keys
+
+
+class UrlClassifier:
+    """Tri des liens découverts avant leur mise en file d'attente
+
+    Chaque URL est classée sans charger la page dans le navigateur :
+    - 'resource' : ressource non HTML (PDF, archive, image, vidéo...), reconnue
+      à son extension ou, si `probe` est activé, au Content-Type d'une requête
+      HEAD ; la sonde est faite une fois par motif d'URL (voir url_pattern) ;
+    - 'trap' : piège à crawler (déconnexion, panier, identifiant de session,
+      segments de chemin répétés, dates de calendrier hors de la fenêtre
+      utile, combinaisons de paramètres sans fin d'une recherche à facettes) ;
+    - 'page' : page à explorer.
+    Le verdict d'une URL est mémorisé : un lien présent sur toutes les pages
+    n'est classé (et compté) qu'une fois.
+    """
+
+    def __init__(self, resource_extensions=None, trap_patterns=None, probe=False, probe_timeout=5,
+                 max_segment_repeats=2, max_path_depth=12, max_url_length=2000, max_query_params=6,
+                 max_param_combinations=10, max_query_variants=500, years_back=20, years_ahead=2,
+                 user_agent='WebHarvestPro', max_cache=200000):
+        """
+        :param resource_extensions: Dictionnaire type -> extensions (RESOURCE_EXTENSIONS par défaut)
+        :param trap_patterns: Liste de (raison, expression régulière) (TRAP_PATTERNS par défaut)
+        :param probe: Sonde HEAD des URLs dont l'extension ne dit rien du contenu
+        :param max_segment_repeats: Occurrences maximales d'un même segment dans un chemin
+        :param max_param_combinations: Ensembles de noms de paramètres distincts acceptés par chemin
+        :param max_query_variants: Requêtes distinctes acceptées par chemin
+        :param years_back: Ancienneté maximale (en années) d'une date de calendrier ; None sans limite
+        :param years_ahead: Avance maximale (en années) d'une date de calendrier
+        """
+        extensions = RESOURCE_EXTENSIONS if resource_extensions is None else resource_extensions
+        self.extensions = {extension: kind for kind, values in extensions.items() for extension in values}
+        self.trap_patterns = [(reason, re.compile(pattern))
+                              for reason, pattern in (TRAP_PATTERNS if trap_patterns is None else trap_patterns)]
+        self.probe = probe
+        self.probe_timeout = probe_timeout
+        self.max_segment_repeats = max_segment_repeats
+        self.max_path_depth = max_path_depth
+        self.max_url_length = max_url_length
+        self.max_query_params = max_query_params
+        self.max_param_combinations = max_param_combinations
+        self.max_query_variants = max_query_variants
+        self.years_back = years_back
+        self.years_ahead = years_ahead
+        self.user_agent = user_agent
+        self.max_cache = max_cache
+        self.lock = threading.Lock()
+        self.verdicts = {}  # url -> (route, type de ressource ou raison du rejet)
+        self.queries = {}  # (hôte, chemin) -> [ensembles de noms de paramètres, nombre de requêtes]
+        self.probes = {}  # motif -> Content-Type (None si la sonde a échoué)
+        self.counts = Counter()  # URLs distinctes par route
+        self.session = None
+
+    def classify(self, url):
+        """
+        Classe une URL
+        :return: (route, détail) : ('page', None), ('resource', type) ou ('trap', raison)
+        """
+        with self.lock:
+            verdict = self.verdicts.get(url)
+        if verdict is not None:
+            return verdict
+        verdict = self._classify(url)
+        with self.lock:
+            if url not in self.verdicts:
+                if len(self.verdicts) >= self.max_cache:
+                    self.verdicts.clear()
+                self.verdicts[url] = verdict
+                self.counts[verdict[0]] += 1
+            verdict = self.verdicts[url]
+        return verdict
+
+    def is_page(self, url):
+        return self.classify(url)[0] == 'page'
+
+    def _classify(self, url):
+        if len(url) > self.max_url_length:
+            return 'trap', 'url_length'
+        parsed = urlparse(url)
+        kind = self.extensions.get(url_extension(parsed.path))
+        if kind is not None:
+            return 'resource', kind
+
+        reason = self.trap_reason(parsed)
+        if reason is not None:
+            return 'trap', reason
+
+        if self.probe:
+            content_type = self.probe_content_type(url)
+            if content_type and not content_type.startswith(PAGE_CONTENT_TYPES):
+                return 'resource', content_type
+
+        # Compté en dernier : seules les pages retenues consomment le quota de variantes du chemin
+        if parsed.query and not self._accept_query(parsed):
+            return 'trap', 'query_combinations'
+        return 'page', None
+
+    def trap_reason(self, parsed):
+        """Raison pour laquelle une URL est un piège, ou None (hors quotas de variantes)"""
+        path = unquote(parsed.path).lower()
+        if parsed.params:
+            # ;jsessionid=... : urlparse le sépare du chemin
+            path = f"{path};{unquote(parsed.params).lower()}"
+        target = f"{path}?{unquote(parsed.query).lower()}" if parsed.query else path
+        for reason, pattern in self.trap_patterns:
+            if pattern.search(target):
+                return reason
+
+        segments = [segment for segment in path.split('/') if segment]
+        if self.max_path_depth and len(segments) > self.max_path_depth:
+            return 'path_depth'
+        if self.max_segment_repeats and segments and \
+                Counter(segments).most_common(1)[0][1] > self.max_segment_repeats:
+            return 'repeated_segments'
+
+        params = parse_qsl(parsed.query, keep_blank_values=True)
+        if self.max_query_params and len(params) > self.max_query_params:
+            return 'query_params'
+
+        years = [int(match.group(1)) for match in DATE_PATTERN.finditer(target)]
+        years.extend(int(value) for key, value in params
+                     if key.lower() in YEAR_PARAMS and value.isdigit() and len(value) == 4)
+        if years:
+            current = date.today().year
+            if max(years) > current + self.years_ahead or \
+                    (self.years_back is not None and min(years) < current - self.years_back):
+                return 'calendar'
+        return None
+
+    def _accept_query(self, parsed):
+        """Quotas de combinaisons de paramètres et de requêtes distinctes par chemin (recherche à facettes)"""
+        names = frozenset(key for key, _ in parse_qsl(parsed.query, keep_blank_values=True))
+        with self.lock:
+            entry = self.queries.setdefault((parsed.netloc, parsed.path), [set(), 0])
+            combinations = entry[0]
+            if names not in combinations:
+                if len(combinations) >= self.max_param_combinations:
+                    return False
+                combinations.add(names)
+            if entry[1] >= self.max_query_variants:
+                return False
+            entry[1] += 1
+        return True
+
+    def probe_content_type(self, url):
+        """Content-Type annoncé par une requête HEAD, une seule fois par motif d'URL"""
+        pattern = url_pattern(url)
+        with self.lock:
+            if pattern in self.probes:
+                return self.probes[pattern]
+        import requests
+
+        content_type = None
+        try:
+            if self.session is None:
+                self.session = requests.Session()
+                self.session.headers['User-Agent'] = self.user_agent
+            response = self.session.head(url, timeout=self.probe_timeout, allow_redirects=True)
+            # Un serveur qui refuse HEAD (405...) ne dit rien du contenu : la page sera explorée
+            if response.ok:
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower() or None
+                # Fichier à télécharger, même servi en text/html
+                if 'attachment' in response.headers.get('Content-Disposition', '').lower() and \
+                        (content_type is None or content_type.startswith(PAGE_CONTENT_TYPES)):
+                    content_type = 'attachment'
+        except requests.RequestException:
+            pass
+        with self.lock:
+            if len(self.probes) >= self.max_cache:
+                self.probes.clear()
+            self.probes[pattern] = content_type
+        return content_type
+
+    def summary(self):
+        """Nombre d'URLs distinctes par route et par détail"""
+        with self.lock:
+            details = Counter(verdict for verdict in self.verdicts.values() if verdict[0] != 'page')
+        return {
+            'routes': dict(self.counts),
+            'details': {f"{route}:{detail}": count for (route, detail), count in details.most_common()}
+        }